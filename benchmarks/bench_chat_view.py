@@ -0,0 +1,63 @@
+"""
+ChatView rendering benchmark: input latency and render time as the chat history grows.
+
+Fills the history in bursts (as a streamed or fast conversation would), then
+types a message and presses Enter, measuring the time until the message is
+rendered. Needs a display (run under Xvfb on a headless machine).
+
+Usage:
+    python -m benchmarks.bench_chat_view --messages 20000 --burst 50
+"""
+import time
+import argparse
+from src.view.view_chat_screen import ChatView
+
+
+def pump(view: ChatView, seconds: float) -> None:
+    """
+    Run the Tk event loop for a while without blocking in mainloop.
+    """
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        view.window.update()
+        time.sleep(0.001)
+
+
+def run_benchmark(args) -> list:
+    view = ChatView("Bench", "User")
+    view.set_message_callback(lambda message: time.sleep(0))
+    rows = []
+    sent = 0
+    checkpoint = args.checkpoint
+    while sent < args.messages:
+        for _ in range(args.burst):
+            view.update_chat_history(f"Bench: message {sent} " + "lorem ipsum " * 8)
+            sent += 1
+        pump(view, view.FRAME_MS / 1000)
+
+        if sent >= checkpoint:
+            view.user_input.insert(0, f"probe at {sent}")
+            view.user_input.event_generate("<Return>")
+            pump(view, 0.1)
+            _, latency = view.input_latencies[-1]
+            _, render = view.render_times[-1]
+            rows.append((sent, view.shown_lines, latency * 1000, render * 1000))
+            checkpoint *= 2
+    view.window.destroy()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=50, help="Messages queued between frames")
+    parser.add_argument("--checkpoint", type=int, default=100, help="First history size to probe, doubled after")
+    args = parser.parse_args()
+
+    print(f"{'history':>10}{'widget lines':>14}{'input ms':>10}{'render ms':>11}")
+    for history, lines, latency, render in run_benchmark(args):
+        print(f"{history:>10}{lines:>14}{latency:>10.1f}{render:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
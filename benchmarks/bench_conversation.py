@@ -0,0 +1,310 @@
+"""
+End-to-end conversation benchmark against a stub Ollama server and fake speech libraries.
+
+Drives ChatBase and the controllers' turn logic through scripted multi-turn
+conversations in concurrent sessions and reports per-stage and end-to-end
+p50/p95/p99, throughput and memory. Results can be saved as a baseline and
+later runs compared against it.
+
+The real PhraseTranslator, TextToSpeechConverter and MicConverter are used;
+only the libraries under them (Argos Translate, edge-tts, playsound, Vosk,
+PyAudio, keyboard) are replaced by fakes with fixed latencies. With
+--language pt (the default) every turn is translated both ways; with
+--language en translation is skipped, as in an English session.
+
+Modes:
+    screen    ScreenChatController.process_user_message (keyboard input)
+    mic       Same, with the input recorded and decoded by MicConverter first
+    terminal  TerminalChatController.run with scripted keyboard input
+              (includes the controller's 1 second pause between turns)
+
+Usage:
+    python -m benchmarks.bench_conversation --sessions 4 --turns 10
+    python -m benchmarks.bench_conversation --language en --translate-latency 0.05
+    python -m benchmarks.bench_conversation --save-baseline bench_baseline.json
+    python -m benchmarks.bench_conversation --baseline bench_baseline.json --max-regression 0.10
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks import fake_backends
+from benchmarks.stubs import StubChatView, StubTerminalView, make_stub_environment
+from src.models.chat_base import ChatBase
+from src.models.translate_phrase import PhraseTranslator
+from src.models.async_translator import AsyncPhraseTranslator
+from src.models.tts_converter import TextToSpeechConverter
+from src.models.mic_converter import MicConverter
+from src.models.chat_session import ChatSession
+from src.models.turn_tracer import TurnTracer
+
+DEFAULT_SCRIPT = [
+    "Hello, who are you?",
+    "What do you like to do in your free time?",
+    "Can you tell me a short story?",
+    "That is interesting, tell me more",
+    "What would you recommend for a rainy day?",
+    "Thank you!",
+]
+
+
+class CollectingTracer(TurnTracer):
+    """
+    A tracer that keeps every finished trace in memory for the report.
+    """
+    def __init__(self):
+        super().__init__()
+        self.traces = []
+
+    def finish_turn(self, trace):
+        super().finish_turn(trace)
+        with self.lock:
+            self.traces.append(trace)
+
+
+def load_script(path: str, turns: int) -> list:
+    """
+    Load the user turns from a JSONL file ({"user": "..."} per line) or use the default script.
+    """
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            script = [json.loads(line)["user"] for line in f if line.strip()]
+    else:
+        script = DEFAULT_SCRIPT
+    return [script[i % len(script)] for i in range(turns)]
+
+
+def start_chat(config_path: str, character: str, tracer: TurnTracer, language: str, translator) -> ChatBase:
+    chat = ChatBase(config_path)
+    chat.tracer = tracer
+    if language != "en":
+        chat.set_memory_translator(translator.translate_user_to_en, language)
+    chat.load_chat_config(character, language)
+    chat.setup_conversation()
+    chat.warm_up()
+    return chat
+
+
+def setup_controller(controller, config_path: str, character: str, tracer: TurnTracer, language: str,
+                     with_mic: bool = False) -> None:
+    """
+    Give a controller the real translator, TTS and mic wrappers and a started chat, as its __init__ does.
+
+    Audio files go to the benchmark's temporary directory, one per session. The mic
+    is only created for the mic mode.
+    """
+    controller.input_language = language
+    controller.translator = PhraseTranslator(user_lang=language)
+    controller.chat = start_chat(config_path, character, tracer, language, controller.translator)
+    config = controller.chat.register_model.config
+    controller.async_translator = AsyncPhraseTranslator.from_config(controller.translator, config)
+    directory = os.path.dirname(config_path)
+    controller.tts_converter = TextToSpeechConverter(language)
+    controller.tts_converter.output_path = os.path.join(directory, f"output_{controller.chat.session_id}.mp3")
+    controller.mic_converter = None
+    if not with_mic:
+        return
+    controller.mic_converter = MicConverter.from_config(config, language)
+    controller.mic_converter.output_filename = os.path.join(directory, f"input_{controller.chat.session_id}.wav")
+
+
+def run_screen_session(config_path, character, script, args, tracer, end_to_end):
+    from src.controller.controller_chat_screen import ScreenChatController
+
+    controller = ScreenChatController.__new__(ScreenChatController)
+    setup_controller(controller, config_path, character, tracer, args.language, with_mic=args.mode == "mic")
+    controller.selected_character = character
+    controller.view = StubChatView()
+    controller.session = ChatSession(controller.process_user_message)
+
+    for user_message in script:
+        start_time = time.perf_counter()
+        input_timings = None
+        if args.mode == "mic":
+            fake_backends.set_utterance(user_message, args.utterance_chunks)
+            user_message = controller.mic_converter.record_audio()
+            input_timings = dict(controller.mic_converter.last_timings)
+        controller.session.submit(user_message, input_timings).result()
+        end_to_end.append(time.perf_counter() - start_time)
+    controller.session.close()
+    controller.chat.close()
+
+
+def run_terminal_session(config_path, character, script, args, tracer, end_to_end):
+    from src.controller.controller_terminal import TerminalChatController
+
+    controller = TerminalChatController.__new__(TerminalChatController)
+    setup_controller(controller, config_path, character, tracer, args.language)
+    controller.view = StubTerminalView(script)
+    controller.input_method = "keyboard"
+    controller.speculative_candidates = 0
+    controller.candidate_executor = None
+    controller.pending_candidates = deque()
+    controller.candidates_cancelled = None
+
+    start_time = time.perf_counter()
+    controller.run()
+    end_to_end.append((time.perf_counter() - start_time) / max(1, len(script)))
+
+
+def percentiles(values) -> dict:
+    """
+    Return the p50, p95 and p99 of a list of durations, in milliseconds.
+    """
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    if len(values) == 1:
+        return {"p50": values[0] * 1000, "p95": values[0] * 1000, "p99": values[0] * 1000}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000, "p99": cuts[98] * 1000}
+
+
+def rss_megabytes():
+    """
+    Return the peak resident set size of the process in MB, when the platform reports it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmark(args) -> dict:
+    fake_backends.install(args.translate_latency, args.tts_latency, args.decode_latency)
+    server, config_path, directory = make_stub_environment(latency=args.model_latency)
+    tracer = CollectingTracer()
+    script = load_script(args.script, args.turns)
+    end_to_end = []
+    run_session = run_terminal_session if args.mode == "terminal" else run_screen_session
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(run_session, config_path, args.character, script, args, tracer, end_to_end)
+            for _ in range(args.sessions)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start_time
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Speech is synthesized in background threads: wait for the last traces and for the audio files to be removed
+    turns = args.sessions * len(script)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and (
+            len(tracer.traces) < turns or glob.glob(os.path.join(directory.name, "output_*.mp3"))):
+        time.sleep(0.05)
+
+    server.stop()
+    directory.cleanup()
+
+    stages = {}
+    for trace in tracer.traces:
+        for name, seconds in trace.spans.items():
+            stages.setdefault(name, []).append(seconds)
+
+    return {
+        "mode": args.mode,
+        "language": args.language,
+        "sessions": args.sessions,
+        "turns": turns,
+        "elapsed_seconds": elapsed,
+        "throughput_turns_per_second": turns / elapsed,
+        "end_to_end_ms": percentiles(end_to_end),
+        "stages_ms": {name: percentiles(values) for name, values in sorted(stages.items())},
+        "memory": {"tracemalloc_peak_mb": peak_traced / (1024 * 1024), "rss_peak_mb": rss_megabytes()}
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"mode={result['mode']} language={result.get('language', 'en')} sessions={result['sessions']} turns={result['turns']} "
+          f"elapsed={result['elapsed_seconds']:.2f}s throughput={result['throughput_turns_per_second']:.1f} turns/s")
+    print(f"{'stage':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(result["stages_ms"].items()) + [("end_to_end", result["end_to_end_ms"])]
+    for name, p in rows:
+        print(f"{name:<24}{p['p50']:>10.1f}{p['p95']:>10.1f}{p['p99']:>10.1f}")
+    memory = result["memory"]
+    rss = f"{memory['rss_peak_mb']:.1f} MB" if memory["rss_peak_mb"] is not None else "n/a"
+    print(f"memory: tracemalloc peak {memory['tracemalloc_peak_mb']:.2f} MB, RSS peak {rss}")
+
+
+def compare_with_baseline(result: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> bool:
+    """
+    Print the change of each metric against the baseline.
+
+    Latency changes smaller than min_delta_ms are never flagged, so sub-millisecond
+    stages do not fail the comparison on noise.
+
+    Returns:
+        bool: True if no metric regressed by more than max_regression (a fraction).
+    """
+    ok = True
+    metrics = [("throughput_turns_per_second", result["throughput_turns_per_second"],
+                baseline["throughput_turns_per_second"], False)]
+    for key in ("p50", "p95", "p99"):
+        metrics.append((f"end_to_end {key}", result["end_to_end_ms"][key], baseline["end_to_end_ms"][key], True))
+    for name, p in result["stages_ms"].items():
+        if name in baseline["stages_ms"]:
+            metrics.append((f"{name} p95", p["p95"], baseline["stages_ms"][name]["p95"], True))
+
+    print("\ncomparison with baseline:")
+    for name, current, previous, lower_is_better in metrics:
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        regression = change if lower_is_better else -change
+        noise = lower_is_better and abs(current - previous) < min_delta_ms
+        flag = "REGRESSION" if regression > max_regression and not noise else ""
+        ok = ok and not flag
+        print(f"  {name:<32}{previous:>10.2f} -> {current:>10.2f} ({change:+.1%}) {flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["screen", "mic", "terminal"], default="screen")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--language", choices=["pt", "en"], default="pt",
+                        help="User language; pt translates every turn both ways")
+    parser.add_argument("--character", default="Emilie")
+    parser.add_argument("--script", help="JSONL file with one {\"user\": ...} turn per line")
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--translate-latency", type=float, default=0.01)
+    parser.add_argument("--tts-latency", type=float, default=0.02)
+    parser.add_argument("--decode-latency", type=float, default=0.02)
+    parser.add_argument("--utterance-chunks", type=int, default=40,
+                        help="Audio chunks (1024 frames at 44.1 kHz) recorded per utterance in mic mode")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results with this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nbaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if not compare_with_baseline(result, baseline, args.max_regression, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Memory benchmark: footprint of each additional chat session, against a stub Ollama server.
+
+Opens sessions in steps (ChatBase plus the session's PhraseTranslator and
+TextToSpeechConverter), runs a few turns in each, and after every step
+measures the memory traced by tracemalloc and the resident set size of the
+process. The cost of one more session is the growth since the first session,
+which already paid for everything shared process-wide (model registration,
+router, templates, executors). The allocation sites that grew the most are
+listed from a tracemalloc snapshot diff.
+
+Usage:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --steps 1 10 50 100 200 --turns 4 --top 10
+"""
+import os
+import gc
+import json
+import argparse
+import tracemalloc
+from benchmarks.stubs import make_stub_environment
+from benchmarks.bench_conversation import DEFAULT_SCRIPT
+from src.models.chat_base import ChatBase
+from src.models.translate_phrase import PhraseTranslator
+from src.models.tts_converter import TextToSpeechConverter
+
+
+def rss_bytes():
+    """
+    Return the current resident set size of the process, when /proc reports it.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def open_session(config_path: str, character: str, turns: int) -> tuple:
+    chat = ChatBase(config_path)
+    chat.load_chat_config(character, "en")
+    chat.setup_conversation()
+    for i in range(turns):
+        chat.add_message(chat.user, DEFAULT_SCRIPT[i % len(DEFAULT_SCRIPT)])
+        chat.add_message(chat.char_name, chat.get_response(chat.update_memory()))
+    return chat, PhraseTranslator("pt", "en"), TextToSpeechConverter("en")
+
+
+def measure() -> tuple:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0], rss_bytes()
+
+
+def run_benchmark(args) -> dict:
+    server, config_path, directory = make_stub_environment(latency=0.0)
+    sessions = []
+    steps = []
+
+    tracemalloc.start(args.frames)
+    # The first session pays for the shared objects; later sessions are measured against it
+    sessions.append(open_session(config_path, args.character, args.turns))
+    first_traced, first_rss = measure()
+    first_snapshot = tracemalloc.take_snapshot()
+
+    for count in sorted(set(args.steps)):
+        while len(sessions) < count:
+            sessions.append(open_session(config_path, args.character, args.turns))
+        traced, rss = measure()
+        added = len(sessions) - 1
+        steps.append({
+            "sessions": len(sessions),
+            "traced_mb": traced / (1024 * 1024),
+            "rss_mb": rss / (1024 * 1024) if rss is not None else None,
+            "traced_kb_per_session": (traced - first_traced) / added / 1024 if added else None,
+            "rss_kb_per_session": (rss - first_rss) / added / 1024 if added and rss is not None else None
+        })
+
+    top = tracemalloc.take_snapshot().compare_to(first_snapshot, "lineno")[:args.top]
+    tracemalloc.stop()
+
+    shared = all(
+        chat.register_model is sessions[0][0].register_model and chat.template is sessions[0][0].template
+        for chat, _, _ in sessions
+    )
+    for chat, _, _ in sessions:
+        chat.close()
+    server.stop()
+    directory.cleanup()
+
+    return {
+        "turns_per_session": args.turns,
+        "shared_registration": shared,
+        "steps": steps,
+        "top_allocations": [
+            {"site": str(stat.traceback[0]), "size_kb": stat.size_diff / 1024, "count": stat.count_diff}
+            for stat in top
+        ]
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"turns per session: {result['turns_per_session']}, "
+          f"registration and templates shared: {result['shared_registration']}")
+    print(f"{'sessions':>10}{'traced MB':>12}{'RSS MB':>10}{'traced KB/session':>20}{'RSS KB/session':>17}")
+
+    def number(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    for step in result["steps"]:
+        print(f"{step['sessions']:>10}{step['traced_mb']:>12.2f}{number(step['rss_mb']):>10}"
+              f"{number(step['traced_kb_per_session']):>20}{number(step['rss_kb_per_session']):>17}")
+    print("\nlargest growth since the first session:")
+    for allocation in result["top_allocations"]:
+        print(f"  {allocation['size_kb']:>10.1f} KB {allocation['count']:>8} blocks  {allocation['site']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="*", default=[1, 10, 50, 100, 200],
+                        help="Session counts at which memory is measured")
+    parser.add_argument("--turns", type=int, default=4, help="Turns run in each session")
+    parser.add_argument("--character", default="Emilie")
+    parser.add_argument("--top", type=int, default=10, help="Number of allocation sites to list")
+    parser.add_argument("--frames", type=int, default=1, help="Traceback depth recorded by tracemalloc")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark of BackendRouter against several local stub Ollama servers.
+
+Runs concurrent chat sessions through the router, stops one backend half way
+to exercise failover, and reports the request distribution, affinity hits and
+latency percentiles.
+
+Usage:
+    python -m benchmarks.bench_router --backends 3 --sessions 12 --turns 10
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stub_ollama import StubOllamaServer
+from src.models.backend_router import BackendRouter
+
+
+def run_session(router, session_id, turns, latencies, placements):
+    for turn in range(turns):
+        start_time = time.perf_counter()
+        response = router.post(
+            "/api/generate",
+            {"model": "stub-model", "prompt": f"turn {turn}", "stream": False},
+            session_id=session_id,
+            timeout=10
+        )
+        latencies.append(time.perf_counter() - start_time)
+        if response.status_code == 200:
+            placements.append((session_id, router.affinity.get(session_id).base_url))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", type=int, default=3)
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    servers = [StubOllamaServer(latency=args.latency).start() for _ in range(args.backends)]
+    router = BackendRouter([server.base_url for server in servers], retry_interval=60)
+
+    latencies = []
+    placements = []
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(run_session, router, f"session-{i}", args.turns, latencies, placements)
+            for i in range(args.sessions)
+        ]
+        if args.backends > 1:
+            time.sleep(args.turns * args.latency / 2)
+            servers[0].stop()
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start_time
+
+    moves = 0
+    last_backend = {}
+    for session_id, backend in placements:
+        if last_backend.get(session_id, backend) != backend:
+            moves += 1
+        last_backend[session_id] = backend
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"requests: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"latency p50={quantiles[49] * 1000:.1f}ms p95={quantiles[94] * 1000:.1f}ms p99={quantiles[98] * 1000:.1f}ms")
+    print(f"session moves (failover): {moves}")
+    for server in servers:
+        print(f"  {server.base_url}: {server.requests_served} generations")
+    for backend in router.status():
+        print(f"  {backend}")
+
+    for server in servers[1:]:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of RequestScheduler in front of a stub Ollama server.
+
+Many sessions send a mix of short and long prompts, some of them identical
+and deterministic, through a scheduler limited to --max-in-flight requests.
+Reports queue wait versus generation time and the number of deduplicated
+requests.
+
+Usage:
+    python -m benchmarks.bench_scheduler --sessions 20 --turns 5 --max-in-flight 2
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from benchmarks.stub_ollama import StubOllamaServer
+from src.models.request_scheduler import RequestScheduler
+
+
+def run_session(scheduler, server, session_id, turns, rng):
+    latencies = []
+    for turn in range(turns):
+        if rng.random() < 0.3:
+            prompt, key = "Hello!", "greeting"
+        else:
+            prompt, key = "word " * rng.choice([10, 100, 1000]), None
+        start_time = time.perf_counter()
+        future = scheduler.submit(
+            session_id,
+            lambda: requests.post(f"{server.base_url}/api/generate", json={"prompt": prompt}, timeout=30),
+            size=len(prompt),
+            key=key
+        )
+        future.result()
+        latencies.append((len(prompt), time.perf_counter() - start_time))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--max-in-flight", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = StubOllamaServer(latency=args.latency).start()
+    scheduler = RequestScheduler(args.max_in_flight)
+    rng = random.Random(0)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(run_session, scheduler, server, f"session-{i}", args.turns, random.Random(rng.random()))
+            for i in range(args.sessions)
+        ]
+        results = [latency for future in futures for latency in future.result()]
+    elapsed = time.perf_counter() - start_time
+
+    stats = scheduler.stats()
+    print(f"requests: {len(results)} in {elapsed:.2f}s, generations on server: {server.requests_served}")
+    print(f"deduplicated: {stats['deduplicated']}")
+    for name in ("queue_wait_seconds", "generation_seconds"):
+        summary = stats[name]
+        print(f"{name}: mean={summary['mean'] * 1000:.1f}ms p50={summary['p50'] * 1000:.1f}ms p95={summary['p95'] * 1000:.1f}ms")
+    for size in sorted({size for size, _ in results}):
+        latencies = sorted(latency for s, latency in results if s == size)
+        print(f"  prompt {size:>5} chars: median end-to-end {latencies[len(latencies) // 2] * 1000:.1f}ms")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Startup benchmark: import time of the entry points, measured with `python -X importtime`.
+
+Imports the controller module behind each entry point in a fresh interpreter,
+takes the median over several runs, and checks it against a time budget. It
+also fails if a heavy dependency (mic, speech, translation, NumPy) is imported
+at startup instead of when its feature is first used. Results can be saved as a
+baseline and later runs compared against it.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 250 --save-baseline startup_baseline.json
+    python -m benchmarks.bench_startup --baseline startup_baseline.json --max-regression 0.20
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Entry point -> module it imports, and packages that must not be loaded at startup
+ENTRY_POINTS = {
+    "main_terminal": (
+        "src.controller.controller_terminal",
+        ["vosk", "pyaudio", "keyboard", "edge_tts", "playsound", "argostranslate", "numpy", "tkinter"]
+    ),
+    "main_gui": (
+        "src.controller.controller_config_screen",
+        ["vosk", "pyaudio", "keyboard", "edge_tts", "playsound", "argostranslate", "numpy"]
+    ),
+    "main_batch": (
+        "src.controller.controller_batch",
+        ["vosk", "pyaudio", "keyboard", "edge_tts", "playsound", "argostranslate", "numpy", "tkinter"]
+    ),
+}
+
+
+def measure(module: str) -> tuple:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: The cumulative import time in milliseconds and a {module: cumulative ms} dict.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        modules[name.strip()] = int(cumulative) / 1000
+    return modules.get(module, 0.0), modules
+
+
+def run_benchmark(args) -> dict:
+    results = {}
+    for entry_point in args.entry_points:
+        module, forbidden = ENTRY_POINTS[entry_point]
+        runs = [measure(module) for _ in range(args.runs)]
+        modules = runs[-1][1]
+        top_level = {name: ms for name, ms in modules.items() if "." not in name and name != module}
+        results[entry_point] = {
+            "module": module,
+            "median_ms": statistics.median(total for total, _ in runs),
+            "heaviest": sorted(top_level.items(), key=lambda item: -item[1])[:args.top],
+            "forbidden_loaded": [name for name in forbidden if name in modules]
+        }
+    return results
+
+
+def check(results: dict, budget_ms: float, baseline: dict, max_regression: float) -> bool:
+    """
+    Print the report and return True if every entry point is within budget.
+    """
+    ok = True
+    for entry_point, result in results.items():
+        problems = []
+        if result["median_ms"] > budget_ms:
+            problems.append(f"over the {budget_ms:.0f} ms budget")
+        if result["forbidden_loaded"]:
+            problems.append(f"imports {', '.join(result['forbidden_loaded'])} at startup")
+        previous = (baseline or {}).get(entry_point, {}).get("median_ms")
+        change = ""
+        if previous:
+            ratio = (result["median_ms"] - previous) / previous
+            change = f" (baseline {previous:.1f} ms, {ratio:+.1%})"
+            if ratio > max_regression:
+                problems.append(f"regressed more than {max_regression:.0%}")
+        ok = ok and not problems
+
+        print(f"{entry_point}: {result['median_ms']:.1f} ms{change} {'FAIL: ' + '; '.join(problems) if problems else 'ok'}")
+        for name, ms in result["heaviest"]:
+            print(f"    {name:<28}{ms:>8.1f} ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry-points", nargs="*", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Number of heaviest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results with this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.20)
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    ok = check(results, args.budget_ms, baseline, args.max_regression)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nbaseline saved to {args.save_baseline}")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Translation benchmark: blocking vs async translation calls inside an event loop.
+
+Runs concurrent sessions in one asyncio event loop. Each turn translates the
+user's message while the prompt is assembled, then translates the response
+back. In "blocking" mode PhraseTranslator is called directly from the loop,
+as a server would without the async client; in "async" mode the calls go
+through AsyncPhraseTranslator and its shared executor. A ticker task measures
+how long the loop was stalled, and the turn latency and throughput of both
+modes are compared.
+
+Usage:
+    python -m benchmarks.bench_translation
+    python -m benchmarks.bench_translation --sessions 16 --turns 10 --latency 0.05 --workers 4
+"""
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from benchmarks.stubs import StubTranslator
+from src.models.async_translator import AsyncPhraseTranslator, TranslationExecutor
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+async def ticker(stop: asyncio.Event, interval: float, lags: list) -> None:
+    """
+    Record how late the loop wakes this task up.
+    """
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def session(translator, client, args, latencies: list) -> None:
+    for turn in range(args.turns):
+        start = time.perf_counter()
+        message = f"Mensagem {turn} da sessão"
+        if client is None:
+            translated = translator.translate_user_to_en(message)
+            await asyncio.sleep(args.assembly)
+            translator.translate_en_to_user(translated)
+        else:
+            translated, _ = await asyncio.gather(
+                client.translate_user_to_en(message), asyncio.sleep(args.assembly)
+            )
+            await client.translate_en_to_user(translated)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_mode(mode: str, args) -> dict:
+    translator = StubTranslator(latency=args.latency)
+    client = None
+    if mode == "async":
+        executor = TranslationExecutor(args.workers, args.max_pending)
+        client = AsyncPhraseTranslator(translator, executor, timeout=args.timeout)
+
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, 0.005, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(session(translator, client, args, latencies) for _ in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+
+    result = {
+        "mode": mode,
+        "turns_per_second": len(latencies) / elapsed,
+        "turn_p50_ms": statistics.median(latencies) * 1000,
+        "turn_p95_ms": percentile(latencies, 0.95) * 1000,
+        "loop_lag_max_ms": max(lags, default=0.0) * 1000,
+        "loop_lag_p95_ms": percentile(lags, 0.95) * 1000
+    }
+    if client is not None:
+        result["executor"] = executor.stats()
+        executor.executor.shutdown()
+    return result
+
+
+def print_report(results: list) -> None:
+    print(f"{'mode':>10}{'turns/s':>10}{'turn p50 ms':>14}{'turn p95 ms':>14}{'loop lag p95':>15}{'loop lag max':>15}")
+    for result in results:
+        print(f"{result['mode']:>10}{result['turns_per_second']:>10.1f}{result['turn_p50_ms']:>14.1f}"
+              f"{result['turn_p95_ms']:>14.1f}{result['loop_lag_p95_ms']:>15.1f}{result['loop_lag_max_ms']:>15.1f}")
+        if "executor" in result:
+            print(f"{'':>10}executor: {result['executor']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per stub translation")
+    parser.add_argument("--assembly", type=float, default=0.02, help="Seconds of prompt assembly per turn")
+    parser.add_argument("--workers", type=int, default=0, help="Translation threads (0: number of cores)")
+    parser.add_argument("--max-pending", type=int, default=0, help="Translations running or queued (0: 4 per thread)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for a translation")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run_mode(mode, args)) for mode in ("blocking", "async")]
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Fake speech and translation libraries for benchmarks.
+
+install() puts stand-ins for argostranslate, edge_tts, playsound, vosk, pyaudio
+and keyboard into sys.modules, so PhraseTranslator, TextToSpeechConverter and
+MicConverter run their own code (model loading and sharing, the audio ring
+buffer, WAV writing, chunked decoding, the synthesis thread) against backends
+with fixed latencies instead of models, a network service and a microphone.
+
+The fake microphone records an utterance while the fake SPACE key is held
+for a given number of audio chunks, and the fake recognizer returns the text
+set with set_utterance in the same thread.
+"""
+import sys
+import json
+import time
+import types
+import asyncio
+import threading
+
+_latencies = {"translate": 0.01, "tts": 0.02, "decode": 0.02, "chunk": 0.0}
+_utterance = threading.local()
+CHUNK_FRAMES = 1024
+
+
+def set_utterance(text: str, chunks: int = 40) -> None:
+    """
+    Script the next recording of this thread: SPACE is held for chunks reads and the recognizer hears text.
+    """
+    _utterance.text = text
+    _utterance.chunks_left = chunks
+
+
+class FakeTranslation:
+    def __init__(self, from_code: str, to_code: str):
+        self.from_code = from_code
+        self.to_code = to_code
+
+    def translate(self, text: str) -> str:
+        time.sleep(_latencies["translate"])
+        return text
+
+
+class FakeLanguage:
+    def __init__(self, code: str):
+        self.code = code
+
+    def get_translation(self, to_language: "FakeLanguage") -> FakeTranslation:
+        return FakeTranslation(self.code, to_language.code)
+
+
+class FakeCommunicate:
+    def __init__(self, text: str, voice: str):
+        self.text = text
+        self.voice = voice
+
+    async def save(self, path: str) -> None:
+        await asyncio.sleep(_latencies["tts"])
+        with open(path, "wb") as f:
+            f.write(b"ID3")
+
+
+class FakeStream:
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        time.sleep(_latencies["chunk"])
+        _utterance.chunks_left = max(0, getattr(_utterance, "chunks_left", 0) - 1)
+        return bytes(frames * 2)
+
+    def stop_stream(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FakePyAudio:
+    def open(self, **kwargs) -> FakeStream:
+        return FakeStream()
+
+    def get_sample_size(self, sample_format) -> int:
+        return 2
+
+    def terminate(self) -> None:
+        pass
+
+
+class FakeRecognizer:
+    def __init__(self, model, sample_rate: int):
+        self.model = model
+        self.sample_rate = sample_rate
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        if not isinstance(data, bytes):
+            raise TypeError("initializer for ctype 'char *' must be a bytes")
+        return False
+
+    def Result(self) -> str:
+        return json.dumps({"text": ""})
+
+    def FinalResult(self) -> str:
+        time.sleep(_latencies["decode"])
+        return json.dumps({"text": getattr(_utterance, "text", "")})
+
+
+def is_pressed(key: str) -> bool:
+    return getattr(_utterance, "chunks_left", 0) > 0
+
+
+def install(translate_latency: float = 0.01, tts_latency: float = 0.02, decode_latency: float = 0.02,
+            chunk_latency: float = 0.0) -> None:
+    """
+    Replace the speech and translation libraries with the fakes.
+
+    Args:
+        translate_latency (float, optional): Seconds per translation. Defaults to 0.01.
+        tts_latency (float, optional): Seconds per speech synthesis. Defaults to 0.02.
+        decode_latency (float, optional): Seconds per Vosk decode. Defaults to 0.02.
+        chunk_latency (float, optional): Seconds per captured audio chunk. Defaults to 0.0.
+    """
+    _latencies.update(translate=translate_latency, tts=tts_latency, decode=decode_latency, chunk=chunk_latency)
+
+    argostranslate = types.ModuleType("argostranslate")
+    package = types.ModuleType("argostranslate.package")
+    package.update_package_index = lambda: None
+    package.get_available_packages = lambda: []
+    package.install_from_path = lambda path: None
+    translate = types.ModuleType("argostranslate.translate")
+    translate.load_installed_languages = lambda: [FakeLanguage("en"), FakeLanguage("pt")]
+    argostranslate.package = package
+    argostranslate.translate = translate
+
+    edge_tts = types.ModuleType("edge_tts")
+    edge_tts.Communicate = FakeCommunicate
+    playsound = types.ModuleType("playsound")
+    playsound.playsound = lambda path: None
+
+    vosk = types.ModuleType("vosk")
+    vosk.Model = lambda path: types.SimpleNamespace(path=path)
+    vosk.SetLogLevel = lambda level: None
+    vosk.KaldiRecognizer = FakeRecognizer
+
+    pyaudio = types.ModuleType("pyaudio")
+    pyaudio.paInt16 = 8
+    pyaudio.PyAudio = FakePyAudio
+    keyboard = types.ModuleType("keyboard")
+    keyboard.is_pressed = is_pressed
+
+    sys.modules.update({
+        "argostranslate": argostranslate,
+        "argostranslate.package": package,
+        "argostranslate.translate": translate,
+        "edge_tts": edge_tts,
+        "playsound": playsound,
+        "vosk": vosk,
+        "pyaudio": pyaudio,
+        "keyboard": keyboard
+    })
@@ -0,0 +1,198 @@
+import json
+import zlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOllamaServer:
+    """
+    A local stand-in for the Ollama HTTP API used by benchmarks.
+
+    It answers /api/version, /api/tags, /api/show, /api/generate and /api/chat with a
+    canned reply after a configurable latency, so routing, caching and
+    scheduling can be measured without a GPU. /api/embeddings returns a
+    hashed bag-of-words vector, so texts sharing words are similar. Templated
+    /api/generate requests return a context array of hashed words, extended
+    by the context they were sent.
+
+    Attributes:
+        latency (float): Seconds each generation takes.
+        reply (str): The text returned by every generation.
+        model_name (str): The model the server claims to have.
+        requests_served (int): Number of generations answered.
+        streams_cancelled (int): Number of streamed generations the client closed early.
+    """
+    def __init__(self, latency: float = 0.05, reply: str = "Hello there, how are you today?",
+                 model_name: str = "stub-model", port: int = 0):
+        self.latency = latency
+        self.reply = reply
+        self.model_name = model_name
+        self.requests_served = 0
+        self.streams_cancelled = 0
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, chunks):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(json.dumps(chunk).encode() + b"\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    with stub.lock:
+                        stub.streams_cancelled += 1
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send_json(200, {"version": "0.0.0-stub"})
+                elif self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": stub.model_name, "digest": "stub"}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self._read_json()
+                if self.path == "/api/show":
+                    if body.get("model") == stub.model_name:
+                        self._send_json(200, {"modelfile": "FROM stub"})
+                    else:
+                        self._send_json(404, {"error": "model not found"})
+                elif self.path in ("/api/generate", "/api/chat") and body.get("stream") is True:
+                    self._send_stream(stub.stream(body, chat=self.path == "/api/chat"))
+                elif self.path == "/api/generate":
+                    self._send_json(200, stub.generate(body))
+                elif self.path == "/api/chat":
+                    self._send_json(200, stub.chat(body))
+                elif self.path == "/api/embeddings":
+                    self._send_json(200, {"embedding": stub.embed(body.get("prompt", ""))})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL the stub listens on.
+        """
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def generate(self, body: dict) -> dict:
+        """
+        Produce a canned generation result shaped like Ollama's response JSON.
+        """
+        if not body.get("prompt"):
+            return {"model": body.get("model"), "response": "", "done": True, "load_duration": 0}
+
+        start_time = time.perf_counter()
+        time.sleep(self.latency)
+        with self.lock:
+            self.requests_served += 1
+        duration = int((time.perf_counter() - start_time) * 1e9)
+        result = {
+            "model": body.get("model"),
+            "response": self.reply,
+            "done": True,
+            "prompt_eval_count": len(body.get("prompt", "").split()),
+            "prompt_eval_duration": duration // 4,
+            "eval_count": len(self.reply.split()),
+            "eval_duration": duration - duration // 4,
+            "total_duration": duration
+        }
+        if "messages" not in body and not body.get("raw"):
+            result["context"] = self.context(body, self.reply)
+        return result
+
+    @staticmethod
+    def context(body: dict, response: str) -> list:
+        """
+        Produce the context array of a generation: the sent context, then the prompt and response words hashed.
+        """
+        words = (body.get("prompt", "") + " " + response).split()
+        return (body.get("context") or []) + [zlib.crc32(word.encode()) for word in words]
+
+    def chat(self, body: dict) -> dict:
+        """
+        Produce a canned /api/chat result, answering the messages like a generation of their text.
+        """
+        prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+        result = self.generate({**body, "prompt": prompt})
+        result["message"] = {"role": "assistant", "content": result.pop("response")}
+        return result
+
+    def stream(self, body: dict, chat: bool = False):
+        """
+        Yield a streamed generation word by word, honoring options.num_predict.
+        """
+        tokens = [word + " " for word in self.reply.split()]
+        tokens[-1] = tokens[-1].rstrip()
+        limit = (body.get("options") or {}).get("num_predict") or len(tokens)
+        start_time = time.perf_counter()
+        emitted = 0
+        for token in tokens[:limit]:
+            time.sleep(self.latency / len(tokens))
+            emitted += 1
+            yield {"message": {"role": "assistant", "content": token}, "done": False} if chat \
+                else {"response": token, "done": False}
+        with self.lock:
+            self.requests_served += 1
+        duration = int((time.perf_counter() - start_time) * 1e9)
+        final = {
+            "done": True,
+            "done_reason": "length" if emitted < len(tokens) else "stop",
+            "eval_count": emitted,
+            "eval_duration": duration,
+            "total_duration": duration
+        }
+        final.update({"message": {"role": "assistant", "content": ""}} if chat else {"response": ""})
+        if not chat and not body.get("raw"):
+            final["context"] = self.context(body, "".join(tokens[:emitted]))
+        yield final
+
+    def embed(self, text: str, dimension: int = 64) -> list:
+        """
+        Produce a deterministic embedding: word counts hashed into a fixed number of buckets.
+        """
+        vector = [0.0] * dimension
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip(".,!?").encode()) % dimension] += 1.0
+        return vector
+
+    def start(self) -> "StubOllamaServer":
+        """
+        Serve requests from a background thread.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the listening socket.
+        """
+        self.server.shutdown()
+        self.server.server_close()
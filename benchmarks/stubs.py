@@ -0,0 +1,109 @@
+import os
+import time
+import tempfile
+from benchmarks.stub_ollama import StubOllamaServer
+
+
+class StubTranslator:
+    """
+    A stand-in for PhraseTranslator that returns the phrase after a fixed latency.
+    """
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+
+    def translate_user_to_en(self, phrase: str) -> str:
+        time.sleep(self.latency)
+        return phrase
+
+    def translate_en_to_user(self, phrase: str) -> str:
+        time.sleep(self.latency)
+        return phrase
+
+
+class StubWindow:
+    """
+    A stand-in for the Tk window that runs scheduled callbacks immediately.
+    """
+    def after(self, delay, callback, *args):
+        callback(*args)
+
+
+class StubChatView:
+    """
+    A stand-in for ChatView that records the displayed messages.
+    """
+    def __init__(self):
+        self.window = StubWindow()
+        self.messages = []
+
+    def display_ai_message(self, ai_message):
+        self.messages.append(ai_message)
+
+    def update_chat_history(self, message):
+        self.messages.append(message)
+
+    def send_message(self):
+        pass
+
+
+class StubTerminalView:
+    """
+    A stand-in for TerminalView that feeds scripted input and records the output.
+    """
+    def __init__(self, inputs):
+        self.inputs = list(inputs)
+        self.messages = []
+
+    def display_message(self, message):
+        self.messages.append(message)
+
+    def get_input(self, prompt):
+        if prompt.endswith("Switch: "):
+            return "n"
+        return self.inputs.pop(0) if self.inputs else "exit"
+
+    def display_character_info(self, character_info):
+        pass
+
+
+def write_stub_config(directory: str, server: StubOllamaServer, extra: str = "") -> str:
+    """
+    Write a config.ini (and modelfile) that points every backend setting at the stub server.
+
+    Args:
+        directory (str): Directory receiving the files.
+        server (StubOllamaServer): The running stub server.
+        extra (str, optional): Additional config.ini sections. Defaults to "".
+
+    Returns:
+        str: The path of the config file.
+    """
+    modelfile_path = os.path.join(directory, "Modelfile.txt")
+    with open(modelfile_path, "w") as f:
+        f.write("FROM ./stub.gguf\n")
+
+    config_path = os.path.join(directory, "config.ini")
+    with open(config_path, "w") as f:
+        f.write(
+            "[ModelLLM]\n"
+            f"name_model = {server.model_name}\n"
+            f"path_model = {modelfile_path}\n"
+            f"registry_path = {os.path.join(directory, 'model_registry.json')}\n"
+            "\n[OllamaBackends]\n"
+            f"urls = {server.base_url}\n"
+            f"{extra}"
+        )
+    return config_path
+
+
+def make_stub_environment(latency: float = 0.05, extra_config: str = ""):
+    """
+    Start a stub Ollama server and write a config for it in a temporary directory.
+
+    Returns:
+        tuple: The server, the config path and the TemporaryDirectory keeping the files alive.
+    """
+    server = StubOllamaServer(latency=latency).start()
+    directory = tempfile.TemporaryDirectory()
+    config_path = write_stub_config(directory.name, server, extra_config)
+    return server, config_path, directory
@@ -0,0 +1,22 @@
+import argparse
+from src.controller.controller_batch import BatchChatController
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scripted conversations without mic, TTS or GUI.")
+    parser.add_argument("script", help="JSONL file, one {\"id\", \"character\", \"turns\"} conversation per line")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file the results are appended to")
+    parser.add_argument("--characters", nargs="*", help="Characters to run conversations without \"character\" with")
+    parser.add_argument("--parallel", type=int, default=4, help="Maximum number of concurrent sessions")
+    parser.add_argument("--language", default="en", help="Output language code of the characters")
+    parser.add_argument("--config", default="config.ini")
+    args = parser.parse_args()
+
+    controller = BatchChatController(
+        args.script,
+        args.output,
+        characters=args.characters,
+        max_parallel=args.parallel,
+        output_language=args.language,
+        config_path=args.config
+    )
+    print(f"Batch report: {controller.run()}")
@@ -1,4 +1,4 @@
 from src.controller.controller_config_screen import ScreenConfigController
 
-controller = ScreenConfigController()
-
+if __name__ == "__main__":
+    controller = ScreenConfigController()
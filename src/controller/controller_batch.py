@@ -0,0 +1,171 @@
+from src.models.chat_base import ChatBase
+from src.models.text_filters import punctuate
+from src.models.model_register import RegisterModel
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import json
+import time
+
+
+class BatchChatController:
+    """
+    Controller for running scripted conversations headlessly.
+
+    Each line of the script file is one conversation:
+    {"id": "...", "character": "Emilie", "turns": ["Hello!", "..."]}. Without
+    "character", the conversation is run with every selected character. Sessions
+    run concurrently through ChatBase with at most max_parallel at a time, and each
+    finished conversation is appended to the output JSONL file right away. No mic,
+    TTS, translation or Tk module is loaded.
+    """
+
+    def __init__(self,
+                 script_path: str,
+                 output_path: str,
+                 characters: list = None,
+                 max_parallel: int = 4,
+                 output_language: str = 'en',
+                 config_path: str = "config.ini"):
+        """
+        Args:
+            script_path (str): JSONL file with one scripted conversation per line.
+            output_path (str): JSONL file the results are appended to.
+            characters (list, optional): Characters to run. Defaults to every character in chat_config.json.
+            max_parallel (int, optional): Maximum number of concurrent sessions. Defaults to 4.
+            output_language (str, optional): Language code of the character. Defaults to 'en'.
+            config_path (str, optional): Path of config.ini. Defaults to "config.ini".
+        """
+        self.script_path = script_path
+        self.output_path = output_path
+        self.max_parallel = max(1, max_parallel)
+        self.output_language = output_language
+        self.config_path = config_path
+
+        # Register the model once and keep it loaded for the whole run
+        self.register_model = RegisterModel.for_config(config_path)
+        self.anchor = ChatBase(config_path, register_model=self.register_model)
+        self.characters = characters or self.anchor.get_character_names()
+
+        self.write_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.conversations = 0
+        self.turns = 0
+        self.errors = 0
+
+    def jobs(self):
+        """
+        Yield (conversation, character) pairs, reading the script lazily.
+        """
+        with open(self.script_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    conversation = json.loads(line)
+                except ValueError as e:
+                    print(f"Skipping line {line_number} of {self.script_path}: {e}")
+                    continue
+                conversation.setdefault("id", str(line_number))
+                characters = [conversation["character"]] if conversation.get("character") else self.characters
+                for character in characters:
+                    yield conversation, character
+
+    def run_conversation(self, conversation: dict, character: str) -> dict:
+        """
+        Run one scripted conversation in a new session.
+
+        Returns:
+            dict: The conversation id, character, session id, timings and every turn.
+        """
+        chat = ChatBase(self.config_path, register_model=self.register_model)
+        chat.load_chat_config(character, self.output_language)
+        chat.setup_conversation()
+        # The anchor already loaded the model; pin it, so this session's requests keep it pinned
+        chat.hold_model()
+        start_time = time.perf_counter()
+        turns = []
+        try:
+            for user_message in conversation.get("turns", []):
+                turn_start = time.perf_counter()
+                trace = chat.tracer.start_turn(chat.session_id, chat.char_name)
+                user_message = punctuate(user_message)
+                chat.add_message(chat.user, user_message)
+                with trace.span("update_memory"):
+                    prompt = chat.update_memory()
+                with trace.span("get_response"):
+                    character_response = chat.get_response(prompt)
+                trace.record_model_stats(chat.last_response_stats)
+                chat.tracer.finish_turn(trace)
+                chat.add_message(chat.char_name, character_response)
+                turns.append({
+                    "user": user_message,
+                    "response": character_response,
+                    "seconds": time.perf_counter() - turn_start,
+                    "eval_count": chat.last_response_stats.get("eval_count")
+                })
+        finally:
+            chat.close()
+        return {
+            "id": conversation["id"],
+            "character": chat.char_name,
+            "session_id": chat.session_id,
+            "seconds": time.perf_counter() - start_time,
+            "turns": turns
+        }
+
+    def record(self, result: dict = None, error: Exception = None, conversation: dict = None,
+               character: str = None) -> None:
+        """
+        Append a finished conversation, or its error, to the output file.
+        """
+        if error is not None:
+            result = {"id": conversation["id"], "character": character, "error": str(error)}
+        with self.write_lock:
+            self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            self.output.flush()
+        with self.stats_lock:
+            if error is not None:
+                self.errors += 1
+            else:
+                self.conversations += 1
+                self.turns += len(result["turns"])
+
+    def run(self) -> dict:
+        """
+        Run every scripted conversation and return the throughput report.
+        """
+        self.anchor.warm_up()
+        start_time = time.perf_counter()
+        running = {}
+        with open(self.output_path, "a", encoding="utf-8") as self.output, \
+                ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="batch-session") as executor:
+            for conversation, character in self.jobs():
+                # Keep at most 2 * max_parallel conversations submitted, so the script is read lazily
+                while len(running) >= 2 * self.max_parallel:
+                    self.collect(running, wait(running, return_when=FIRST_COMPLETED).done)
+                future = executor.submit(self.run_conversation, conversation, character)
+                running[future] = (conversation, character)
+            self.collect(running, wait(running).done)
+        self.anchor.close()
+
+        elapsed = time.perf_counter() - start_time
+        return {
+            "conversations": self.conversations,
+            "turns": self.turns,
+            "errors": self.errors,
+            "elapsed_seconds": elapsed,
+            "conversations_per_second": self.conversations / elapsed if elapsed else None,
+            "turns_per_second": self.turns / elapsed if elapsed else None
+        }
+
+    def collect(self, running: dict, done) -> None:
+        """
+        Record finished conversations and remove them from the running set.
+        """
+        for future in done:
+            conversation, character = running.pop(future)
+            try:
+                self.record(future.result())
+            except Exception as e:
+                print(f"Error in conversation {conversation['id']} with {character}: {e}")
+                self.record(error=e, conversation=conversation, character=character)
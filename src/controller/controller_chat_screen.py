@@ -1,10 +1,13 @@
 from src.models.chat_base import ChatBase
+from src.models.text_filters import punctuate
+from src.models.chat_session import ChatSession
 from src.models.tts_converter import TextToSpeechConverter
 from src.models.mic_converter import MicConverter
 from src.models.translate_phrase import PhraseTranslator
+from src.models.async_translator import AsyncPhraseTranslator
+from src.models.speech_worker_pool import SpeechWorkerPool
 from src.view.view_chat_screen import ChatView
 import threading
-import keyboard
 import time
 
 
@@ -28,31 +31,66 @@ class ScreenChatController:
         self.selected_character = selected_character
         self.input_language = input_language
         
-        # Additional Components
+        # Additional Components; translation and decoding run in worker processes when enabled
+        speech_workers = SpeechWorkerPool.from_config(self.chat.register_model.config)
         self.tts_converter = TextToSpeechConverter(input_language)
-        self.mic_converter = MicConverter(input_language)
+        self.mic_converter = MicConverter.from_config(self.chat.register_model.config, input_language, pool=speech_workers)
         self.translator = PhraseTranslator(
             user_lang=input_language, 
+            pool=speech_workers
         )
-        # Load character configuration
+        # Turns translate in the process-wide translation pool, bounded and with a timeout
+        self.async_translator = AsyncPhraseTranslator.from_config(self.translator, self.chat.register_model.config)
+        # Load character configuration; the character memory is translated for other languages
+        if self.input_language != 'en':
+            self.chat.set_memory_translator(self.translator.translate_user_to_en, self.input_language)
         self.chat.load_chat_config(self.selected_character, self.input_language)
         self.chat.setup_conversation()
-        if self.input_language != 'en':
-            self.chat.memory = self.translator.translate_user_to_en(self.chat.memory)
 
         self.view = ChatView(selected_character, 
                              self.chat.user)
 
+        # Offer to resume the latest stored conversation and show what was restored
+        if self.resume_previous_session():
+            for message in self.chat.conversation:
+                self.view.update_chat_history(f"{message['role']}: {message['content']}")
+
+        # Load the model before the first turn and keep it loaded during the session
+        self.chat.warm_up()
+
+        # Turns from the keyboard and the mic run one at a time, in arrival order
+        self.session = ChatSession(self.process_user_message)
+
         # Start a thread to monitor mic input
         self.mic_input_thread = threading.Thread(target=self.monitor_mic_input, daemon=True)
         self.mic_input_thread.start()
 
-        # Set up message callback
-        self.view.set_message_callback(self.process_user_message)
+        # Set up message callback; the view stays disabled until the turn has run
+        self.view.set_message_callback(lambda user_message: self.session.submit(user_message).result())
 
         # Show the chat window
         self.view.show()
+
+        # Window closed: let queued turns finish, then release the model keep-alive
+        self.session.close()
+        self.chat.close()
+        print(f"Latency report: {self.chat.latency_report()}")
+        print(f"Render report: {self.view.render_report()}")
     
+    def resume_previous_session(self):
+        """
+        Offers to resume the latest stored session with the selected character.
+
+        Returns:
+            bool: True if a stored session was resumed, False otherwise.
+        """
+        if not self.chat.session_store:
+            return False
+        session_id = self.chat.session_store.latest_session(self.selected_character)
+        if not session_id or not self.view.ask_resume():
+            return False
+        return self.chat.resume_session(session_id, self.input_language)
+
     def monitor_mic_input(self):
         """
         Monitor microphone input when mic mode is active
@@ -60,6 +98,8 @@ class ScreenChatController:
         while True:
             # Check if mic input is active
             if self.view.mic_input_active:
+                # keyboard is only imported once mic mode is first used
+                import keyboard
                 # Wait for SPACE to be pressed
                 keyboard.wait('SPACE')
                 
@@ -69,53 +109,80 @@ class ScreenChatController:
                     
                     if user_message:
                         # Update chat history with the transcribed message
-                        self.view.window.after(0, self.view.update_chat_history, f"{self.chat.user}: {user_message}")
+                        self.view.update_chat_history(f"{self.chat.user}: {user_message}")
                     
-                        # Process the transcribed message
+                        # Queue the transcribed message; recording can resume while it is processed.
+                        # A reply still being generated is cut short, the user has moved on.
                         self.view.window.after(0, self.view.send_message)
-                        self.process_user_message(user_message)
+                        self.chat.cancel_generation()
+                        self.session.submit(user_message, dict(self.mic_converter.last_timings))
                 except Exception as e:
                     print(f"Error in mic input: {e}")
             
             # Small delay to prevent high CPU usage
             time.sleep(0.1)
 
-    def process_user_message(self, user_message: str):
+    def finish_trace(self, trace, tts_seconds):
+        """
+        Record the speech synthesis time and export the finished turn trace.
+
+        Args:
+            trace (TurnTrace): The trace of the turn.
+            tts_seconds (float): Seconds spent synthesizing the response audio.
+        """
+        trace.add_span("tts", tts_seconds)
+        self.chat.tracer.finish_turn(trace)
+
+    def process_user_message(self, user_message: str, input_timings: dict = None):
         """
         Process the user's message, translate if needed, get AI response, and display.
         
         Args:
             user_message (str): Message from the user
+            input_timings (dict, optional): Stage timings of the mic capture and decode.
         """
+        trace = self.chat.tracer.start_turn(self.chat.session_id, self.chat.char_name)
+        for stage, seconds in (input_timings or {}).items():
+            trace.add_span(stage, seconds)
+
         try:
             if self.input_language != 'en':
-                user_message = self.translator.translate_user_to_en(user_message)
+                with trace.span("translate_user_to_en"):
+                    translation = self.async_translator.submit(user_message)
+                    # Apply pending config changes to the prompt while the message is translated
+                    self.chat.apply_reload()
+                    user_message = self.async_translator.wait(translation, user_message)
 
-            if user_message and user_message[-1] not in ['?', '!', "."]:
-                user_message += "."
+            user_message = punctuate(user_message)
 
             # Update conversation and get AI response
-            self.chat.conversation.append({'role': self.chat.user, 'content': user_message})
-            prompt = self.chat.update_memory()
-            print(f"Prompt: {prompt}")
+            self.chat.add_message(self.chat.user, user_message)
+            with trace.span("update_memory"):
+                prompt = self.chat.update_memory()
 
-            character_response = self.chat.get_response(prompt)
+            with trace.span("get_response"):
+                character_response = self.chat.get_response(prompt, "mic" if input_timings else "keyboard")
+            trace.record_model_stats(self.chat.last_response_stats)
             
             if self.input_language != 'en':
-                translated_char_response = self.translator.translate_en_to_user(character_response)
+                with trace.span("translate_en_to_user"):
+                    translated_char_response = self.async_translator.translate_blocking(character_response, to_en=False)
             else:
                 translated_char_response = character_response
 
-            # Display AI message (thread-safe)
-            self.view.window.after(0, self.view.display_ai_message, translated_char_response)
+            # Display AI message (thread-safe, rendered with the next frame)
+            self.view.display_ai_message(translated_char_response)
             
-            # Text-to-Speech if enabled
-            self.tts_converter.text_to_speech(translated_char_response)
+            # Text-to-Speech if enabled; the trace is exported once the audio is synthesized
+            self.tts_converter.text_to_speech(
+                translated_char_response,
+                on_synthesized=lambda seconds: self.finish_trace(trace, seconds)
+            )
 
             # Update conversation with AI response
-            self.chat.conversation.append({'role': self.chat.char_name, 'content': character_response})
+            self.chat.add_message(self.chat.char_name, character_response)
         
         except Exception as e:
             error_message = f"Error processing message: {str(e)}"
-            self.view.window.after(0, self.view.display_ai_message, character_response)
+            self.view.display_ai_message(character_response)
             print(error_message)
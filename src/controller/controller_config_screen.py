@@ -7,9 +7,13 @@ class ScreenConfigController:
     def __init__(self):
         self.chat = ChatBase()
         self.view = ViewScreen()
+        self.page_size = self.chat.register_model.config.getint("Characters", "page_size", fallback=20)
     
         # Set the callback for character details retrieval
         self.view.set_character_details_callback(self.retrieve_character_details)
+
+        # Set the callback for paging and searching the characters
+        self.view.set_character_search_callback(self.populate_character_selection)
         
         # Set OK callback to launch chat screen
         self.view.set_ok_callback(self.launch_chat_screen)
@@ -17,10 +21,21 @@ class ScreenConfigController:
         self.populate_character_selection()
         self.view.run()
 
-    def populate_character_selection(self):
-        """Populate the character selection dropdown with available characters."""
-        available_characters = self.chat.get_character_names()
-        self.view.update_character_options(available_characters)
+    def populate_character_selection(self, query: str = "", page: int = 0):
+        """
+        Populate the character selection dropdown with a page of characters, or the search results.
+
+        Args:
+            query (str, optional): Text typed in the search box. Defaults to listing every character.
+            page (int, optional): The page of the listing, starting at 0. Defaults to 0.
+        """
+        characters = self.chat.characters
+        if query.strip():
+            self.view.update_character_options(characters.search(query, self.page_size))
+            return
+        pages = characters.page_count(self.page_size)
+        page = min(max(0, page), pages - 1)
+        self.view.update_character_options(characters.page(page, self.page_size), page, pages)
 
     def retrieve_character_details(self, selected_character):
         """
@@ -1,9 +1,14 @@
 from src.models.chat_base import ChatBase
+from src.models.text_filters import punctuate
 from src.models.tts_converter import TextToSpeechConverter
 from src.models.mic_converter import MicConverter
 from src.models.translate_phrase import PhraseTranslator
+from src.models.async_translator import AsyncPhraseTranslator
+from src.models.speech_worker_pool import SpeechWorkerPool
 from src.view.view_terminal import TerminalView
-import keyboard
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import threading
 import time
 
 
@@ -28,13 +33,26 @@ class TerminalChatController:
 
         # Select input language
         self.input_language = self.view.select_input_language()
-        self.translator = PhraseTranslator(user_lang=self.input_language)
+        speech_workers = SpeechWorkerPool.from_config(self.chat.register_model.config)
+        self.translator = PhraseTranslator(user_lang=self.input_language, pool=speech_workers)
+        self.async_translator = AsyncPhraseTranslator.from_config(self.translator, self.chat.register_model.config)
         self.tts_converter = TextToSpeechConverter(self.input_language)
-        self.mic_converter = MicConverter(self.input_language)
+        self.mic_converter = MicConverter.from_config(self.chat.register_model.config, self.input_language, pool=speech_workers)
 
         # Select the user input method
         self.input_method = self.view.select_input_method()
 
+        # Alternative responses generated in the background for "Switch"
+        config = self.chat.register_model.config
+        self.speculative_candidates = config.getint("Chat", "speculative_candidates", fallback=0)
+        self.candidate_executor = None
+        if self.speculative_candidates > 0:
+            self.candidate_executor = ThreadPoolExecutor(
+                max_workers=self.speculative_candidates, thread_name_prefix="switch-candidate"
+            )
+        self.pending_candidates = deque()
+        self.candidates_cancelled = None
+
         # Select chat character and display associated information
         self.select_chat_character()
 
@@ -42,23 +60,73 @@ class TerminalChatController:
         """
         Prompts the user to select a chat character from the available list.
 
-        It displays the available characters, retrieves the user's choice,
-        loads the selected character's configuration, and shows detailed character information.
+        The characters are listed a page at a time. The user can type a name (a
+        misspelled or partial name is accepted when it matches one character),
+        search by part of a name, pick a listed character by number, or change
+        page with '<' and '>'. It then loads the selected character's
+        configuration and shows detailed character information.
         """
-        available_characters = self.chat.get_character_names()
-        self.view.display_message("\nPersonagens disponíveis:")
-        for character in available_characters:
-            self.view.display_message(f"- {character}")
+        characters = self.chat.characters
+        page_size = self.chat.register_model.config.getint("Characters", "page_size", fallback=20)
+        page = 0
+        listed = characters.page(page, page_size)
+        header = f"\nPersonagens disponíveis (página 1/{characters.page_count(page_size)}):"
+
+        selected_character = None
+        while selected_character is None:
+            self.view.display_message(header)
+            for number, character in enumerate(listed, 1):
+                self.view.display_message(f"{number}. {character}")
+
+            choice = self.view.get_input("Selecione um personagem (nome, número, busca, '<' ou '>' muda a página): ")
+            if choice in ("<", ">"):
+                page = min(max(0, page + (1 if choice == ">" else -1)), characters.page_count(page_size) - 1)
+                listed = characters.page(page, page_size)
+                header = f"\nPersonagens disponíveis (página {page + 1}/{characters.page_count(page_size)}):"
+            elif choice.isdigit() and 1 <= int(choice) <= len(listed):
+                selected_character = listed[int(choice) - 1]
+            elif not len(characters):
+                selected_character = choice
+            else:
+                selected_character = characters.resolve(choice)
+                if selected_character is None:
+                    listed = characters.search(choice, page_size)
+                    header = f"\nResultados para '{choice}':" if listed else f"\nNenhum personagem encontrado para '{choice}'."
 
-        selected_character = self.view.get_input("Selecione um personagem: ")
         character_info = self.chat.get_character_info(selected_character)
-        self.chat.load_chat_config(selected_character, self.input_language)
 
-        self.chat.setup_conversation()
         if self.input_language != 'en':
-            self.chat.memory = self.translator.translate_user_to_en(self.chat.memory)
+            self.chat.set_memory_translator(self.translator.translate_user_to_en, self.input_language)
+        if not self.resume_previous_session(selected_character):
+            self.chat.load_chat_config(selected_character, self.input_language)
+            self.chat.setup_conversation()
 
         self.view.display_character_info(character_info)
+        for message in self.chat.conversation:
+            self.view.display_message(f"{message['role']}: {message['content']}")
+
+        # Load the model before the first turn and keep it loaded during the session
+        self.chat.warm_up()
+
+    def resume_previous_session(self, selected_character):
+        """
+        Offers to resume the latest stored session with the selected character.
+
+        Args:
+            selected_character (str): Name of the selected character.
+
+        Returns:
+            bool: True if a stored session was resumed, False otherwise.
+        """
+        if not self.chat.session_store:
+            return False
+        session_id = self.chat.session_store.latest_session(selected_character)
+        if not session_id:
+            return False
+        answer = self.view.get_input("Resume the previous conversation? (y/n): ")
+        if answer.lower() != "y":
+            return False
+        return self.chat.resume_session(session_id, self.input_language)
 
     def get_input_user(self):
         """
@@ -73,6 +141,7 @@ class TerminalChatController:
         if self.input_method == "keyboard":
             return self.view.get_input(f"{self.chat.user}: ")
         elif self.input_method == "mic":
+            import keyboard
             self.view.display_message("Please press and hold SPACE while speaking and release to finish.")
             while not keyboard.is_pressed("SPACE"):
                 time.sleep(1)
@@ -82,16 +151,86 @@ class TerminalChatController:
         else:
             return None
 
+    def generate_candidate(self, prompt, cancelled=None):
+        """
+        Generates a character response and its translation to the user's language.
+
+        Candidates run concurrently and most are discarded, so nothing is recorded
+        on the session here; the accepted one is recorded by switch_response_attempt.
+
+        Args:
+            prompt (list or str): The prompt used to generate the character's response.
+            cancelled (threading.Event, optional): Set when the candidate is no longer needed.
+
+        Returns:
+            tuple: The response in English, the translated response (None for English input)
+                and the generation outcome.
+        """
+        character_response, outcome = self.chat.generate(prompt, share=False, cancelled=cancelled)
+        if cancelled is not None and cancelled.is_set():
+            return character_response, None, outcome
+        if self.input_language != 'en':
+            return character_response, self.async_translator.translate_blocking(character_response, to_en=False), outcome
+        return character_response, None, outcome
+
+    def start_candidates(self, prompt):
+        """
+        Starts generating alternative responses in the background, so switching is instant.
+
+        Only used for keyboard input, the only method that offers switching.
+
+        Args:
+            prompt (list or str): The prompt used to generate the character's response.
+        """
+        self.cancel_candidates()
+        if self.candidate_executor is None or self.input_method != "keyboard":
+            return
+        self.candidates_cancelled = threading.Event()
+        for _ in range(self.speculative_candidates):
+            self.pending_candidates.append(
+                self.candidate_executor.submit(self.generate_candidate, prompt, self.candidates_cancelled)
+            )
+
+    def next_candidate(self, prompt):
+        """
+        Returns the next alternative response, generating it now if none was prepared.
+
+        Args:
+            prompt (list or str): The prompt used to generate the character's response.
+
+        Returns:
+            tuple: The response in English, the translated response (None for English input)
+                and the generation outcome.
+        """
+        if self.pending_candidates:
+            return self.pending_candidates.popleft().result()
+        return self.generate_candidate(prompt)
+
+    def cancel_candidates(self):
+        """
+        Cancels the alternative responses that are no longer needed.
+
+        Candidates still queued are cancelled, the ones a worker picked up but
+        not started yet skip their generation, and the ones already generating
+        are stopped at their next streamed chunk.
+        """
+        if not self.pending_candidates:
+            return
+        self.candidates_cancelled.set()
+        while self.pending_candidates:
+            self.pending_candidates.popleft().cancel()
+
     def switch_response_attempt(self, prompt):
         """
         Provides the user with an option to request additional responses.
 
         The user is prompted up to three times to request a new response for the given prompt.
         If the user inputs 'y', a new character response is generated and processed. If 'n' is entered,
-        the switching attempt stops.
+        the switching attempt stops. The statistics of the accepted response replace those of the
+        response it switched from.
 
         Args:
-            prompt (str): The prompt used to generate the character's response.
+            prompt (list or str): The prompt used to generate the character's response.
 
         Returns:
             str or None: The final character response if a switch is made; otherwise, None.
@@ -101,11 +240,10 @@ class TerminalChatController:
             user_msg_switch = self.view.get_input(f"{count_switch}/3 Switch: ")
             if user_msg_switch.lower() == "y":
                 while True:
-                    character_response = self.chat.get_response(prompt)
+                    character_response, character_response_translated, outcome = self.next_candidate(prompt)
                     self.view.display_message(f"{self.chat.char_name}: {character_response}")
 
                     if self.input_language != 'en':
-                        character_response_translated = self.translator.translate_en_to_user(character_response)
                         self.view.display_message(f"{self.chat.char_name}: {character_response_translated}")
                         self.tts_converter.text_to_speech(character_response_translated)
                     else:
@@ -118,6 +256,7 @@ class TerminalChatController:
                     user_msg_switch = self.view.get_input(f"{count_switch}/3 Switch: ")
                     if user_msg_switch.lower() == "n":
                         break
+                self.chat.record_response(outcome, replace=True)
                 return character_response
             elif user_msg_switch.lower() == "n":
                 return None
@@ -127,6 +266,38 @@ class TerminalChatController:
         else:
             return None
 
+    def finish_trace(self, trace, tts_seconds):
+        """
+        Records the speech synthesis time and exports the finished turn trace.
+
+        Args:
+            trace (TurnTrace): The trace of the turn.
+            tts_seconds (float): Seconds spent synthesizing the response audio.
+        """
+        trace.add_span("tts", tts_seconds)
+        self.chat.tracer.finish_turn(trace)
+
+    def display_latency_report(self):
+        """
+        Displays the model cold-load latency and the warm turn latency separately.
+        """
+        report = self.chat.latency_report()
+        if report["cold_load_seconds"] is not None:
+            self.view.display_message(f"Model cold load: {report['cold_load_seconds']:.2f}s")
+        if report["warm_turns"]:
+            self.view.display_message(
+                f"Warm turns: {report['warm_turns']} "
+                f"(mean {report['warm_turn_mean_seconds']:.2f}s, max {report['warm_turn_max_seconds']:.2f}s)"
+            )
+        if "scheduler" in report:
+            queue_wait = report["scheduler"]["queue_wait_seconds"]
+            generation = report["scheduler"]["generation_seconds"]
+            if queue_wait["count"]:
+                self.view.display_message(
+                    f"Scheduler: queue wait mean {queue_wait['mean']:.2f}s, "
+                    f"generation mean {generation['mean']:.2f}s"
+                )
+
     def run(self):
         """
         Starts the interactive chat session.
@@ -141,33 +312,54 @@ class TerminalChatController:
             user_msg = self.get_input_user()
             if user_msg.lower() == "exit":
                 self.view.display_message("Exiting...")
+                self.chat.close()
+                if self.candidate_executor:
+                    self.candidate_executor.shutdown(wait=False, cancel_futures=True)
+                self.display_latency_report()
                 break
 
-            if user_msg and user_msg[-1] not in ['?', '!', "."]:
-                user_msg += "."
+            trace = self.chat.tracer.start_turn(self.chat.session_id, self.chat.char_name)
+            if self.input_method == "mic":
+                for stage, seconds in self.mic_converter.last_timings.items():
+                    trace.add_span(stage, seconds)
+
+            user_msg = punctuate(user_msg)
 
             if self.input_language != 'en':
-                user_msg_translated = self.translator.translate_user_to_en(user_msg)
+                with trace.span("translate_user_to_en"):
+                    translation = self.async_translator.submit(user_msg)
+                    # Apply pending config changes to the prompt while the message is translated
+                    self.chat.apply_reload()
+                    user_msg_translated = self.async_translator.wait(translation, user_msg)
                 self.view.display_message(f"{self.chat.user}: {user_msg_translated}")
                 user_msg = user_msg_translated
 
-            self.chat.conversation.append({'role': self.chat.user, 'content': user_msg})
-            prompt = self.chat.update_memory()
+            self.chat.add_message(self.chat.user, user_msg)
+            with trace.span("update_memory"):
+                prompt = self.chat.update_memory()
 
-            character_response = self.chat.get_response(prompt)
+            with trace.span("get_response"):
+                character_response = self.chat.get_response(prompt, self.input_method)
+            trace.record_model_stats(self.chat.last_response_stats)
+            self.start_candidates(prompt)
             self.view.display_message(f"{self.chat.char_name}: {character_response}")
 
             if self.input_language != 'en':
-                character_response_translated = self.translator.translate_en_to_user(character_response)
+                with trace.span("translate_en_to_user"):
+                    character_response_translated = self.async_translator.translate_blocking(character_response, to_en=False)
                 self.view.display_message(f"{self.chat.char_name}: {character_response_translated}")
-                self.tts_converter.text_to_speech(character_response_translated)
             else:
-                self.tts_converter.text_to_speech(character_response)
+                character_response_translated = character_response
+            self.tts_converter.text_to_speech(
+                character_response_translated,
+                on_synthesized=lambda seconds, trace=trace: self.finish_trace(trace, seconds)
+            )
 
             character_response_switch = self.switch_response_attempt(prompt)
+            self.cancel_candidates()
             if character_response_switch:
                 character_response = character_response_switch
 
-            self.chat.conversation.append({'role': self.chat.char_name, 'content': character_response})
+            self.chat.add_message(self.chat.char_name, character_response)
 
             time.sleep(1)
\ No newline at end of file
@@ -0,0 +1,217 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+
+class TranslationExecutor:
+    """
+    A class to run blocking translations in a dedicated pool of threads.
+
+    The pool is shared by every session of the process and sized to the number
+    of cores. At most max_pending translations are running or waiting at a
+    time; further requests wait for a slot (up to their timeout), so a burst of
+    sessions cannot queue an unbounded backlog.
+
+    Attributes:
+        workers (int): Number of translation threads.
+        max_pending (int): Maximum translations running or queued.
+        completed (int): Translations finished.
+        timed_out (int): Requests that gave up waiting, for a slot or for the result.
+        cancelled (int): Translations cancelled before they started.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, workers: int = None, max_pending: int = None):
+        self.workers = workers or os.cpu_count() or 2
+        self.max_pending = max_pending or self.workers * 4
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="translation")
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return the process-wide executor configured in the [Translation] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            TranslationExecutor: The shared executor.
+        """
+        workers = config.getint("Translation", "workers", fallback=0)
+        max_pending = config.getint("Translation", "max_pending", fallback=0)
+        with cls._instances_lock:
+            if (workers, max_pending) not in cls._instances:
+                cls._instances[(workers, max_pending)] = cls(workers, max_pending)
+            return cls._instances[(workers, max_pending)]
+
+    def count(self, counter: str) -> None:
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def run(self, translate, phrase: str) -> Future:
+        """
+        Run a translation in the pool once a slot is held; the slot is freed when it ends.
+        """
+        future = self.executor.submit(translate, phrase)
+
+        def release(done):
+            self.slots.release()
+            self.count("cancelled" if done.cancelled() else "completed")
+
+        future.add_done_callback(release)
+        return future
+
+    def stats(self) -> dict:
+        """
+        Return the pool size and the request counters.
+        """
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "timed_out": self.timed_out,
+                "cancelled": self.cancelled
+            }
+
+
+class AsyncPhraseTranslator:
+    """
+    A class to call a PhraseTranslator without blocking the caller.
+
+    The coroutines can be awaited from an event loop, e.g. to translate the
+    user's message while other sessions' work goes on; submit returns a Future
+    for threads without a loop, such as the chat controllers', which do other
+    work before collecting it with wait. A translation that does not finish
+    within the timeout is cancelled if it has not started yet, and the
+    original phrase is returned, as PhraseTranslator does when translation
+    fails. Cancelling the awaiting task cancels a translation still waiting
+    in the queue.
+
+    Attributes:
+        translator (PhraseTranslator): The blocking translator.
+        executor (TranslationExecutor): The shared translation pool.
+        timeout (float): Default seconds to wait for a translation, queueing included.
+    """
+    __slots__ = ("translator", "executor", "timeout")
+
+    def __init__(self, translator, executor: TranslationExecutor = None, timeout: float = 10.0):
+        self.translator = translator
+        self.executor = executor or TranslationExecutor()
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, translator, config):
+        """
+        Return an async client of translator using the shared executor of the [Translation] section.
+        """
+        return cls(
+            translator,
+            executor=TranslationExecutor.from_config(config),
+            timeout=config.getfloat("Translation", "timeout_seconds", fallback=10.0)
+        )
+
+    def submit(self, phrase: str, to_en: bool = True, timeout: float = None) -> Future:
+        """
+        Start a translation from a thread without an event loop.
+
+        Args:
+            phrase (str): The text to translate.
+            to_en (bool, optional): Translate the user's language to English, or back. Defaults to True.
+            timeout (float, optional): Seconds to wait for a free slot. Defaults to self.timeout.
+
+        Returns:
+            Future: Resolved with the translation, or with the phrase if no slot freed up in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if not self.executor.slots.acquire(timeout=timeout):
+            self.executor.count("timed_out")
+            print("Error: the translation queue is full, keeping the original phrase.")
+            future = Future()
+            future.set_result(phrase)
+            return future
+        return self.executor.run(self.blocking_method(to_en), phrase)
+
+    def wait(self, future: Future, phrase: str, timeout: float = None) -> str:
+        """
+        Return the result of a submitted translation, or the phrase if it takes too long.
+
+        Args:
+            future (Future): The future returned by submit.
+            phrase (str): The text being translated.
+            timeout (float, optional): Seconds to wait for the result. Defaults to self.timeout.
+        """
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except TimeoutError:
+            future.cancel()
+            self.executor.count("timed_out")
+            print("Error: translation timed out, keeping the original phrase.")
+            return phrase
+
+    def translate_blocking(self, phrase: str, to_en: bool = True) -> str:
+        """
+        Translate a phrase in the translation pool and wait for it, within the timeout.
+        """
+        return self.wait(self.submit(phrase, to_en), phrase)
+
+    def blocking_method(self, to_en: bool):
+        if to_en:
+            return self.translator.translate_user_to_en
+        return self.translator.translate_en_to_user
+
+    async def translate(self, phrase: str, to_en: bool = True, timeout: float = None) -> str:
+        """
+        Translate a phrase in the translation pool.
+
+        Args:
+            phrase (str): The text to translate.
+            to_en (bool, optional): Translate the user's language to English, or back. Defaults to True.
+            timeout (float, optional): Seconds to wait, queueing included. Defaults to self.timeout.
+
+        Returns:
+            str: The translation, or the original phrase if it timed out.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        # Wait for a slot off the loop only when the queue is full
+        if not self.executor.slots.acquire(blocking=False):
+            waiter = loop.run_in_executor(None, self.executor.slots.acquire, True, timeout)
+            try:
+                acquired = await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                waiter.add_done_callback(lambda done: done.result() and self.executor.slots.release())
+                raise
+            if not acquired:
+                self.executor.count("timed_out")
+                print("Error: the translation queue is full, keeping the original phrase.")
+                return phrase
+
+        future = self.executor.run(self.blocking_method(to_en), phrase)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            self.executor.count("timed_out")
+            print("Error: translation timed out, keeping the original phrase.")
+            return phrase
+
+    async def translate_user_to_en(self, phrase: str, timeout: float = None) -> str:
+        """
+        Translate the user's phrase to English without blocking the event loop.
+        """
+        return await self.translate(phrase, True, timeout)
+
+    async def translate_en_to_user(self, phrase: str, timeout: float = None) -> str:
+        """
+        Translate the bot's English response to the user's language without blocking the event loop.
+        """
+        return await self.translate(phrase, False, timeout)
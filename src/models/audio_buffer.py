@@ -0,0 +1,128 @@
+class AudioRingBuffer:
+    """
+    A preallocated ring buffer of PCM audio.
+
+    Captured frames are copied once into a fixed bytearray; when the buffer is
+    full the oldest audio is overwritten, so a long recording keeps only its
+    last capacity bytes and memory stays bounded. The audio is read back as at
+    most two memoryviews over the buffer (before and after the wrap point),
+    without joining it into a new bytes object.
+
+    Attributes:
+        capacity (int): Size of the buffer in bytes, a whole number of frames.
+        size (int): Bytes of audio held.
+        dropped (int): Bytes of the oldest audio overwritten since the last clear.
+    """
+    __slots__ = ("buffer", "view", "capacity", "start", "size", "dropped")
+
+    def __init__(self, capacity: int, frame_bytes: int = 2):
+        """
+        Args:
+            capacity (int): Maximum bytes of audio to hold.
+            frame_bytes (int, optional): Bytes per frame (sample width x channels). Defaults to 2.
+        """
+        # A whole number of frames, so no sample is split at the wrap point
+        self.capacity = max(frame_bytes, capacity - capacity % frame_bytes)
+        self.buffer = bytearray(self.capacity)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.size = 0
+        self.dropped = 0
+
+    @classmethod
+    def for_duration(cls, seconds: float, sample_rate: int, sample_width: int = 2, channels: int = 1):
+        """
+        Return a buffer holding up to the given seconds of audio.
+        """
+        frame_bytes = sample_width * channels
+        return cls(int(seconds * sample_rate) * frame_bytes, frame_bytes)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def clear(self) -> None:
+        """
+        Forget the audio held, keeping the allocated buffer.
+        """
+        self.start = 0
+        self.size = 0
+        self.dropped = 0
+
+    def write(self, data) -> None:
+        """
+        Append captured audio, overwriting the oldest audio once the buffer is full.
+
+        Args:
+            data (bytes-like): The frames to append.
+        """
+        data = memoryview(data).cast("B")
+        if len(data) >= self.capacity:
+            self.dropped += self.size + len(data) - self.capacity
+            data = data[len(data) - self.capacity:]
+            self.start = 0
+            self.size = 0
+
+        end = (self.start + self.size) % self.capacity
+        first = min(len(data), self.capacity - end)
+        self.view[end:end + first] = data[:first]
+        self.view[:len(data) - first] = data[first:]
+
+        overflow = self.size + len(data) - self.capacity
+        if overflow > 0:
+            self.start = (self.start + overflow) % self.capacity
+            self.dropped += overflow
+            self.size = self.capacity
+        else:
+            self.size += len(data)
+
+    def segments(self) -> list:
+        """
+        Return the audio held as memoryviews over the buffer, oldest first.
+        """
+        end = self.start + self.size
+        if end <= self.capacity:
+            return [self.view[self.start:end]] if self.size else []
+        return [self.view[self.start:], self.view[:end - self.capacity]]
+
+
+def pcm_segments(pcm) -> list:
+    """
+    Return PCM audio as memoryviews: the segments of a ring buffer, or a view of a bytes-like object.
+    """
+    if isinstance(pcm, AudioRingBuffer):
+        return pcm.segments()
+    return [memoryview(pcm).cast("B")]
+
+
+def pcm_chunks(pcm, chunk_bytes: int):
+    """
+    Yield PCM audio in pieces of chunk_bytes as memoryviews.
+
+    The pieces are views of the audio; only the one piece that spans the wrap
+    point of a ring buffer is copied.
+
+    Args:
+        pcm (AudioRingBuffer or bytes-like): The audio.
+        chunk_bytes (int): Bytes per piece.
+    """
+    segments = pcm_segments(pcm)
+    pending = None
+    for index, segment in enumerate(segments):
+        position = 0
+        if pending is not None:
+            position = min(len(segment), chunk_bytes - len(pending))
+            pending += segment[:position]
+            if len(pending) < chunk_bytes and index < len(segments) - 1:
+                continue
+            yield memoryview(pending)
+            pending = None
+
+        last = index == len(segments) - 1
+        whole = position + (len(segment) - position) // chunk_bytes * chunk_bytes
+        for start in range(position, whole, chunk_bytes):
+            yield segment[start:start + chunk_bytes]
+        if whole < len(segment):
+            if last:
+                yield segment[whole:]
+            else:
+                pending = bytearray(segment[whole:])
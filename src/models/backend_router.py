@@ -0,0 +1,234 @@
+import threading
+import time
+import requests
+from contextlib import contextmanager
+from src.models.model_readiness import ReadinessChecker
+
+
+class Backend:
+    """
+    A single Ollama server in the backend pool.
+
+    Attributes:
+        base_url (str): The server base URL.
+        outstanding (int): Requests currently in flight on this server.
+        healthy (bool): Whether the server is considered usable.
+        failed_at (float): Monotonic time of the last failure.
+        readiness (ReadinessChecker): Cached health checks for this server.
+    """
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.outstanding = 0
+        self.healthy = True
+        self.failed_at = 0.0
+        self.readiness = ReadinessChecker(self.base_url)
+
+    def url(self, path: str) -> str:
+        """
+        Build the full URL of an API path on this server.
+        """
+        return f"{self.base_url}{path}"
+
+    def is_ollama_running(self) -> bool:
+        """
+        Check if this server is running, using the cached readiness check.
+        """
+        return self.readiness.is_server_up()
+
+
+class BackendRouter:
+    """
+    A class to route model requests across a pool of Ollama servers.
+
+    Requests go to the healthy backend with the fewest outstanding requests.
+    A session sticks to the backend that served it, so its KV cache stays warm,
+    and moves to another backend only when that one fails. Failed backends are
+    taken out of rotation and probed again after a retry interval.
+
+    Attributes:
+        backends (list): The Backend instances of the pool.
+        retry_interval (float): Seconds before a failed backend is probed again.
+        affinity (dict): Maps a session id to the backend that serves it.
+    """
+    DEFAULT_BASE_URL = "http://localhost:11434"
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, base_urls: list, retry_interval: float = 10.0):
+        self.backends = [Backend(url) for url in base_urls]
+        self.retry_interval = retry_interval
+        self.affinity = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> "BackendRouter":
+        """
+        Return the process-wide router for the backends listed in config.ini.
+
+        The [OllamaBackends] section lists comma-separated base URLs in 'urls'.
+        Without it, the pool holds only the local server.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            BackendRouter: The shared router instance.
+        """
+        urls = config.get("OllamaBackends", "urls", fallback=cls.DEFAULT_BASE_URL)
+        base_urls = tuple(url.strip().rstrip("/") for url in urls.split(",") if url.strip())
+        retry_interval = config.getfloat("OllamaBackends", "retry_interval", fallback=10.0)
+        with cls._instances_lock:
+            if base_urls not in cls._instances:
+                cls._instances[base_urls] = cls(list(base_urls), retry_interval)
+            return cls._instances[base_urls]
+
+    def _probe(self, backend: Backend) -> None:
+        """
+        Probe a failed backend again once its retry interval has passed.
+        """
+        with self.lock:
+            if backend.healthy or time.monotonic() - backend.failed_at < self.retry_interval:
+                return
+            # Claim the probe, so concurrent requests do not probe the same backend
+            backend.failed_at = time.monotonic()
+        # The health check is a network call, made without holding the lock
+        if backend.is_ollama_running():
+            with self.lock:
+                backend.healthy = True
+
+    def acquire(self, session_id=None, exclude=()) -> Backend:
+        """
+        Pick a backend for a request and count it as outstanding.
+
+        Args:
+            session_id (str, optional): The session making the request.
+            exclude (iterable, optional): Backends that already failed this request.
+
+        Returns:
+            Backend: The chosen backend, or None if no backend is available.
+        """
+        for backend in self.backends:
+            if backend not in exclude:
+                self._probe(backend)
+
+        with self.lock:
+            candidates = [b for b in self.backends if b.healthy and b not in exclude]
+            if not candidates:
+                return None
+
+            backend = self.affinity.get(session_id)
+            if backend not in candidates:
+                backend = min(candidates, key=lambda b: b.outstanding)
+                if session_id is not None:
+                    self.affinity[session_id] = backend
+
+            backend.outstanding += 1
+            return backend
+
+    def release(self, backend: Backend, failed: bool = False) -> None:
+        """
+        Finish a request on a backend, marking it unhealthy if it failed.
+
+        Args:
+            backend (Backend): The backend returned by acquire.
+            failed (bool, optional): Whether the request failed at the server. Defaults to False.
+        """
+        with self.lock:
+            backend.outstanding -= 1
+            if failed:
+                backend.healthy = False
+                backend.failed_at = time.monotonic()
+                backend.readiness.invalidate()
+
+    def forget_session(self, session_id) -> None:
+        """
+        Drop the backend affinity of a finished session.
+        """
+        with self.lock:
+            self.affinity.pop(session_id, None)
+
+    def post(self, path: str, payload: dict, session_id=None, **kwargs) -> requests.Response:
+        """
+        Send a POST request to the pool, failing over to other backends on errors.
+
+        Connection errors, timeouts and 5xx responses mark the backend unhealthy and
+        the request is retried on the next best backend.
+
+        Args:
+            path (str): The API path, for example '/api/generate'.
+            payload (dict): The JSON body.
+            session_id (str, optional): The session making the request.
+            **kwargs: Extra arguments passed to requests.post.
+
+        Returns:
+            requests.Response: The response of the first backend that answered, or the
+                last 5xx response if every backend failed that way.
+
+        Raises:
+            requests.ConnectionError: If every backend failed.
+        """
+        return self._send(path, payload, session_id, False, **kwargs)[1]
+
+    @contextmanager
+    def stream(self, path: str, payload: dict, session_id=None, **kwargs):
+        """
+        Open a streamed POST request, with the same failover as post.
+
+        The backend stays counted as outstanding until the block exits, and the
+        connection is closed then, so leaving the block early cancels the generation.
+
+        Yields:
+            requests.Response: The streamed response.
+        """
+        backend, response = self._send(path, payload, session_id, True, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+            if backend is not None:
+                self.release(backend)
+
+    def _send(self, path: str, payload: dict, session_id, hold: bool, **kwargs) -> tuple:
+        """
+        Send a request with failover; with hold, the answering backend is not released.
+
+        Returns:
+            tuple: The held backend (or None) and the response.
+        """
+        tried = []
+        last_error = None
+        last_response = None
+        while True:
+            backend = self.acquire(session_id, exclude=tried)
+            if backend is None:
+                if last_response is not None:
+                    return None, last_response
+                raise requests.ConnectionError(f"No Ollama backend available: {last_error}")
+            tried.append(backend)
+
+            failed = False
+            held = False
+            try:
+                response = requests.post(backend.url(path), json=payload, **kwargs)
+                if response.status_code < 500:
+                    held = hold
+                    return (backend if held else None), response
+                failed = True
+                last_response = response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                failed = True
+                last_error = e
+            finally:
+                if not held:
+                    self.release(backend, failed)
+
+    def status(self) -> list:
+        """
+        Return the health and load of every backend.
+        """
+        with self.lock:
+            return [
+                {"url": b.base_url, "healthy": b.healthy, "outstanding": b.outstanding}
+                for b in self.backends
+            ]
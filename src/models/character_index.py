@@ -0,0 +1,345 @@
+import os
+import json
+import bisect
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict, Counter
+
+
+def trigrams(text: str) -> set:
+    """
+    Return the trigrams of a lowercased, space-padded text.
+    """
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CharacterIndex:
+    """
+    A class to list, search and load characters of a large persona catalog.
+
+    The characters are kept in a JSON lines catalog, one compact character per
+    line, next to an index of the names and the byte offset of each line. Only
+    the index is read at startup; a character's details are read from its line
+    when it is selected, and the most recent ones are kept in memory. When the
+    source is a JSON array (chat_config.json), the catalog is rebuilt from it
+    whenever the source changes. A JSON lines source is indexed in place.
+
+    Names are searched by prefix (binary search over the sorted lowercase names)
+    and by trigram similarity, so typos and partial names still find a match.
+    The trigram index is built on the first search that needs it.
+
+    Attributes:
+        source_path (str): chat_config.json, or a .jsonl catalog.
+        catalog_path (str): The JSON lines catalog the offsets refer to.
+        names (list): Character names, in catalog order.
+        listeners (list): Called with the set of changed names whenever a reload changes characters.
+        load_error (str): Why the last load could not read or index the source, or None.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, source_path: str = "chat_config.json", catalog_path: str = "character_catalog.jsonl",
+                 max_details: int = 64):
+        """
+        Args:
+            source_path (str, optional): The characters file. Defaults to "chat_config.json".
+            catalog_path (str, optional): Catalog built from a JSON array source. Defaults to "character_catalog.jsonl".
+            max_details (int, optional): Number of loaded characters kept in memory. Defaults to 64.
+        """
+        self.source_path = source_path
+        self.catalog_path = source_path if source_path.endswith(".jsonl") else catalog_path
+        self.index_path = f"{self.catalog_path}.idx"
+        self.max_details = max_details
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.source_stamp = None
+        self.names = []
+        self.offsets = array("Q")
+        self.digests = {}
+        self.positions = {}
+        self.sorted_names = []
+        self.sorted_positions = []
+        self.postings = None
+        self.trigram_counts = None
+        self.details = OrderedDict()
+        self.load_error = None
+        self.load()
+        if self.load_error:
+            print(self.load_error)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return the process-wide index configured in the [Characters] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            CharacterIndex: The shared index.
+        """
+        source_path = config.get("Characters", "config_path", fallback="chat_config.json")
+        catalog_path = config.get("Characters", "catalog_path", fallback="character_catalog.jsonl")
+        with cls._instances_lock:
+            if source_path not in cls._instances:
+                cls._instances[source_path] = cls(source_path, catalog_path)
+            return cls._instances[source_path]
+
+    def stamp(self):
+        """
+        Return the modification time and size of the source, or None if it is missing.
+        """
+        try:
+            stat = os.stat(self.source_path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def load(self) -> set:
+        """
+        Load the name index, rebuilding the catalog and index if the source changed.
+
+        The loaded details of the characters that did not change are kept.
+
+        Returns:
+            set: Names of the characters added, removed or modified by this load.
+        """
+        self.load_error = None
+        stamp = self.stamp()
+        index = None
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if (not index or index.get("source_stamp") != stamp or "digests" not in index
+                or not os.path.exists(self.catalog_path)):
+            index = self.build(stamp)
+        if index is None:
+            # Keep the previous index (the file may be half written) and retry on the next refresh
+            return set()
+
+        names = index["names"]
+        lowered = sorted((name.lower(), position) for position, name in enumerate(names))
+        positions = {}
+        digests = {}
+        for position, (name, digest) in enumerate(zip(names, index["digests"])):
+            positions.setdefault(name, position)
+            digests.setdefault(name, digest)
+
+        with self.lock:
+            changed = {
+                name for name in self.digests.keys() | digests.keys() if self.digests.get(name) != digests.get(name)
+            }
+            self.source_stamp = stamp
+            self.names = names
+            self.offsets = array("Q", index["offsets"])
+            self.digests = digests
+            self.positions = positions
+            self.sorted_names = [name for name, _ in lowered]
+            self.sorted_positions = [position for _, position in lowered]
+            self.postings = None
+            self.trigram_counts = None
+            self.details = OrderedDict(
+                (name, details) for name, details in self.details.items() if name not in changed
+            )
+
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+        return changed
+
+    def build_trigrams(self) -> None:
+        """
+        Build the trigram index of the names, on the first fuzzy search. Called with the lock held.
+        """
+        postings = {}
+        trigram_counts = array("H")
+        for position, name in enumerate(self.names):
+            name_trigrams = trigrams(name)
+            trigram_counts.append(len(name_trigrams))
+            for trigram in name_trigrams:
+                postings.setdefault(trigram, array("I")).append(position)
+        self.postings = postings
+        self.trigram_counts = trigram_counts
+
+    def build(self, stamp) -> dict:
+        """
+        Write the catalog (from a JSON array source) and the name/offset index.
+
+        Each line's digest is recorded, so a reload can tell which characters changed.
+        Errors are kept in load_error rather than printed, since refreshes run in
+        the config watcher's thread.
+
+        Returns:
+            dict: The index, or None if the source cannot be read.
+        """
+        names, offsets, digests = [], [], []
+        try:
+            if self.catalog_path == self.source_path:
+                with open(self.catalog_path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        if line.strip():
+                            names.append(json.loads(line)["character"]["name"])
+                            offsets.append(offset)
+                            digests.append(hashlib.blake2b(line.rstrip(), digest_size=8).hexdigest())
+                        offset += len(line)
+            else:
+                with open(self.source_path, "r", encoding="utf-8") as f:
+                    characters = json.load(f)
+                tmp_path = f"{self.catalog_path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    for character in characters:
+                        line = json.dumps(character, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                        names.append(character["character"]["name"])
+                        offsets.append(f.tell())
+                        digests.append(hashlib.blake2b(line, digest_size=8).hexdigest())
+                        f.write(line + b"\n")
+                os.replace(tmp_path, self.catalog_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.load_error = f"Error loading chat configurations: {e}"
+            return None
+
+        index = {"source_stamp": stamp, "names": names, "offsets": offsets, "digests": digests}
+        try:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            self.load_error = f"Error saving the character index: {e}"
+        return index
+
+    def refresh(self) -> set:
+        """
+        Reload the index if the source changed since it was loaded.
+
+        A source that cannot be read is tried again at the next refresh, and the
+        reason is left in load_error.
+
+        Returns:
+            set: Names of the characters added, removed or modified.
+        """
+        if self.stamp() == self.source_stamp:
+            return set()
+        return self.load()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def page(self, number: int, size: int = 20) -> list:
+        """
+        Return the names on a page of the listing.
+
+        Args:
+            number (int): The page, starting at 0.
+            size (int, optional): Names per page. Defaults to 20.
+        """
+        return self.names[number * size:(number + 1) * size]
+
+    def page_count(self, size: int = 20) -> int:
+        """
+        Return the number of pages of the listing.
+        """
+        return max(1, -(-len(self.names) // size))
+
+    def search(self, query: str, limit: int = 20, min_score: float = 0.3) -> list:
+        """
+        Find characters by name.
+
+        Names starting with the query come first, then names containing it,
+        both in alphabetical order, then names sharing enough trigrams with it,
+        most similar first.
+
+        Args:
+            query (str): The text typed by the user.
+            limit (int, optional): Maximum number of names returned. Defaults to 20.
+            min_score (float, optional): Minimum trigram similarity (0 to 1) of a fuzzy match. Defaults to 0.3.
+
+        Returns:
+            list: The matching names.
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.page(0, limit)
+
+        with self.lock:
+            start = bisect.bisect_left(self.sorted_names, query)
+            matches = []
+            for position in self.sorted_positions[start:start + limit]:
+                if not self.names[position].lower().startswith(query):
+                    break
+                matches.append(position)
+            found = set(matches)
+
+            if len(matches) < limit:
+                for name, position in zip(self.sorted_names, self.sorted_positions):
+                    if query in name and position not in found:
+                        matches.append(position)
+                        found.add(position)
+                        if len(matches) == limit:
+                            break
+
+            if len(matches) < limit:
+                if self.postings is None:
+                    self.build_trigrams()
+                query_trigrams = trigrams(query)
+                shared = Counter()
+                for trigram in query_trigrams:
+                    shared.update(self.postings.get(trigram, ()))
+                scored = []
+                for position, count in shared.items():
+                    if position in found:
+                        continue
+                    score = count / (len(query_trigrams) + self.trigram_counts[position] - count)
+                    if score >= min_score:
+                        scored.append((-score, self.names[position], position))
+                matches += [position for _, _, position in sorted(scored)[:limit - len(matches)]]
+            return [self.names[position] for position in matches]
+
+    def resolve(self, query: str) -> str:
+        """
+        Return the character a typed name refers to: an exact or case-insensitive
+        match, or the only search result. None if it is ambiguous or unknown.
+        """
+        if query in self.positions:
+            return query
+        results = self.search(query, limit=2)
+        exact = [name for name in results if name.lower() == query.strip().lower()]
+        if exact:
+            return exact[0]
+        return results[0] if len(results) == 1 else None
+
+    def get(self, name: str) -> dict:
+        """
+        Load a character's configuration from its line of the catalog.
+
+        Returns:
+            dict: The character configuration, or an empty dict if it is unknown.
+        """
+        with self.lock:
+            details = self.details.get(name)
+            if details is not None:
+                self.details.move_to_end(name)
+                return details
+            position = self.positions.get(name)
+            if position is None:
+                return {}
+            offset = self.offsets[position]
+
+        try:
+            with open(self.catalog_path, "rb") as f:
+                f.seek(offset)
+                details = json.loads(f.readline())
+        except (OSError, ValueError) as e:
+            print(f"Error loading character '{name}': {e}")
+            return {}
+
+        with self.lock:
+            self.details[name] = details
+            while len(self.details) > self.max_details:
+                self.details.popitem(last=False)
+        return details
@@ -1,20 +1,190 @@
+import os
 import json
+import time
+import uuid
+import threading
 import requests
+from collections import deque
 from src.models.model_register import RegisterModel
+from src.models.model_keep_alive import ModelKeepAlive
+from src.models.backend_router import BackendRouter
+from src.models.response_cache import ResponseCache
+from src.models.request_scheduler import RequestScheduler
+from src.models.turn_tracer import TurnTracer
+from src.models.session_store import SessionStore
+from src.models.memory_summarizer import MemorySummarizer
+from src.models.chat_template import get_template, PromptBuilder
+from src.models.generation_policy import GenerationPolicy, ends_sentence, trim_to_sentence
+from src.models.character_index import CharacterIndex
+from src.models.config_watcher import ConfigWatcher
+from src.models.text_filters import (
+    FilterChain, StopSequenceFilter, SpeakerTagFilter, RegexFilter, punctuate, load_regex_rules
+)
 
 class ChatBase:
     """
     Base class for managing the conversation with the backend model.
     
     This class abstracts the conversation logic including configuration,
-    memory management, and querying the backend model.
+    memory management, and querying the backend model. A process can hold
+    hundreds of sessions, so an instance only keeps its conversation and
+    settings in slots; the model registration, router, scheduler, caches and
+    templates it refers to are shared process-wide.
     """
-    OLLAMA_SERVER_URL = "http://localhost:11434/api/generate"
+    __slots__ = (
+        # Shared, read-only services
+        "register_model", "model_name", "router", "keep_alives", "response_cache", "scheduler",
+        "tracer", "session_store", "template", "characters", "config_watcher",
+        # Settings
+        "config_path", "memory_translator", "memory_language", "pending_reload",
+        "release_keep_alive", "num_predict", "sampling_options", "stream_responses", "output_rules", "summarize_memory",
+        "recall_memory", "recall_top_k", "recall_min_score", "recall_directory", "embedding_model",
+        # Character
+        "language", "user", "char_name", "char_personality", "char_greeting", "char_scenario",
+        "char_language", "char_voice", "context", "first_person", "person_instruction",
+        # Conversation
+        "session_id", "session_active", "session_logged", "context_tokens", "context_text", "memory", "conversation",
+        "stop_sequence", "chat_options", "prompt_builder", "generation_policy", "summarizer",
+        "long_term_memory",
+        # Generation state and statistics
+        "generation_lock", "generation_seq", "cancelled_seq", "cold_load_seconds", "turn_latencies",
+        "last_response_stats", "response_recorded",
+    )
+    # Character memories translated to English, shared by the sessions of a character and language
+    _memory_translations = {}
+    _memory_translations_lock = threading.Lock()
+    _reload_lock = threading.Lock()
+    GENERATE_PATH = "/api/generate"
+    CHAT_PATH = "/api/chat"
+    EMBEDDINGS_PATH = "/api/embeddings"
+    MEMORY_BUDGET = 4000
+    SUMMARY_WORDS = 120
+    RESPONSE_STATS = (
+        "prompt_eval_count", "eval_count",
+        "load_duration", "prompt_eval_duration", "eval_duration", "total_duration"
+    )
 
-    def __init__(self):
-        self.register_model = RegisterModel()
-        self.register_model.run()
+    def __init__(self, config_path: str = "config.ini", register_model: RegisterModel = None):
+        """
+        Args:
+            config_path (str, optional): Path of config.ini. Defaults to "config.ini".
+            register_model (RegisterModel, optional): An already run registration to reuse.
+                Defaults to the process-wide registration of config_path.
+        """
+        if register_model is None:
+            register_model = RegisterModel.for_config(config_path)
+        self.config_path = config_path
+        self.register_model = register_model
         self.model_name = self.register_model.model['name']
+        config = self.register_model.config
+
+        # Name and offset index of the character catalog; details are read on selection
+        self.characters = CharacterIndex.from_config(config)
+
+        # Route requests across the configured Ollama servers
+        self.router = BackendRouter.from_config(config)
+        self.session_id = uuid.uuid4().hex
+
+        # Keep the model loaded on every server while sessions exist
+        self.release_keep_alive = config.get("ModelLLM", "keep_alive", fallback="5m")
+        self.keep_alives = self.make_keep_alives(config)
+        self.session_active = False
+
+        # Optional cache of deterministic responses
+        self.response_cache = ResponseCache.from_config(config)
+
+        # Optional admission control shared by every session of the process
+        self.scheduler = RequestScheduler.from_config(config)
+
+        # Latency of the model load and of each turn, reported separately
+        self.cold_load_seconds = None
+        self.turn_latencies = deque(maxlen=100)
+
+        # Per-turn stage tracing and the eval statistics of the last response
+        self.tracer = TurnTracer.from_config(config)
+        self.last_response_stats = {}
+        self.response_recorded = False
+
+        # Optional persistence of the conversation, one append-only log per session
+        self.session_store = SessionStore.from_config(config)
+        self.session_logged = False
+        self.context_tokens = None
+        self.context_text = None
+
+        # Generation cancellation; the per-session settings are read by apply_settings
+        self.prompt_builder = None
+        self.generation_policy = None
+        self.generation_lock = threading.Lock()
+        self.generation_seq = 0
+        self.cancelled_seq = 0
+        self.summarizer = None
+        self.long_term_memory = None
+        self.apply_settings(config)
+
+        # Optional translation of the character memory, set by the controller
+        self.memory_translator = None
+        self.memory_language = None
+
+        # Optional hot reload of config.ini and the characters, applied before the next turn
+        self.pending_reload = None
+        self.config_watcher = ConfigWatcher.from_config(config_path, config, self.characters)
+        if self.config_watcher:
+            self.config_watcher.subscribe(self)
+
+    def apply_settings(self, config) -> None:
+        """
+        Read the per-session settings of config.ini.
+
+        Called when the session is created, and again before the next turn
+        when config.ini is reloaded.
+        """
+        # Prompt format: /api/chat messages by default, or a text template for /api/generate
+        self.template = get_template(config.get("Chat", "template", fallback="chat"))
+
+        # Generation budget per turn and streaming with early stop
+        self.num_predict = config.getint("Generation", "num_predict", fallback=120)
+        self.stream_responses = config.getboolean("Generation", "stream", fallback=True)
+
+        # Sampling; temperature 0 or a seed makes replies repeatable, so the response cache can answer them
+        self.sampling_options = {
+            "temperature": config.getfloat("Generation", "temperature", fallback=0.8),
+            "top_p": config.getfloat("Generation", "top_p", fallback=0.9),
+            "repeat_penalty": config.getfloat("Generation", "repeat_penalty", fallback=1.1)
+        }
+        seed = config.get("Generation", "seed", fallback="").strip()
+        if seed:
+            self.sampling_options["seed"] = int(seed)
+        generation_policy = GenerationPolicy.from_config(config)
+        if generation_policy and self.generation_policy:
+            generation_policy.recent.extend(self.generation_policy.recent)
+        self.generation_policy = generation_policy
+
+        # Optional regex rules (e.g. profanity) applied to the streamed reply
+        self.output_rules = load_regex_rules(config.get("OutputFilters", "rules_path", fallback=""))
+
+        # Optional running summary of the messages that left the memory window
+        self.summarize_memory = config.getboolean("Chat", "summarize_memory", fallback=False)
+
+        # Optional long-term memory: evicted messages indexed by embedding and recalled by similarity
+        self.recall_memory = config.getboolean("Memory", "enabled", fallback=False)
+        self.recall_top_k = config.getint("Memory", "top_k", fallback=3)
+        self.recall_min_score = config.getfloat("Memory", "min_score", fallback=0.3)
+        self.recall_directory = config.get("Memory", "directory", fallback="memory_index")
+        self.embedding_model = config.get("Memory", "embedding_model", fallback="") or self.model_name
+
+    def make_keep_alives(self, config) -> list:
+        """
+        Return the keep-alive of the model on every server.
+        """
+        return [
+            ModelKeepAlive.for_model(
+                self.model_name,
+                backend.url(self.GENERATE_PATH),
+                interval=config.getfloat("ModelLLM", "keep_alive_interval", fallback=120),
+                release_keep_alive=self.release_keep_alive
+            )
+            for backend in self.router.backends
+        ]
 
     def load_chat_config(self, character_name, output_language) -> None:
         """
@@ -27,6 +197,7 @@ class ChatBase:
         try:
             selected_config = self.get_character_info(character_name)
 
+            self.language = output_language
             if output_language == "pt":
                 output_language = "Portuguese"
             else:
@@ -44,6 +215,7 @@ class ChatBase:
         except Exception as e:
             print(f"Error loading chat configuration: {e}")
             # Provide default values if configuration fails.
+            self.language = "en"
             self.user = "User"
             self.char_name = "Assistant"
             self.char_personality = "The assistant is knowledgeable and helpful."
@@ -58,21 +230,42 @@ class ChatBase:
         """
         Set up the initial conversation parameters and memory.
         """
+        self.conversation = []
+        self.pending_reload = None
+        if self.generation_policy:
+            self.generation_policy.recent.clear()
+        self.session_id = uuid.uuid4().hex
+        self.session_logged = False
+        self.context_tokens = None
+        self.context_text = None
+        self.summarizer = None
+        if self.summarize_memory:
+            self.summarizer = MemorySummarizer(self.summarize_messages, on_updated=self.save_summary)
+        self.long_term_memory = self.open_long_term_memory()
+        self.build_persona()
+
+    def build_persona(self) -> None:
+        """
+        Build the character memory, the stop sequences and the generation options
+        from the loaded character and settings.
+
+        With a memory translator set, the memory is translated; the translation
+        is shared by the sessions of the same character and language.
+        """
+        # Only stop when the model starts speaking for someone else; replies may span sentences and lines
         self.stop_sequence = [
             f"{self.user}:",
             f"\n{self.user} ",
-            f"\n{self.char_name}: ",
-            "\n",
-            ". "
-        ]
-        self.conversation = []
+            f"\n{self.char_name}: "
+        ] + self.template.stop
+        self.prompt_builder = PromptBuilder(self.template, self.user, self.char_name)
 
         if self.first_person:
             self.person_instruction = "Always answer in the first person.\n"
         else:
             self.person_instruction = "Always answer in the third person and describe scenario.\n"
 
-        self.memory = (
+        memory = (
             f"Character: {self.char_name}\n"
             f"Personality: {self.char_personality}\n"
             f"Greeting: {self.char_greeting}\n"
@@ -82,63 +275,633 @@ class ChatBase:
             f"Context: {self.context}\n"
             f"Instruction: {self.person_instruction}\n"
         )
+        self.memory = self.translate_memory(memory) if self.memory_translator else memory
 
         self.chat_options = {
-            "temperature": 0.8,
-            "top_p": 0.9,
-            "max_tokens": 240,
-            "num_predict": 50,
-            "repeat_penalty": 1.1,
+            **self.sampling_options,
+            "num_predict": self.num_predict,
             "stop": self.stop_sequence
         }
 
-    def update_memory(self) -> str:
+    def set_memory_translator(self, translate, language: str) -> None:
+        """
+        Translate the character memory built from now on.
+
+        Args:
+            translate (callable): Called with the memory, returns its translation
+                (e.g. PhraseTranslator.translate_user_to_en).
+            language (str): The user's language code, part of the shared translation key.
+        """
+        self.memory_translator = translate
+        self.memory_language = language
+
+    def translate_memory(self, memory: str) -> str:
+        """
+        Return the translated character memory, translating it only if no session did yet.
+
+        A translation is reused while the memory it was made from is unchanged,
+        so editing a character only invalidates the translation of that character.
+        """
+        key = (self.char_name, self.memory_language)
+        with self._memory_translations_lock:
+            cached = self._memory_translations.get(key)
+        if cached and cached[0] == memory:
+            return cached[1]
+        translated = self.memory_translator(memory) or memory
+        with self._memory_translations_lock:
+            self._memory_translations[key] = (memory, translated)
+        return translated
+
+    def request_reload(self, settings_changed: bool = False, changed_characters=(), error: str = None,
+                       messages=()) -> None:
+        """
+        Schedule a hot reload, applied before the next turn. Called by the config watcher.
+
+        Args:
+            settings_changed (bool, optional): config.ini or the modelfile changed.
+            changed_characters (iterable, optional): Names of the characters that changed.
+            error (str, optional): Why the last reload failed, reported with the next turn.
+            messages (iterable, optional): Progress messages of the model registration, shown with the next turn.
+        """
+        with self._reload_lock:
+            pending_settings, pending_characters, pending_error, pending_messages = (
+                self.pending_reload or (False, frozenset(), None, ())
+            )
+            self.pending_reload = (
+                pending_settings or settings_changed, pending_characters | frozenset(changed_characters),
+                error or pending_error, pending_messages + tuple(messages)
+            )
+
+    def apply_reload(self) -> None:
+        """
+        Apply the config changes reported since the last turn, keeping the conversation.
+
+        A reloaded config.ini switches the session to the current model
+        registration and settings; a new model drops the Ollama context array. A changed character reloads that character,
+        and only sessions of that character rebuild (and translate) the memory;
+        a character removed from the catalog keeps its current memory. A failed
+        reload is reported here, from the turn, rather than from the watcher thread.
+        """
+        with self._reload_lock:
+            pending, self.pending_reload = self.pending_reload, None
+        if not pending:
+            return
+        settings_changed, changed_characters, error, messages = pending
+        for message in messages:
+            print(message)
+        if error:
+            print(f"Error reloading the configuration, keeping the current settings: {error}")
+
+        if settings_changed:
+            self.register_model = RegisterModel.for_config(self.config_path)
+            config = self.register_model.config
+            if self.register_model.model['name'] != self.model_name:
+                self.model_name = self.register_model.model['name']
+                # A context array holds the old model's tokens; the next turn sends the whole prompt
+                self.context_tokens = None
+                self.context_text = None
+                if self.session_active:
+                    for keep_alive in self.keep_alives:
+                        keep_alive.release()
+                self.keep_alives = self.make_keep_alives(config)
+                if self.session_active:
+                    for keep_alive in self.keep_alives:
+                        keep_alive.acquire()
+            self.apply_settings(config)
+            if not self.summarize_memory:
+                self.summarizer = None
+            elif self.summarizer is None:
+                self.summarizer = MemorySummarizer(self.summarize_messages, on_updated=self.save_summary)
+            if not self.recall_memory:
+                self.long_term_memory = None
+            elif self.long_term_memory is None:
+                self.long_term_memory = self.open_long_term_memory()
+
+        character_changed = self.char_name in changed_characters and bool(self.characters.get(self.char_name))
+        if character_changed:
+            self.load_chat_config(self.char_name, self.language)
+
+        if settings_changed or character_changed:
+            print(f"Configuration reloaded for session {self.session_id}.")
+            self.build_persona()
+
+    def warm_up(self) -> None:
+        """
+        Preload the model with an empty request and pin it for this session.
+
+        The time spent here is the cold-load latency, so the first turn of the
+        conversation is not charged with loading the model.
+        """
+        start_time = time.perf_counter()
+        if all([keep_alive.ping() for keep_alive in self.keep_alives]):
+            self.cold_load_seconds = time.perf_counter() - start_time
+        self.hold_model()
+
+    def hold_model(self) -> None:
+        """
+        Pin the model for this session without preloading it.
+
+        Until close, requests send keep_alive=-1 like the keep-alive refresh,
+        so they never shorten the pin held for the other sessions.
+        """
+        if not self.session_active:
+            for keep_alive in self.keep_alives:
+                keep_alive.acquire()
+            self.session_active = True
+
+    def close(self) -> None:
+        """
+        End the session and release the model keep-alive.
+        """
+        if self.session_active:
+            for keep_alive in self.keep_alives:
+                keep_alive.release()
+            self.session_active = False
+        self.router.forget_session(self.session_id)
+        if self.config_watcher:
+            self.config_watcher.unsubscribe(self)
+
+    def latency_report(self) -> dict:
+        """
+        Return the cold-load latency and the warm turn latency statistics,
+        plus queue wait and generation times when the scheduler is enabled.
+
+        Turns only count as warm once the model was loaded: by a successful
+        warm-up, or else by the first turn, which is reported as the cold load.
+        """
+        turns = sorted(self.turn_latencies)
+        report = {
+            "cold_load_seconds": self.cold_load_seconds,
+            "warm_turns": len(turns),
+            "warm_turn_mean_seconds": sum(turns) / len(turns) if turns else None,
+            "warm_turn_max_seconds": turns[-1] if turns else None
+        }
+        if self.scheduler:
+            report["scheduler"] = self.scheduler.stats()
+        return report
+
+    def add_message(self, role: str, content: str) -> None:
+        """
+        Append a message to the conversation and persist it when the session store is enabled.
+
+        Args:
+            role (str): The speaker, the user name or the character name.
+            content (str): The message text.
+        """
+        self.conversation.append({'role': role, 'content': content})
+        if not self.session_store:
+            return
+        if not self.session_logged:
+            self.session_store.create_session(
+                self.session_id,
+                {"character": self.char_name, "user": self.user, "language": self.language}
+            )
+            self.session_logged = True
+        self.session_store.append_message(self.session_id, role, content)
+        if role == self.char_name and self.context_tokens:
+            self.session_store.save_context(self.session_id, self.context_tokens, self.context_text)
+
+    def resume_session(self, session_id: str, output_language: str = None) -> bool:
+        """
+        Resume a stored session.
+
+        Only the tail of the session log needed to fill the memory window is read,
+        together with the latest Ollama context array. The restored prompt is then
+        prefilled in the background, so the first turn does not evaluate it again.
+
+        Args:
+            session_id (str): The id of the session to resume.
+            output_language (str, optional): Language code to use. Defaults to the stored one.
+
+        Returns:
+            bool: True if the session was resumed, False otherwise.
+        """
+        header = self.session_store.read_header(session_id) if self.session_store else {}
+        if not header:
+            print(f"Error: session '{session_id}' not found.")
+            return False
+
+        self.load_chat_config(header.get("character"), output_language or header.get("language", "en"))
+        self.setup_conversation()
+        self.session_id = session_id
+        self.session_logged = True
+        self.conversation = self.session_store.load_tail(session_id, self.MEMORY_BUDGET)
+        stored_context = self.session_store.load_context(session_id) or {}
+        self.context_tokens = stored_context.get("context")
+        self.context_text = stored_context.get("text")
+        if self.summarizer:
+            self.summarizer.summary = self.session_store.load_summary(session_id)
+        self.long_term_memory = self.open_long_term_memory()
+        if self.conversation:
+            self.prefill()
+        return True
+
+    def prefill(self) -> None:
+        """
+        Have the server evaluate the current prompt once, in the background.
+
+        Ollama keeps the evaluated prompt of the last request and reuses the prefix
+        a new request shares with it, which is what a resumed /api/chat session
+        relies on, since that endpoint returns no context array. The prompt is sent
+        with a budget of one token and the reply is discarded; requests of the
+        session stick to the same server, so the first turn only evaluates the
+        new message.
+        """
+        summary = self.summarizer.get_summary() if self.summarizer else ""
+        prompt = self.prompt_builder.build(self.memory, self.conversation, self.memory_extra(summary, []))
+        path, payload = self.build_payload(prompt, {**self.chat_options, "num_predict": 1})
+        payload["stream"] = False
+
+        def send():
+            return self.router.post(path, payload, session_id=self.session_id)
+
+        def run():
+            try:
+                if self.scheduler:
+                    self.scheduler.submit(self.session_id, send, size=self.prompt_size(prompt)).result()
+                else:
+                    send()
+            except requests.RequestException as e:
+                print(f"Error prefilling the session prompt: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def open_long_term_memory(self):
+        """
+        Open the long-term memory index of the current session and character.
+        NumPy is only imported when long-term memory is enabled.
+
+        Returns:
+            VectorMemory: The index, or None if long-term memory is disabled.
+        """
+        if not self.recall_memory:
+            return None
+        from src.models.vector_memory import VectorMemory
+        character = "".join(c if c.isalnum() else "_" for c in self.char_name)
+        return VectorMemory(self.embed, os.path.join(self.recall_directory, f"{character}_{self.session_id}"))
+
+    def embed(self, text: str) -> list:
+        """
+        Return the embedding of a text from Ollama's embeddings endpoint.
+
+        Raises:
+            requests.RequestException: If the request fails.
+        """
+        payload = {"model": self.embedding_model, "prompt": text}
+        response = self.router.post(self.EMBEDDINGS_PATH, payload, session_id=self.session_id)
+        response.raise_for_status()
+        return response.json()["embedding"]
+
+    def recall(self) -> list:
+        """
+        Return the past messages most relevant to the latest user message.
+        """
+        if not self.long_term_memory:
+            return []
+        query = next((msg['content'] for msg in reversed(self.conversation) if msg['role'] == self.user), "")
+        if not query:
+            return []
+        try:
+            return self.long_term_memory.search(query, self.recall_top_k, self.recall_min_score)
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f"Error recalling memory: {e}")
+            return []
+
+    def summarize_messages(self, previous_summary: str, messages: list) -> str:
+        """
+        Ask the model to fold messages into the running summary of the conversation.
+
+        Runs in the summarizer's background worker, never on the turn's hot path.
+
+        Args:
+            previous_summary (str): The current summary, possibly empty.
+            messages (list): The messages that left the memory window.
+
+        Returns:
+            str: The new summary, or an empty string on failure.
+        """
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        prompt = (
+            f"Summarize the conversation between {self.user} and {self.char_name} in at most "
+            f"{self.SUMMARY_WORDS} words. Keep names, facts, preferences and promises.\n\n"
+            f"Previous summary: {previous_summary or 'None'}\n\n"
+            f"New messages:\n{transcript}\n\n"
+            "Summary:"
+        )
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"temperature": 0.2, "num_predict": self.SUMMARY_WORDS * 2}
+        }
+
+        def send():
+            return self.router.post(self.GENERATE_PATH, payload, session_id=self.session_id)
+
+        if self.scheduler:
+            response = self.scheduler.submit(f"{self.session_id}:summary", send, size=len(prompt)).result()
+        else:
+            response = send()
+        if response.status_code != 200:
+            print("Error summarizing memory:", response.text)
+            return ""
+        return response.json().get("response", "").strip()
+
+    def save_summary(self, summary: str) -> None:
+        """
+        Persist the running summary when the session store is enabled.
+        """
+        if self.session_store and self.session_logged:
+            self.session_store.save_summary(self.session_id, summary)
+
+    def update_memory(self):
         """
         Build and return the current conversation prompt using the conversation history.
+
+        The prompt is rendered by the configured chat template: a list of /api/chat
+        messages, or a text prompt for /api/generate. The character memory is
+        compiled once per session and each message is rendered only once.
+
+        Messages that no longer fit the memory window are dropped; with memory
+        summarization enabled they are first handed to the background summarizer,
+        and the cached summary is inserted right after the character memory. With
+        long-term memory enabled they are also indexed in the background, and the
+        few past messages most similar to the latest user message are recalled.
+        Config changes reloaded since the last turn are applied first.
         """
+        self.apply_reload()
         total_characters = sum(len(item['content']) for item in self.conversation)
-        while total_characters > 4000 and len(self.conversation) > 1:
+        evicted = []
+        while total_characters > self.MEMORY_BUDGET and len(self.conversation) > 1:
             try:
                 removed = self.conversation.pop(0)
+                evicted.append(removed)
                 total_characters -= len(removed['content'])
             except Exception as e:
                 print(f"Error removing old messages: {e}")
                 break
 
-        formatted_conversation = (
-            self.memory
-            + "\n".join(
-                f"{msg['role']}: {msg['content']}" for msg in self.conversation
-            )
-            + f"\n{self.char_name}: "
+        summary = ""
+        if self.summarizer:
+            self.summarizer.submit(evicted)
+            summary = self.summarizer.get_summary()
+
+        recalled = self.recall()
+        if self.long_term_memory:
+            self.long_term_memory.submit(evicted)
+
+        return self.prompt_builder.build(self.memory, self.conversation, self.memory_extra(summary, recalled))
+
+    @staticmethod
+    def memory_extra(summary: str, recalled: list) -> str:
+        """
+        Return the text added after the character memory: the summary and the recalled messages.
+        """
+        return (
+            (f"Summary: {summary}\n" if summary else "")
+            + "".join(f"Recalled: {msg['role']}: {msg['content']}\n" for msg in recalled)
         )
-        return formatted_conversation
 
-    def get_response(self, prompt: str) -> str:
+    @staticmethod
+    def prompt_size(prompt) -> int:
+        """
+        Return the size of a prompt in characters, for text prompts and /api/chat messages alike.
+        """
+        if isinstance(prompt, str):
+            return len(prompt)
+        return sum(len(message['content']) for message in prompt)
+
+    def cancel_generation(self) -> None:
+        """
+        Stop the generations in progress, e.g. when the user sends a new message.
+
+        Streamed generations stop at their next chunk and return the text so far,
+        cut back to its last complete sentence.
         """
-        Query the backend model and return the generated response.
+        with self.generation_lock:
+            self.cancelled_seq = self.generation_seq
+
+    def make_output_filter(self) -> FilterChain:
+        """
+        Return the filter chain cleaning one reply as it streams: cut at stop
+        sequences, strip speaker tags, then apply the configured regex rules.
         """
-        response = requests.post(
-            self.OLLAMA_SERVER_URL,
-            json={
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": self.chat_options
-            }
+        return FilterChain(
+            [StopSequenceFilter(self.stop_sequence), SpeakerTagFilter([self.char_name])]
+            + [RegexFilter(pattern, replacement) for pattern, replacement in self.output_rules]
         )
 
-        if response.status_code == 200:
-            res_text = response.json().get("response", "").strip()
-            # Append punctuation if missing.
-            if res_text and res_text[-1] not in ['?', '!', "."]:
-                res_text += "."
-            if f"{self.char_name}: " in res_text:
-                res_text = res_text.replace(f"{self.char_name}: ", "")
-            return res_text
+    def stream_generation(self, path: str, payload: dict, seq: int, soft_limit: int, cancelled=None) -> dict:
+        """
+        Stream a generation through the output filters, stopping at a sentence end
+        once soft_limit tokens are generated, at a stop sequence, or at the next
+        chunk once the generation is cancelled (by cancel_generation or the cancelled event).
+
+        Returns:
+            dict: The filtered 'text', the final 'stats' and the 'done_reason'.
+        """
+        output_filter = self.make_output_filter()
+        chunks = []
+        text = []
+        data = {}
+        with self.router.stream(path, payload, session_id=self.session_id) as response:
+            if response.status_code != 200:
+                return {"error": response.text}
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                chunks.append(data["message"].get("content", "") if "message" in data else data.get("response", ""))
+                text.append(output_filter.feed(chunks[-1]))
+                if data.get("done"):
+                    break
+                if output_filter.stopped:
+                    data = {"eval_count": len(chunks), "done_reason": "stop"}
+                    break
+                if self.cancelled_seq >= seq or (cancelled is not None and cancelled.is_set()):
+                    data = {"eval_count": len(chunks), "done_reason": "cancelled"}
+                    break
+                if soft_limit and len(chunks) >= soft_limit and ends_sentence("".join(chunks[-4:])):
+                    data = {"eval_count": len(chunks), "done_reason": "sentence"}
+                    break
+        text.append(output_filter.flush())
+        return {"text": "".join(text), "stats": data, "done_reason": data.get("done_reason")}
+
+    def build_payload(self, prompt, options: dict) -> tuple:
+        """
+        Return the endpoint and the request body for a prompt from update_memory.
+
+        The prompt goes to the endpoint of the chat template (ChatTemplate.path):
+        messages to /api/chat, a rendered text prompt to /api/generate. Ollama only applies a context array to templated (not raw) /api/generate
+        requests; when the prompt extends the text the session's context array
+        covers, the array is sent with just the new text, so the conversation so
+        far is not evaluated again.
+
+        Returns:
+            tuple: The API path and the JSON payload.
+        """
+        payload = {
+            "model": self.model_name,
+            "stream": self.stream_responses,
+            "keep_alive": -1 if self.session_active else self.release_keep_alive,
+            "options": options
+        }
+        if self.template.path == self.CHAT_PATH:
+            payload["messages"] = prompt
+            return self.CHAT_PATH, payload
+
+        payload["prompt"] = prompt
+        payload["raw"] = self.template.raw
+        if not payload["raw"] and self.context_tokens and self.context_text and prompt.startswith(self.context_text):
+            payload["prompt"] = prompt[len(self.context_text):]
+            payload["context"] = self.context_tokens
+        return self.GENERATE_PATH, payload
+
+    def generate(self, prompt, input_method: str = "keyboard", share: bool = True, cancelled=None) -> tuple:
+        """
+        Query the backend model and return the generated response, without recording
+        anything on the session.
+
+        The prompt from update_memory is sent to the endpoint of the chat template
+        (see build_payload). The generation budget (num_predict) is chosen per
+        turn by the generation policy from the input and the recent reply lengths.
+        Streamed replies stop at a sentence end near the budget, and replies cut by
+        the budget or by cancel_generation are trimmed to their last full sentence.
+
+        When the response cache is enabled and the options are deterministic
+        (temperature 0 or a fixed seed), repeated prompts are answered from the cache.
+        When the scheduler is enabled, the request waits for admission, and identical
+        requests in flight (same model, endpoint, prompt and options) share one generation.
+
+        Alternatives generated in the background call this directly, so the replies
+        that are discarded leave the session's statistics untouched; the reply that
+        is used is recorded with record_response.
+
+        Args:
+            prompt (list or str): The prompt from update_memory.
+            input_method (str, optional): 'keyboard' or 'mic', used to size the reply. Defaults to 'keyboard'.
+            share (bool, optional): Let an identical request in flight answer this one. Alternatives
+                to the same prompt pass False, so each gets its own generation. Defaults to True.
+            cancelled (threading.Event, optional): Once set, the generation is not started, or stops
+                at its next streamed chunk, even if it began after cancel_generation. Defaults to None.
+
+        Returns:
+            tuple: The response (empty on error) and its outcome for record_response (None on error).
+        """
+        options = dict(self.chat_options)
+        if self.generation_policy:
+            user_message = next((msg['content'] for msg in reversed(self.conversation) if msg['role'] == self.user), "")
+            options["num_predict"] = self.generation_policy.budget(user_message, input_method)
+        soft_limit = self.generation_policy.soft_limit(options["num_predict"]) if self.generation_policy else 0
+
+        cache_key = None
+        if ResponseCache.is_deterministic(options):
+            cache_key = ResponseCache.make_key(self.model_name, prompt, options)
+            if self.response_cache:
+                cached_response = self.response_cache.get(cache_key)
+                if cached_response is not None:
+                    return cached_response, {"cached": True}
+
+        path, payload = self.build_payload(prompt, options)
+        request_key = ResponseCache.make_key(self.model_name, [path, prompt], options) if share else None
+
+        with self.generation_lock:
+            self.generation_seq += 1
+            seq = self.generation_seq
+
+        def send():
+            if cancelled is not None and cancelled.is_set():
+                return {"text": "", "stats": {}, "done_reason": "cancelled"}
+            if self.stream_responses:
+                return self.stream_generation(path, payload, seq, soft_limit, cancelled)
+            response = self.router.post(path, payload, session_id=self.session_id)
+            if response.status_code != 200:
+                return {"error": response.text}
+            data = response.json()
+            text = data["message"].get("content", "") if "message" in data else data.get("response", "")
+            return {"text": self.make_output_filter().apply(text), "stats": data, "done_reason": data.get("done_reason")}
+
+        start_time = time.perf_counter()
+        try:
+            if self.scheduler:
+                result = self.scheduler.submit(
+                    self.session_id, send, size=self.prompt_size(prompt), key=request_key
+                ).result()
+            else:
+                result = send()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error retrieving response: {e}")
+            return "", None
+        elapsed = time.perf_counter() - start_time
+
+        if "error" in result:
+            print("Error retrieving response:", result["error"])
+            return "", None
+
+        res_text = result["text"].strip()
+        if result["done_reason"] in ("length", "cancelled"):
+            res_text = trim_to_sentence(res_text)
+        res_text = punctuate(res_text)
+        if self.response_cache and cache_key and res_text and result["done_reason"] != "cancelled":
+            self.response_cache.set(cache_key, res_text)
+        return res_text, {
+            "stats": result["stats"], "done_reason": result["done_reason"], "elapsed": elapsed,
+            "context_text": prompt + res_text if path == self.GENERATE_PATH else None
+        }
+
+    def record_response(self, outcome: dict, replace: bool = False) -> None:
+        """
+        Record the reply used in the conversation: its eval statistics, its Ollama
+        context, its length for the generation policy and its latency as a turn.
+
+        Args:
+            outcome (dict): The outcome returned by generate, or None if it failed.
+            replace (bool, optional): The reply is an alternative accepted in place of the last
+                recorded one. It replaces that reply in the generation policy (if that one was
+                recorded there; cached and cancelled replies are not), and its latency is not
+                counted as a turn, since it was generated in the background. Defaults to False.
+        """
+        if outcome is None or outcome.get("cached"):
+            if outcome is not None:
+                self.last_response_stats = {}
+            if not replace:
+                self.response_recorded = False
+            return
+
+        data = outcome["stats"]
+        self.last_response_stats = {key: data.get(key) for key in self.RESPONSE_STATS}
+        if data.get("context"):
+            # Streams stopped early return no context; the previous one still covers the prompt up to this turn
+            self.context_tokens = data["context"]
+            self.context_text = outcome["context_text"]
+        if self.generation_policy and outcome["done_reason"] != "cancelled":
+            if replace and self.response_recorded and self.generation_policy.recent:
+                self.generation_policy.recent.pop()
+            self.generation_policy.record(data.get("eval_count") or 0, outcome["done_reason"] == "length")
+            self.response_recorded = True
+        elif not replace:
+            self.response_recorded = False
+        if replace:
+            return
+        if self.cold_load_seconds is None:
+            # The warm-up failed or did not run, so this turn loaded the model
+            self.cold_load_seconds = outcome["elapsed"]
         else:
-            print("Error retrieving response:", response.text)
-            return ""
+            self.turn_latencies.append(outcome["elapsed"])
+
+    def get_response(self, prompt, input_method: str = "keyboard") -> str:
+        """
+        Query the backend model, record the reply's statistics and return it.
+
+        See generate and record_response.
+
+        Args:
+            prompt (list or str): The prompt from update_memory.
+            input_method (str, optional): 'keyboard' or 'mic', used to size the reply. Defaults to 'keyboard'.
+        """
+        response, outcome = self.generate(prompt, input_method)
+        self.record_response(outcome)
+        return response
 
     def get_all_characters(self, config_path: str = "chat_config.json") -> list:
         try:
@@ -153,13 +916,10 @@ class ChatBase:
         """
         Return the names of all available characters.
         """
-        return [char["character"]["name"] for char in self.get_all_characters()]
+        return list(self.characters.names)
     
     def get_character_info(self, character_name: str) -> dict:
         """
         Retrieve the character information for the given character name.
         """
-        for char in self.get_all_characters():
-            if char["character"]["name"] == character_name:
-                return char
-        return {}
+        return self.characters.get(character_name)
@@ -0,0 +1,88 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class ChatSession:
+    """
+    A class to run the turns of one conversation one at a time, in order.
+
+    Every input source (keyboard, microphone) submits its turns here instead of
+    calling the turn function from its own thread. A single worker takes turns
+    from a FIFO queue, so turns never overlap and run in submission order, while
+    the sources stay free to capture the next input (the mic can record the next
+    utterance while the previous turn is generating).
+
+    Attributes:
+        process_turn (callable): Called as process_turn(user_message, *args) for each turn.
+        submitted (int): Number of turns submitted so far.
+    """
+    __slots__ = ("process_turn", "turns", "submitted", "lock", "closed", "worker")
+    _STOP = object()
+
+    def __init__(self, process_turn, name: str = "chat-session"):
+        self.process_turn = process_turn
+        self.turns = queue.Queue()
+        self.submitted = 0
+        self.lock = threading.Lock()
+        self.closed = False
+        self.worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self.worker.start()
+
+    def submit(self, user_message: str, *args) -> Future:
+        """
+        Queue a turn behind the ones already submitted.
+
+        Args:
+            user_message (str): The user's message.
+            *args: Extra arguments passed to the turn function.
+
+        Returns:
+            Future: Resolves with the turn function's result once the turn has run.
+        """
+        future = Future()
+        with self.lock:
+            if self.closed:
+                future.set_exception(RuntimeError("Chat session is closed."))
+                return future
+            self.submitted += 1
+            self.turns.put((future, user_message, args))
+        return future
+
+    def _run(self) -> None:
+        """
+        Run queued turns one after the other until the session is closed.
+        """
+        while True:
+            item = self.turns.get()
+            if item is self._STOP:
+                return
+            future, user_message, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.process_turn(user_message, *args))
+            except Exception as e:
+                print(f"Error processing turn: {e}")
+                future.set_exception(e)
+
+    def pending(self) -> int:
+        """
+        Return the number of turns waiting to run.
+        """
+        return self.turns.qsize()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting turns; the ones already queued still run.
+
+        Args:
+            wait (bool, optional): Wait for the queued turns to finish. Defaults to True.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.turns.put(self._STOP)
+        if wait:
+            self.worker.join()
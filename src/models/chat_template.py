@@ -0,0 +1,164 @@
+class ChatTemplate:
+    """
+    A class to turn the conversation into the request format of a model.
+
+    The default template sends role-tagged messages to Ollama's /api/chat, so the
+    server applies the model's own chat format (from its Modelfile). Subclasses
+    render a format on the client for /api/generate, for models without one.
+
+    Attributes:
+        name (str): The name used in config.ini.
+        path (str): The Ollama endpoint the rendered prompt is sent to.
+        raw (bool): Send the prompt with raw=True, bypassing the Modelfile template.
+        stop (list): Stop sequences marking the end of a turn in this format.
+    """
+    name = "chat"
+    path = "/api/chat"
+    raw = False
+    stop = []
+
+    def compile_system(self, system: str):
+        """
+        Precompile the static system segment, split around the per-turn extra text.
+
+        Returns:
+            tuple: The segment before and after the extra text.
+        """
+        return system, ""
+
+    def render_message(self, speaker: str, content: str, is_user: bool):
+        """
+        Render one conversation message.
+        """
+        return {"role": "user" if is_user else "assistant", "content": content}
+
+    def build(self, system: tuple, extra: str, segments: list, char_name: str):
+        """
+        Assemble the prompt from the precompiled system segment and rendered messages.
+
+        Returns:
+            list: The /api/chat messages.
+        """
+        return [{"role": "system", "content": system[0] + extra + system[1]}] + segments
+
+
+class TextChatTemplate(ChatTemplate):
+    """
+    A template rendered to text on the client and sent to /api/generate.
+
+    Attributes:
+        system_format (str): Format of the system segment, with a {content} field.
+        user_format (str): Format of a user message, with {speaker} and {content} fields.
+        assistant_format (str): Format of a character message.
+        reply_format (str): Opens the character's reply, with a {speaker} field.
+    """
+    path = "/api/generate"
+    raw = True
+    system_format = "{content}"
+    user_format = "{speaker}: {content}\n"
+    assistant_format = "{speaker}: {content}\n"
+    reply_format = "{speaker}: "
+
+    def compile_system(self, system: str):
+        before, after = self.system_format.split("{content}")
+        return before + system, after
+
+    def render_message(self, speaker: str, content: str, is_user: bool):
+        message_format = self.user_format if is_user else self.assistant_format
+        return message_format.format(speaker=speaker, content=content)
+
+    def build(self, system: tuple, extra: str, segments: list, char_name: str):
+        return system[0] + extra + system[1] + "".join(segments) + self.reply_format.format(speaker=char_name)
+
+
+class PlainChatTemplate(TextChatTemplate):
+    """
+    The original "Name: message" transcript, wrapped by the Modelfile template.
+    """
+    name = "plain"
+    raw = False
+
+
+class ChatMLTemplate(TextChatTemplate):
+    """
+    ChatML, used by Qwen, Yi, OpenHermes and many fine-tunes.
+    """
+    name = "chatml"
+    stop = ["<|im_end|>", "<|im_start|>"]
+    system_format = "<|im_start|>system\n{content}<|im_end|>\n"
+    user_format = "<|im_start|>user\n{content}<|im_end|>\n"
+    assistant_format = "<|im_start|>assistant\n{content}<|im_end|>\n"
+    reply_format = "<|im_start|>assistant\n"
+
+
+class Llama3Template(TextChatTemplate):
+    """
+    The Llama 3 instruct format.
+    """
+    name = "llama3"
+    stop = ["<|eot_id|>", "<|start_header_id|>"]
+    system_format = "<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{content}<|eot_id|>"
+    user_format = "<|start_header_id|>user<|end_header_id|>\n\n{content}<|eot_id|>"
+    assistant_format = "<|start_header_id|>assistant<|end_header_id|>\n\n{content}<|eot_id|>"
+    reply_format = "<|start_header_id|>assistant<|end_header_id|>\n\n"
+
+
+# Templates hold no state, so one instance of each is shared by every session
+TEMPLATES = {template.name: template() for template in (ChatTemplate, PlainChatTemplate, ChatMLTemplate, Llama3Template)}
+
+
+def get_template(name: str) -> ChatTemplate:
+    """
+    Return the template configured by name, falling back to /api/chat.
+    """
+    if name not in TEMPLATES:
+        print(f"Error: unknown chat template '{name}', using 'chat'.")
+        name = "chat"
+    return TEMPLATES[name]
+
+
+class PromptBuilder:
+    """
+    A class to build the prompt of one session incrementally.
+
+    The system segment is compiled once (again only if the character memory
+    changes, e.g. after translation), and every message is rendered once, when
+    it first appears in the conversation; each turn only renders the new
+    messages and assembles the cached segments.
+    """
+    __slots__ = ("template", "user", "char_name", "system_source", "system", "segments")
+
+    def __init__(self, template: ChatTemplate, user: str, char_name: str):
+        self.template = template
+        self.user = user
+        self.char_name = char_name
+        self.system_source = None
+        self.system = None
+        self.segments = {}
+
+    def build(self, system: str, conversation: list, extra: str = ""):
+        """
+        Return the prompt for the current conversation.
+
+        Args:
+            system (str): The character memory.
+            conversation (list): The {'role', 'content'} messages in the memory window.
+            extra (str, optional): Text added to the system segment this turn (summary, recalled messages).
+
+        Returns:
+            list or str: /api/chat messages, or the text prompt for /api/generate.
+        """
+        if system != self.system_source:
+            self.system_source = system
+            self.system = self.template.compile_system(system)
+
+        segments = {}
+        for message in conversation:
+            cached = self.segments.get(id(message))
+            if cached is None or cached[0] is not message:
+                cached = (message, self.template.render_message(
+                    message['role'], message['content'], message['role'] == self.user
+                ))
+            segments[id(message)] = cached
+        self.segments = segments
+        return self.template.build(self.system, extra, [segment for _, segment in segments.values()], self.char_name)
@@ -0,0 +1,155 @@
+import os
+import threading
+from src.models.model_register import RegisterModel
+
+
+class ConfigWatcher:
+    """
+    A class to reload config.ini, the modelfile and the characters while sessions run.
+
+    A background thread polls the modification time and size of the files. When
+    config.ini or the modelfile changes, the model registration is rerun (the
+    model is only created again if its modelfile changed) and every live session
+    is told to switch to the new settings. When the characters change, the
+    character index is reloaded and the sessions are told which characters
+    changed. Sessions apply the changes before their next turn, so a turn in
+    progress is never affected and the conversation is kept.
+
+    The watcher never prints, since it runs while the terminal waits for input:
+    the registration runs quietly and its messages, like the error of a failed
+    reload or of an unreadable characters file, are handed to the sessions,
+    which show them with their next turn. A failed reload is retried at every
+    check until it succeeds.
+
+    Attributes:
+        config_path (str): Path of config.ini.
+        characters (CharacterIndex): The character index to refresh.
+        interval (float): Seconds between two checks.
+        reloads (int): Number of reloads of config.ini.
+        last_error (str): The error of the last failed check, or None.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, config_path: str, characters, interval: float = 2.0):
+        self.config_path = config_path
+        self.characters = characters
+        self.interval = interval
+        self.reloads = 0
+        self.last_error = None
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.stamps = self.config_stamps()
+        self.characters.listeners.append(self.characters_changed)
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def from_config(cls, config_path: str, config, characters):
+        """
+        Return the process-wide watcher of a config file, configured in the [HotReload] section.
+
+        Args:
+            config_path (str): Path of config.ini.
+            config (configparser.ConfigParser): The parsed config.ini.
+            characters (CharacterIndex): The character index to refresh.
+
+        Returns:
+            ConfigWatcher: The shared watcher, or None if hot reload is disabled.
+        """
+        if not config.getboolean("HotReload", "enabled", fallback=False):
+            return None
+        key = os.path.abspath(config_path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(
+                    config_path, characters, interval=config.getfloat("HotReload", "interval_seconds", fallback=2.0)
+                )
+            return cls._instances[key]
+
+    @staticmethod
+    def stamp(path: str):
+        """
+        Return the modification time and size of a file, or None if it is missing.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def config_stamps(self, register_model: RegisterModel = None) -> dict:
+        """
+        Return the stamps of config.ini and of the modelfile it names.
+
+        Args:
+            register_model (RegisterModel, optional): The registration naming the modelfile.
+                Defaults to the shared registration of config.ini.
+        """
+        register_model = register_model or RegisterModel.for_config(self.config_path)
+        return {path: self.stamp(path) for path in (self.config_path, register_model.model["path"])}
+
+    def subscribe(self, chat) -> None:
+        """
+        Tell a session about the changes from now on.
+        """
+        with self.lock:
+            self.sessions.add(chat)
+
+    def unsubscribe(self, chat) -> None:
+        with self.lock:
+            self.sessions.discard(chat)
+
+    def notify(self, settings_changed: bool = False, changed_characters=(), error: str = None, messages=()) -> None:
+        with self.lock:
+            sessions = list(self.sessions)
+        for chat in sessions:
+            chat.request_reload(settings_changed, changed_characters, error, messages)
+
+    def characters_changed(self, names: set) -> None:
+        """
+        Called by the character index after a reload changed characters.
+        """
+        self.notify(changed_characters=names)
+
+    def check(self) -> None:
+        """
+        Reload whatever changed since the last check.
+
+        The stamps are only updated after a successful reload, so a failed one
+        is tried again at the next check. They are taken from the new
+        registration, so a modelfile moved to another path is watched from then on.
+
+        Raises:
+            Exception: Why config.ini or the characters file could not be loaded.
+        """
+        stamps = self.config_stamps()
+        if stamps != self.stamps:
+            register_model = RegisterModel.reload(self.config_path, verbose=False)
+            new_stamps = self.config_stamps(register_model)
+            # Keep the stamps read before the reload, so edits made during it are seen next time
+            self.stamps = {path: stamps.get(path, stamp) for path, stamp in new_stamps.items()}
+            self.reloads += 1
+            self.notify(settings_changed=True, messages=tuple(register_model.messages))
+        self.characters.refresh()
+        if self.characters.load_error:
+            raise ValueError(self.characters.load_error)
+
+    def _run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as e:
+                # Report each new failure once; the sessions keep their current settings meanwhile
+                if str(e) != self.last_error:
+                    self.last_error = str(e)
+                    self.notify(error=self.last_error)
+
+    def stop(self) -> None:
+        """
+        Stop watching the files.
+        """
+        self.stop_event.set()
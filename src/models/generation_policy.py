@@ -0,0 +1,117 @@
+import re
+import statistics
+from collections import deque
+
+SENTENCE_END = re.compile(r"[.!?…][\"'”’)\]]*\s*$")
+SENTENCE_BREAK = re.compile(r"[.!?…][\"'”’)\]]*(?=\s|$)")
+
+
+def ends_sentence(text: str) -> bool:
+    """
+    Return True if the text ends at a sentence boundary.
+    """
+    return bool(SENTENCE_END.search(text))
+
+
+def trim_to_sentence(text: str) -> str:
+    """
+    Cut a reply that was stopped mid-sentence back to its last complete sentence.
+
+    The text is kept as is when it has no sentence boundary in its second half,
+    so a long first sentence is not thrown away.
+    """
+    text = text.rstrip()
+    if ends_sentence(text):
+        return text
+    breaks = [match.end() for match in SENTENCE_BREAK.finditer(text)]
+    if breaks and breaks[-1] >= len(text) // 2:
+        return text[:breaks[-1]]
+    return text
+
+
+class GenerationPolicy:
+    """
+    A class to choose the generation budget (num_predict) of each turn.
+
+    The budget starts from the recent reply lengths of the session and is scaled
+    by the kind of input: open questions and requests get more room, short
+    remarks and spoken (mic) input less. Replies that hit the budget count as
+    longer than they were, so the budget grows when replies are being cut.
+    While streaming, generation stops at the first sentence boundary after
+    soft_ratio of the budget, instead of running into the limit mid-sentence.
+
+    Attributes:
+        default_tokens (int): Budget before any reply was seen.
+        min_tokens (int): Lower bound of the budget.
+        max_tokens (int): Upper bound of the budget.
+        soft_ratio (float): Fraction of the budget after which a sentence end stops generation.
+        recent (deque): Token counts of the recent replies.
+    """
+    __slots__ = ("default_tokens", "min_tokens", "max_tokens", "soft_ratio", "recent")
+    OPEN_ENDED = re.compile(r"\b(what|why|how|tell|explain|describe|story|imagine|can you|could you)\b")
+
+    def __init__(self, default_tokens: int = 120, min_tokens: int = 24, max_tokens: int = 320,
+                 soft_ratio: float = 0.75, history: int = 8):
+        self.default_tokens = default_tokens
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.soft_ratio = soft_ratio
+        self.recent = deque(maxlen=history)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return a new policy for one session, configured in the [Generation] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            GenerationPolicy: The policy, or None if the budget is fixed.
+        """
+        if not config.getboolean("Generation", "adaptive", fallback=True):
+            return None
+        return cls(
+            default_tokens=config.getint("Generation", "num_predict", fallback=120),
+            min_tokens=config.getint("Generation", "min_predict", fallback=24),
+            max_tokens=config.getint("Generation", "max_predict", fallback=320)
+        )
+
+    def budget(self, user_message: str, input_method: str = "keyboard") -> int:
+        """
+        Return the num_predict for a reply to the user's message.
+
+        Args:
+            user_message (str): The latest user message.
+            input_method (str, optional): 'keyboard' or 'mic'. Defaults to 'keyboard'.
+        """
+        if self.recent:
+            tokens = statistics.median(self.recent) * 1.25 + 8
+        else:
+            tokens = self.default_tokens
+
+        message = user_message.lower()
+        if self.OPEN_ENDED.search(message):
+            tokens *= 1.5
+        elif len(message.split()) <= 3:
+            tokens *= 0.6
+        if input_method == "mic":
+            tokens *= 0.75
+        return int(min(self.max_tokens, max(self.min_tokens, tokens)))
+
+    def soft_limit(self, budget: int) -> int:
+        """
+        Return the token count after which a sentence end stops a streamed reply.
+        """
+        return int(budget * self.soft_ratio)
+
+    def record(self, tokens: int, truncated: bool) -> None:
+        """
+        Record the length of a reply.
+
+        Args:
+            tokens (int): Tokens generated.
+            truncated (bool): Whether the reply hit the budget.
+        """
+        if tokens:
+            self.recent.append(tokens * 1.5 if truncated else tokens)
@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MemorySummarizer:
+    """
+    A class to fold messages evicted from the memory window into a running summary.
+
+    Evicted messages are queued and summarized by a background LLM call, off the
+    turn's hot path. The latest summary is cached and returned immediately; a turn
+    never waits for summarization. Work of one conversation is serialized, and all
+    conversations share a small worker pool.
+
+    Attributes:
+        summarize (callable): Called as summarize(previous_summary, messages) -> str.
+        summary (str): The current running summary.
+    """
+    __slots__ = ("summarize", "summary", "on_updated", "pending", "running", "lock")
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, summarize, summary: str = "", on_updated=None):
+        """
+        Args:
+            summarize (callable): Produces a new summary from the previous one and new messages.
+            summary (str, optional): The summary to start from. Defaults to "".
+            on_updated (callable, optional): Called with the new summary after each update.
+        """
+        self.summarize = summarize
+        self.summary = summary
+        self.on_updated = on_updated
+
+        self.pending = []
+        self.running = False
+        self.lock = threading.Lock()
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        """
+        Return the worker pool shared by every conversation.
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+            return cls._executor
+
+    def submit(self, messages: list) -> None:
+        """
+        Queue evicted messages to be folded into the summary in the background.
+
+        Args:
+            messages (list): The evicted {'role', 'content'} messages, oldest first.
+        """
+        if not messages:
+            return
+        with self.lock:
+            self.pending.extend(messages)
+            if self.running:
+                return
+            self.running = True
+        self.executor().submit(self._run)
+
+    def _run(self) -> None:
+        """
+        Summarize queued messages until the queue is empty.
+        """
+        while True:
+            with self.lock:
+                batch, self.pending = self.pending, []
+                if not batch:
+                    self.running = False
+                    return
+                previous_summary = self.summary
+
+            try:
+                summary = self.summarize(previous_summary, batch)
+            except Exception as e:
+                print(f"Error summarizing memory: {e}")
+                summary = ""
+
+            if summary:
+                with self.lock:
+                    self.summary = summary
+                if self.on_updated:
+                    self.on_updated(summary)
+
+    def get_summary(self) -> str:
+        """
+        Return the cached running summary.
+        """
+        with self.lock:
+            return self.summary
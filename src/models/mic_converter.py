@@ -1,24 +1,70 @@
 import os
+import time
 import wave
 import json
-import pyaudio
-import keyboard
-from vosk import Model, KaldiRecognizer, SetLogLevel
-SetLogLevel(-1)
+import threading
+from src.models.audio_buffer import AudioRingBuffer, pcm_chunks
 
 
 class MicConverter:
     """
     A class to handle audio recording from the microphone and
     transcription using the Vosk model.
+
+    PyAudio, keyboard and Vosk are imported, and the Vosk model loaded, on the
+    first recording, so creating a converter that is never used costs nothing.
+    A Vosk model is read-only once loaded, so it is loaded once per process and
+    shared by every converter of the same language.
+
+    The microphone is captured into a preallocated ring buffer holding at most
+    max_seconds of audio, which is handed to the recognizer and the WAV writer
+    as memoryviews instead of being joined into a new bytes object.
     """
-    def __init__(self, input_language: str = "en"):
+    __slots__ = (
+        "output_filename", "last_timings", "model", "pool", "model_path", "max_seconds", "save_wav", "buffer"
+    )
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, input_language: str = "en", pool=None, max_seconds: float = 60, save_wav: bool = True):
         """
         Initialize the MicConverter.
+
+        Args:
+            input_language (str, optional): The language spoken. Defaults to "en".
+            pool (SpeechWorkerPool, optional): Worker processes to decode in. Defaults to decoding in this process.
+            max_seconds (float, optional): Longest utterance kept; older audio is dropped. Defaults to 60.
+            save_wav (bool, optional): Also write each recording to output_filename. Defaults to True.
         """
         self.output_filename = os.path.abspath(r"audio\input.wav")
+        self.last_timings = {}
+        self.model = None
+        self.pool = pool
+        self.max_seconds = max_seconds
+        self.save_wav = save_wav
+        self.buffer = None
         self.define_model(input_language)
 
+    @classmethod
+    def from_config(cls, config, input_language: str = "en", pool=None):
+        """
+        Return a new converter configured in the [Microphone] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+            input_language (str, optional): The language spoken. Defaults to "en".
+            pool (SpeechWorkerPool, optional): Worker processes to decode in.
+
+        Returns:
+            MicConverter: The converter.
+        """
+        return cls(
+            input_language,
+            pool=pool,
+            max_seconds=config.getfloat("Microphone", "max_utterance_seconds", fallback=60),
+            save_wav=config.getboolean("Microphone", "save_wav", fallback=True)
+        )
+
     def define_model(self, input_language: str):
         """
         Define the Vosk model to be used for transcription.
@@ -36,18 +82,34 @@ class MicConverter:
         if not os.path.exists(self.model_path):
             print("Error: Vosk model not found!")
             return ""
-            
-        self.model = Model(self.model_path)
+
+    def load_model(self):
+        """
+        Load the Vosk model on first use, or reuse the one already loaded in this process.
+        """
+        if self.model is None:
+            with self._models_lock:
+                if self.model_path not in self._models:
+                    from vosk import Model, SetLogLevel
+                    SetLogLevel(-1)
+                    self._models[self.model_path] = Model(self.model_path)
+            self.model = self._models[self.model_path]
+        return self.model
 
 
     def record_audio(self) -> str:
         """
         Records audio from the user's microphone until the RIGHT_SHIFT key is released,
-        saves it as a WAV file, and transcribes the audio using the Vosk model.
+        optionally saves it as a WAV file, and transcribes the audio using the Vosk model.
+
+        The time spent capturing and decoding is stored in last_timings.
 
         Returns:
             str: The transcription as produced by the Vosk model.
         """
+        import pyaudio
+        import keyboard
+
         CHUNK = 1024
         FORMAT = pyaudio.paInt16
         CHANNELS = 1
@@ -62,12 +124,18 @@ class MicConverter:
             frames_per_buffer=CHUNK,
         )
 
-        frames = []
+        # Allocated on the first recording and reused by the next ones
+        if self.buffer is None:
+            self.buffer = AudioRingBuffer.for_duration(
+                self.max_seconds, RATE, audio_interface.get_sample_size(FORMAT), CHANNELS
+            )
+        self.buffer.clear()
+
+        capture_start = time.perf_counter()
         recording = True
         while recording:
             if keyboard.is_pressed("SPACE"):
-                frame = audio_stream.read(CHUNK)
-                frames.append(frame)
+                self.buffer.write(audio_stream.read(CHUNK))
 
             # Check if the key is released
             if not keyboard.is_pressed("SPACE"):
@@ -77,13 +145,23 @@ class MicConverter:
         audio_stream.close()
         audio_interface.terminate()
 
-        with wave.open(self.output_filename, "wb") as wave_file:
-            wave_file.setnchannels(CHANNELS)
-            wave_file.setsampwidth(audio_interface.get_sample_size(FORMAT))
-            wave_file.setframerate(RATE)
-            wave_file.writeframes(b"".join(frames))
-
-        transcription = self.transcribe_audio(self.output_filename)
+        if self.buffer.dropped:
+            print(f"Recording longer than {self.max_seconds:g} seconds; only the last {self.max_seconds:g} seconds are kept.")
+
+        if self.save_wav:
+            with wave.open(self.output_filename, "wb") as wave_file:
+                wave_file.setnchannels(CHANNELS)
+                wave_file.setsampwidth(audio_interface.get_sample_size(FORMAT))
+                wave_file.setframerate(RATE)
+                for segment in self.buffer.segments():
+                    wave_file.writeframesraw(segment)
+
+        decode_start = time.perf_counter()
+        transcription = self.transcribe_pcm(self.buffer, RATE)
+        self.last_timings = {
+            "mic_capture": decode_start - capture_start,
+            "vosk_decode": time.perf_counter() - decode_start
+        }
         return transcription
     
     def transcribe_audio(self, audio_path: str) -> str:
@@ -100,27 +178,64 @@ class MicConverter:
             str: The complete transcription as a single string.
                 Returns an empty string if an error occurs.
         """
-        transcription_fragments = []
         try:
             with wave.open(audio_path, "rb") as wf:
                 if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
                     print("Error: The audio file must be a mono WAV in PCM format.")
                     return ""
+                sample_rate = wf.getframerate()
+                pcm = wf.readframes(wf.getnframes())
+        except Exception as error:
+            print("Error during transcription:", error)
+            return ""
+        return self.transcribe_pcm(pcm, sample_rate)
+
+    def transcribe_pcm(self, pcm, sample_rate: int) -> str:
+        """
+        Transcribes 16-bit mono PCM audio, in a worker process when the speech worker pool is enabled.
+
+        Args:
+            pcm (AudioRingBuffer or bytes-like): The audio samples.
+            sample_rate (int): The sample rate of the audio.
 
-                recognizer = KaldiRecognizer(self.model, wf.getframerate())
-                data = wf.readframes(4000)
-                while data:
-                    if recognizer.AcceptWaveform(data):
-                        result = json.loads(recognizer.Result())
-                        transcription_fragments.append(result.get("text", ""))
-                    data = wf.readframes(4000)
-                final_result = json.loads(recognizer.FinalResult())
-                transcription_fragments.append(final_result.get("text", ""))
+        Returns:
+            str: The transcription, or an empty string if an error occurs.
+        """
+        try:
+            if self.pool:
+                return self.pool.transcribe(self.model_path, pcm, sample_rate)
+            return recognize_pcm(self.load_model(), pcm, sample_rate)
         except Exception as error:
             print("Error during transcription:", error)
             return ""
 
-        transcription = " ".join(
-            fragment for fragment in transcription_fragments if fragment
-        ).strip()
-        return transcription
\ No newline at end of file
+
+def recognize_pcm(model, pcm, sample_rate: int, chunk_bytes: int = 8000) -> str:
+    """
+    Run the Vosk recognizer over 16-bit mono PCM audio.
+
+    Args:
+        model (vosk.Model): The loaded Vosk model.
+        pcm (AudioRingBuffer or bytes-like): The audio samples.
+        sample_rate (int): The sample rate of the audio.
+        chunk_bytes (int, optional): Bytes fed to the recognizer at a time. Defaults to 8000 (4000 frames).
+
+    Returns:
+        str: The complete transcription as a single string.
+    """
+    from vosk import KaldiRecognizer
+
+    recognizer = KaldiRecognizer(model, sample_rate)
+    transcription_fragments = []
+    for chunk in pcm_chunks(pcm, chunk_bytes):
+        # Vosk's cffi binding only accepts bytes, so each chunk is copied at the call
+        if recognizer.AcceptWaveform(bytes(chunk)):
+            result = json.loads(recognizer.Result())
+            transcription_fragments.append(result.get("text", ""))
+    final_result = json.loads(recognizer.FinalResult())
+    transcription_fragments.append(final_result.get("text", ""))
+
+    transcription = " ".join(
+        fragment for fragment in transcription_fragments if fragment
+    ).strip()
+    return transcription
@@ -0,0 +1,110 @@
+import threading
+import requests
+
+
+class ModelKeepAlive:
+    """
+    A class to keep a model loaded on the Ollama server while chat sessions exist.
+
+    Each session acquires the keep-alive when it starts and releases it when it
+    ends. While at least one session holds it, the model is pinned with
+    keep_alive=-1 and a background thread refreshes the pin periodically so a
+    server restart or another client cannot get it evicted. When the last
+    session releases it, the normal eviction timeout is restored.
+
+    Attributes:
+        model_name (str): The name of the model to keep loaded.
+        server_url (str): The Ollama generate endpoint.
+        interval (float): Seconds between keep-alive refreshes.
+        release_keep_alive (str): keep_alive value sent when the last session ends.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, model_name: str, server_url: str, interval: float = 120, release_keep_alive: str = "5m"):
+        self.model_name = model_name
+        self.server_url = server_url
+        self.interval = interval
+        self.release_keep_alive = release_keep_alive
+
+        self.sessions = 0
+        self.lock = threading.Lock()
+        # Each refresh thread has its own stop event, so a thread that was told to stop
+        # keeps stopping even if a new session starts before it wakes up
+        self.stop_event = None
+        self.thread = None
+
+    @classmethod
+    def for_model(cls, model_name: str, server_url: str, **kwargs) -> "ModelKeepAlive":
+        """
+        Return the process-wide keep-alive for the given model and server.
+
+        Args:
+            model_name (str): The name of the model.
+            server_url (str): The Ollama generate endpoint.
+
+        Returns:
+            ModelKeepAlive: The shared keep-alive instance.
+        """
+        with cls._instances_lock:
+            key = (server_url, model_name)
+            if key not in cls._instances:
+                cls._instances[key] = cls(model_name, server_url, **kwargs)
+            return cls._instances[key]
+
+    def ping(self, keep_alive=-1) -> bool:
+        """
+        Send an empty request that loads the model and sets its keep_alive.
+
+        Args:
+            keep_alive (int or str): How long Ollama keeps the model loaded (-1 pins it).
+
+        Returns:
+            bool: True if the server accepted the request, False otherwise.
+        """
+        try:
+            response = requests.post(
+                self.server_url,
+                json={"model": self.model_name, "prompt": "", "stream": False, "keep_alive": keep_alive},
+                timeout=300
+            )
+            return response.status_code == 200
+        except requests.RequestException as e:
+            print(f"Error refreshing model keep-alive: {e}")
+            return False
+
+    def acquire(self) -> None:
+        """
+        Register a session and start the background refresh if it is the first one.
+        """
+        with self.lock:
+            self.sessions += 1
+            if self.thread is None:
+                self.stop_event = threading.Event()
+                self.thread = threading.Thread(target=self._refresh_loop, args=(self.stop_event,), daemon=True)
+                self.thread.start()
+
+    def release(self) -> None:
+        """
+        Unregister a session and unpin the model when no sessions remain.
+        """
+        with self.lock:
+            if self.sessions == 0:
+                return
+            self.sessions -= 1
+            if self.sessions > 0 or self.thread is None:
+                return
+            self.stop_event.set()
+            self.stop_event = None
+            self.thread = None
+        self.ping(self.release_keep_alive)
+
+    def _refresh_loop(self, stop_event: threading.Event) -> None:
+        """
+        Refresh the keep-alive pin until the last session is released.
+
+        Args:
+            stop_event (threading.Event): Set when the sessions that started this thread are released.
+        """
+        while not stop_event.wait(self.interval):
+            self.ping()
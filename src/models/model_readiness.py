@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+import requests
+
+
+class ReadinessChecker:
+    """
+    A class to check whether the Ollama server and a model are ready for use.
+
+    Checks are cheap: the server check uses the small /api/version endpoint and
+    the model check asks /api/show about a single model instead of listing every
+    model with /api/tags. Results are cached for a short TTL so the checks can
+    run from a serving loop, and waiting uses exponential backoff so startup
+    returns as soon as the server is ready.
+
+    Attributes:
+        base_url (str): The Ollama server base URL.
+        cache_ttl (float): Seconds a check result is reused.
+        request_timeout (float): Timeout of each HTTP check in seconds.
+    """
+    def __init__(self, base_url: str = "http://localhost:11434", cache_ttl: float = 2.0, request_timeout: float = 2.0):
+        self.base_url = base_url.rstrip("/")
+        self.cache_ttl = cache_ttl
+        self.request_timeout = request_timeout
+
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    def _cached(self, key, check, use_cache: bool) -> bool:
+        """
+        Return the cached result of a check, running it if missing or expired.
+        """
+        now = time.monotonic()
+        if use_cache:
+            with self.lock:
+                cached = self.cache.get(key)
+            if cached and now - cached[1] < self.cache_ttl:
+                return cached[0]
+
+        result = check()
+        with self.lock:
+            self.cache[key] = (result, time.monotonic())
+        return result
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached check result.
+        """
+        with self.lock:
+            self.cache.clear()
+
+    def is_server_up(self, use_cache: bool = True) -> bool:
+        """
+        Check if the Ollama server answers.
+
+        Args:
+            use_cache (bool, optional): Reuse a recent result. Defaults to True.
+
+        Returns:
+            bool: True if the server responds with a 200 HTTP status code, False otherwise.
+        """
+        def check():
+            try:
+                response = requests.get(f"{self.base_url}/api/version", timeout=self.request_timeout)
+                return response.status_code == 200
+            except requests.RequestException:
+                return False
+
+        return self._cached(("server",), check, use_cache)
+
+    def model_exists(self, model_name: str, use_cache: bool = True) -> bool:
+        """
+        Check if a single model is registered on the server.
+
+        Args:
+            model_name (str): The name of the model.
+            use_cache (bool, optional): Reuse a recent result. Defaults to True.
+
+        Returns:
+            bool: True if the server knows the model, False otherwise.
+        """
+        def check():
+            try:
+                response = requests.post(
+                    f"{self.base_url}/api/show",
+                    json={"model": model_name, "name": model_name},
+                    timeout=self.request_timeout
+                )
+                return response.status_code == 200
+            except requests.RequestException:
+                return False
+
+        return self._cached(("model", model_name), check, use_cache)
+
+    @staticmethod
+    def _delays(timeout: float, initial_delay: float, max_delay: float, factor: float):
+        """
+        Yield backoff delays until the timeout is spent.
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            yield min(delay, remaining)
+            delay = min(delay * factor, max_delay)
+
+    def wait_until(self, check, timeout: float = 30, initial_delay: float = 0.05,
+                   max_delay: float = 1.0, factor: float = 2.0) -> bool:
+        """
+        Run a check with exponential backoff until it passes or the timeout expires.
+
+        Args:
+            check (callable): A function returning True when ready.
+            timeout (float, optional): Maximum seconds to wait. Defaults to 30.
+            initial_delay (float, optional): First delay in seconds. Defaults to 0.05.
+            max_delay (float, optional): Largest delay in seconds. Defaults to 1.0.
+            factor (float, optional): Delay multiplier between attempts. Defaults to 2.0.
+
+        Returns:
+            bool: True if the check passed, False on timeout.
+        """
+        if check():
+            return True
+        for delay in self._delays(timeout, initial_delay, max_delay, factor):
+            time.sleep(delay)
+            if check():
+                return True
+        return False
+
+    async def async_wait_until(self, check, timeout: float = 30, initial_delay: float = 0.05,
+                               max_delay: float = 1.0, factor: float = 2.0) -> bool:
+        """
+        Async variant of wait_until; the blocking check runs in a worker thread.
+        """
+        if await asyncio.to_thread(check):
+            return True
+        for delay in self._delays(timeout, initial_delay, max_delay, factor):
+            await asyncio.sleep(delay)
+            if await asyncio.to_thread(check):
+                return True
+        return False
+
+    def wait_for_server(self, timeout: float = 30) -> bool:
+        """
+        Wait until the Ollama server answers.
+        """
+        return self.wait_until(lambda: self.is_server_up(use_cache=False), timeout)
+
+    def wait_for_model(self, model_name: str, timeout: float = 30) -> bool:
+        """
+        Wait until the model is registered on the server.
+        """
+        return self.wait_until(lambda: self.model_exists(model_name, use_cache=False), timeout)
+
+    async def async_wait_for_server(self, timeout: float = 30) -> bool:
+        """
+        Async variant of wait_for_server.
+        """
+        return await self.async_wait_until(lambda: self.is_server_up(use_cache=False), timeout)
+
+    async def async_wait_for_model(self, model_name: str, timeout: float = 30) -> bool:
+        """
+        Async variant of wait_for_model.
+        """
+        return await self.async_wait_until(lambda: self.model_exists(model_name, use_cache=False), timeout)
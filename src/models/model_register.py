@@ -1,7 +1,11 @@
+import os
+import json
+import hashlib
+import threading
 import subprocess
-import time
-import requests
 import configparser
+import requests
+from src.models.model_readiness import ReadinessChecker
 
 
 class RegisterModel:
@@ -11,52 +15,244 @@ class RegisterModel:
     Attributes:
         config (configparser.ConfigParser): Parser for configuration file.
         model (dict): Contains 'name' and 'path' of the model from config file.
+        base_urls (list): The configured Ollama servers; the model is registered on each of them.
+        base_url (str): The first server, the one started locally if it is not running.
+        readiness (dict): Cached, backoff-based server and model checks, per server.
+        registry_path (str): JSON file recording the modelfile hash and digest of registered models, per server.
+        verbose (bool): Print the registration progress; otherwise it is collected in messages.
+        messages (list): The progress messages of a quiet registration.
     """
-    def __init__(self, config_path="config.ini"):
+    OLLAMA_BASE_URL = "http://localhost:11434"
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, config_path="config.ini", verbose: bool = True):
+        self.verbose = verbose
+        self.messages = []
         self.config = configparser.ConfigParser()
         self.config.read(config_path)
         self.model = {
             "name": self.config.get("ModelLLM", "name_model"),
             "path": self.config.get("ModelLLM", "path_model")
         }
+        urls = self.config.get("OllamaBackends", "urls", fallback=self.OLLAMA_BASE_URL)
+        self.base_urls = [url.strip().rstrip("/") for url in urls.split(",") if url.strip()] or [self.OLLAMA_BASE_URL]
+        self.base_url = self.base_urls[0]
+        self.readiness = {url: ReadinessChecker(url) for url in self.base_urls}
+        self.registry_path = self.config.get("ModelLLM", "registry_path", fallback="model_registry.json")
+
+    @classmethod
+    def for_config(cls, config_path="config.ini"):
+        """
+        Return the process-wide registration of a config file, running it on first use.
+
+        The parsed config and the readiness checks are read-only once the model is
+        registered, so every session of the process shares them instead of parsing
+        the config and checking the model again.
+
+        Args:
+            config_path (str, optional): Path of config.ini. Defaults to "config.ini".
+
+        Returns:
+            RegisterModel: The shared, already run registration.
+        """
+        key = os.path.abspath(config_path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                register_model = cls(config_path)
+                register_model.run()
+                cls._instances[key] = register_model
+            return cls._instances[key]
 
-    def register_model(self):
+    @classmethod
+    def reload(cls, config_path="config.ini", verbose: bool = True):
         """
-        Register the model with Ollama if it is not already registered.
+        Read the config file again and rerun the registration, replacing the shared one.
 
-        It uses the subprocess.run to execute the 'ollama create' command with the model's
-        name and file path.
+        The model is only created again if it is missing or its modelfile changed.
+
+        Args:
+            config_path (str, optional): Path of config.ini. Defaults to "config.ini".
+            verbose (bool, optional): Print the progress, or collect it in messages. Defaults to True.
+
+        Returns:
+            RegisterModel: The new shared registration.
+        """
+        register_model = cls(config_path, verbose)
+        register_model.run()
+        with cls._instances_lock:
+            cls._instances[os.path.abspath(config_path)] = register_model
+        return register_model
+
+    def log(self, message: str) -> None:
+        """
+        Print a progress message, or keep it when the registration runs quietly.
+        """
+        if self.verbose:
+            print(message, flush=True)
+        else:
+            self.messages.append(message)
+
+    def modelfile_hash(self) -> str:
+        """
+        Compute the SHA-256 hash of the modelfile at the configured path.
+
+        Returns:
+            str: The hex digest, or an empty string if the file cannot be read.
+        """
+        sha256 = hashlib.sha256()
+        try:
+            with open(self.model["path"], "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(block)
+        except OSError as e:
+            self.log(f"Error reading the modelfile: {e}")
+            return ""
+        return sha256.hexdigest()
+
+    def get_model_digest(self, base_url: str) -> str:
+        """
+        Return the digest an Ollama server reports for the model.
+
+        Args:
+            base_url (str): The server to ask.
+
+        Returns:
+            str: The model digest, or an empty string if the model is not listed.
+        """
+        try:
+            response = requests.get(f"{base_url}/api/tags", timeout=10)
+            for m in response.json().get("models", []):
+                if m["name"] in (self.model["name"], f"{self.model['name']}:latest"):
+                    return m.get("digest", "")
+        except (requests.RequestException, ValueError):
+            pass
+        return ""
+
+    def load_registry(self) -> dict:
+        """
+        Load the recorded modelfile hashes and digests.
+        """
+        try:
+            with open(self.registry_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def registry_entry(self, base_url: str) -> dict:
+        """
+        Return the recorded modelfile hash and digest of the model on a server, or None.
+
+        Records written before servers were tracked separately apply to the first server.
+        """
+        record = self.load_registry().get(self.model["name"])
+        if record is None:
+            return None
+        if "servers" not in record:
+            return record if base_url == self.base_url else None
+        return record["servers"].get(base_url)
+
+    def save_registry_entry(self, base_url: str, modelfile_hash: str, digest: str) -> None:
+        """
+        Record the modelfile hash and the registered digest of the model on a server.
+        """
+        registry = self.load_registry()
+        record = registry.get(self.model["name"], {})
+        if "servers" not in record:
+            # Convert a record written before servers were tracked separately
+            record = {"servers": {self.base_url: record} if record else {}}
+        record["servers"][base_url] = {"modelfile_sha256": modelfile_hash, "digest": digest}
+        registry[self.model["name"]] = record
+        try:
+            tmp_path = f"{self.registry_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(registry, f, indent=2)
+            os.replace(tmp_path, self.registry_path)
+        except OSError as e:
+            self.log(f"Error saving the model registry: {e}")
+
+    def needs_registration(self, base_url: str) -> bool:
+        """
+        Decide whether 'ollama create' has to run on a server.
+
+        Registration is needed when the model is missing on the server, when the
+        modelfile changed since it was registered there, or when the server holds
+        a different digest than the one recorded. A model that is already present
+        without a record is adopted as-is.
+
+        Args:
+            base_url (str): The server to check.
+
+        Returns:
+            bool: True if the model must be (re)created, False otherwise.
+        """
+        if not self.readiness[base_url].model_exists(self.model["name"], use_cache=False):
+            return True
+
+        record = self.registry_entry(base_url)
+        current_hash = self.modelfile_hash()
+        current_digest = self.get_model_digest(base_url)
+        if record is None:
+            self.save_registry_entry(base_url, current_hash, current_digest)
+            return False
+        if current_hash and record.get("modelfile_sha256") != current_hash:
+            self.log(f"Modelfile changed since the last registration on {base_url}.")
+            return True
+        if current_digest and record.get("digest") != current_digest:
+            self.log(f"Registered model digest changed on {base_url} since the last registration.")
+            return True
+        return False
+
+    def register_model(self, base_url: str = None):
+        """
+        Register the model with an Ollama server.
+
+        It executes the 'ollama create' command with the model's name and file path
+        against the server (through OLLAMA_HOST), streaming its progress output, and
+        records the modelfile hash together with the resulting digest.
+
+        Args:
+            base_url (str, optional): The server. Defaults to the first configured server.
 
         Raises:
             subprocess.CalledProcessError: If the subprocess command fails.
         """
-        print(f"Registering model '{self.model['name']}' with Ollama...")
-        try:
-            subprocess.run(
-                ["ollama", "create", self.model["name"], "--file", self.model["path"]],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            print("Model registered successfully!")
-        except subprocess.CalledProcessError as e:
-            print("Error registering the model:")
-            print(e.stderr)
-            raise
+        base_url = base_url or self.base_url
+        self.log(f"Registering model '{self.model['name']}' with Ollama at {base_url}...")
+        command = ["ollama", "create", self.model["name"], "--file", self.model["path"]]
+        modelfile_hash = self.modelfile_hash()
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env={**os.environ, "OLLAMA_HOST": base_url}
+        )
+        output = []
+        for line in process.stdout:
+            output.append(line)
+            self.log(f"  {line.rstrip()}")
+        return_code = process.wait()
+
+        if return_code != 0:
+            self.log("Error registering the model:")
+            raise subprocess.CalledProcessError(return_code, command, output="".join(output))
+
+        self.readiness[base_url].invalidate()
+        self.save_registry_entry(base_url, modelfile_hash, self.get_model_digest(base_url))
+        self.log("Model registered successfully!")
 
     def is_ollama_running(self):
         """
         Check if the Ollama server is running.
 
+        The result is cached for a short time, so it is cheap to call repeatedly.
+
         Returns:
             bool: True if the server responds with a 200 HTTP status code, False otherwise.
         """
-        try:
-            response = requests.get("http://localhost:11434/api/tags")
-            return response.status_code == 200
-        except requests.ConnectionError:
-            return False
+        return self.readiness[self.base_url].is_server_up()
 
     def start_ollama(self):
         """
@@ -71,18 +267,19 @@ class RegisterModel:
             -ub: un-batched size (set to 512).
             --num_gpu_layers: number of GPU layers (set to 32).
 
-        It waits up to 30 seconds for the server to start and verifies its status.
+        It waits up to 30 seconds for the server to start, polling with exponential
+        backoff so it returns as soon as the server answers.
         """
-        if self.is_ollama_running():
-            print(f"Ollama server is already running.\n")
+        if self.readiness[self.base_url].is_server_up(use_cache=False):
+            self.log(f"Ollama server is already running.\n")
             return
 
-        print("Starting the Ollama server with adjusted parameters...")
+        self.log("Starting the Ollama server with adjusted parameters...")
         try:
             subprocess.Popen(
                 [
                     "ollama", "serve",
-                    "--model", self.MODEL["name"],
+                    "--model", self.model["name"],
                     "--gpu", "1",         # Use 1 GPU
                     "--threads", "4",     # Use 4 threads
                     "--ctx", "4096",      # Set context to 4096 token limit
@@ -96,53 +293,63 @@ class RegisterModel:
                 start_new_session=True
             )
 
-            timeout = 30
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if self.is_ollama_running():
-                    print(f"Ollama server started successfully!\n")
-                    return
-                time.sleep(1)
-            print("Error: Unable to confirm that the Ollama server started correctly.")
+            if self.readiness[self.base_url].wait_for_server(timeout=30):
+                self.log(f"Ollama server started successfully!\n")
+                return
+            self.log("Error: Unable to confirm that the Ollama server started correctly.")
         except Exception as e:
-            print(f"Error starting the Ollama server: {e}")
+            self.log(f"Error starting the Ollama server: {e}")
 
     def is_model_ready(self):
         """
         Check if the model is ready for use by querying the server.
 
-        It sends a GET request to the server and verifies if the model is listed in the response.
+        It asks /api/show about this single model instead of scanning the whole tag list.
+        The result is cached for a short time.
 
         Returns:
-            bool: True if the model is present in the server's model list, False otherwise.
+            bool: True if the server knows the model, False otherwise.
         """
-        try:
-            response = requests.get("http://localhost:11434/api/tags")
-            models = response.json().get("models", [])
-            return any(m["name"] == self.model["name"] for m in models)
-        except requests.ConnectionError:
-            return False
+        return self.readiness[self.base_url].model_exists(self.model["name"])
+
+    def register_on(self, base_url: str) -> bool:
+        """
+        Make sure the model is registered and ready on a server.
+
+        Returns:
+            bool: True if the model is ready on the server, False otherwise.
+        """
+        if not self.needs_registration(base_url):
+            self.log(f"Model is already registered on {base_url}!")
+            return True
+        self.register_model(base_url)
+        if self.readiness[base_url].wait_for_model(self.model["name"], timeout=30):
+            self.log(f"Model is ready for use on {base_url}!")
+            return True
+        self.log(f"Error: Model was not registered on {base_url} after waiting.")
+        return False
 
     def run(self):
         """
-        Execute the process of ensuring the model is registered and the Ollama server is running.
-
-        If the model is not ready, it attempts to register the model and waits a maximum of 30 seconds.
-        After verifying the model is ready, it starts the Ollama server if not already running.
-        """
-        if not self.is_model_ready():
-            self.register_model()
-            timeout = 30
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if self.is_model_ready():
-                    print("Model is ready for use!")
-                    break
-                time.sleep(1)
-            else:
-                print("Error: Model was not registered after waiting.")
-                return
-        else:
-            print("Model is already registered!")
+        Execute the process of ensuring the model is registered and the Ollama servers are running.
+
+        The model is registered on every configured server, so requests that fail over
+        to another server find it there. Where the model is missing or its modelfile
+        changed, it registers the model and waits a maximum of 30 seconds, polling with
+        exponential backoff. After verifying the model is ready on the first server, it
+        starts that server if not already running. Other servers that do not answer are
+        skipped; the model is registered on them on the next start.
+        """
+        if not self.register_on(self.base_url):
+            return
+
+        for base_url in self.base_urls[1:]:
+            if not self.readiness[base_url].is_server_up(use_cache=False):
+                self.log(f"Ollama server at {base_url} is not answering, the model is not registered there.")
+                continue
+            try:
+                self.register_on(base_url)
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.log(f"Error registering the model on {base_url}: {e}")
 
         self.start_ollama()
\ No newline at end of file
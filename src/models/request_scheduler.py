@@ -0,0 +1,193 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ScheduledRequest:
+    """
+    A model request waiting in, or running from, the scheduler.
+
+    Attributes:
+        session_id (str): The session that made the request.
+        key (str): Deduplication key, or None if the request must not be shared.
+        size (int): Prompt size used to prefer short prompts.
+        func (callable): The function that performs the request.
+        future (Future): Resolved with the result of func.
+        enqueued_at (float): Monotonic time the request was submitted.
+        started_at (float): Monotonic time the request was dispatched.
+    """
+    __slots__ = ("session_id", "key", "size", "func", "future", "enqueued_at", "started_at")
+
+    def __init__(self, session_id, key, size, func):
+        self.session_id = session_id
+        self.key = key
+        self.size = size
+        self.func = func
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+
+
+class RequestScheduler:
+    """
+    A class to admit model requests into Ollama in a controlled order.
+
+    At most max_in_flight requests run at the same time, matching the server's
+    OLLAMA_NUM_PARALLEL. Waiting requests are kept in one FIFO queue per session
+    and the next one is picked by fair queuing: the session that received the
+    least service so far wins, and shorter prompts cost less, so they reach their
+    first token sooner. Identical requests already queued or running are
+    deduplicated and share the same result.
+
+    Attributes:
+        max_in_flight (int): Maximum number of concurrent requests.
+        queue_waits (deque): Recent seconds spent waiting for admission.
+        generation_times (deque): Recent seconds spent running requests.
+        deduplicated (int): Number of requests answered by an identical one.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, max_in_flight: int = 1, history: int = 1000):
+        self.max_in_flight = max(1, max_in_flight)
+        self.queue_waits = deque(maxlen=history)
+        self.generation_times = deque(maxlen=history)
+        self.deduplicated = 0
+
+        self.sessions = {}
+        self.service = {}
+        self.inflight = {}
+        self.running = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="ollama-request")
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return the process-wide scheduler configured in the [Scheduler] section.
+
+        max_in_flight defaults to the OLLAMA_NUM_PARALLEL environment variable, or 1.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            RequestScheduler: The shared scheduler, or None if scheduling is disabled.
+        """
+        if not config.getboolean("Scheduler", "enabled", fallback=False):
+            return None
+        default_parallel = int(os.environ.get("OLLAMA_NUM_PARALLEL", 1))
+        max_in_flight = config.getint("Scheduler", "max_in_flight", fallback=default_parallel)
+        with cls._instances_lock:
+            if max_in_flight not in cls._instances:
+                cls._instances[max_in_flight] = cls(max_in_flight)
+            return cls._instances[max_in_flight]
+
+    def submit(self, session_id, func, size: int = 0, key: str = None) -> Future:
+        """
+        Queue a request and return a future for its result.
+
+        Args:
+            session_id (str): The session making the request.
+            func (callable): The function performing the request.
+            size (int, optional): The prompt size. Defaults to 0.
+            key (str, optional): Deduplication key; requests with the same key in flight share one
+                result. None never shares. Defaults to None.
+
+        Returns:
+            Future: Resolved with the return value of func.
+        """
+        with self.lock:
+            if key is not None and key in self.inflight:
+                self.deduplicated += 1
+                return self.inflight[key].future
+
+            request = ScheduledRequest(session_id, key, size, func)
+            if key is not None:
+                self.inflight[key] = request
+            self.sessions.setdefault(session_id, deque()).append(request)
+            self.service.setdefault(session_id, 0)
+            self._dispatch()
+            return request.future
+
+    def _next_request(self) -> ScheduledRequest:
+        """
+        Pop the request of the session with the least service plus head prompt size.
+        """
+        session_id = min(
+            self.sessions,
+            key=lambda s: (self.service[s] + self.sessions[s][0].size, self.sessions[s][0].enqueued_at)
+        )
+        queue = self.sessions[session_id]
+        request = queue.popleft()
+        if not queue:
+            del self.sessions[session_id]
+
+        # Charge the session and keep the service counters small
+        self.service[session_id] += request.size + 1
+        floor = min(self.service[s] for s in self.sessions) if self.sessions else self.service[session_id]
+        for s in list(self.service):
+            self.service[s] = max(0, self.service[s] - floor)
+            if self.service[s] == 0 and s not in self.sessions:
+                del self.service[s]
+        return request
+
+    def _dispatch(self) -> None:
+        """
+        Start queued requests while there is capacity. Must be called with the lock held.
+        """
+        while self.running < self.max_in_flight and self.sessions:
+            request = self._next_request()
+            request.started_at = time.monotonic()
+            self.running += 1
+            self.executor.submit(self._run, request)
+
+    def _run(self, request: ScheduledRequest) -> None:
+        """
+        Run a request, publish its result and admit the next one.
+        """
+        try:
+            if request.future.set_running_or_notify_cancel():
+                request.future.set_result(request.func())
+        except Exception as e:
+            request.future.set_exception(e)
+        finally:
+            finished_at = time.monotonic()
+            with self.lock:
+                self.queue_waits.append(request.started_at - request.enqueued_at)
+                self.generation_times.append(finished_at - request.started_at)
+                if request.key is not None and self.inflight.get(request.key) is request:
+                    del self.inflight[request.key]
+                self.running -= 1
+                self._dispatch()
+
+    @staticmethod
+    def _summary(values) -> dict:
+        """
+        Summarize a list of durations in seconds.
+        """
+        values = sorted(values)
+        if not values:
+            return {"count": 0, "mean": None, "p50": None, "p95": None}
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))]
+        }
+
+    def stats(self) -> dict:
+        """
+        Return queue wait and generation time statistics, for sizing hardware.
+        """
+        with self.lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "running": self.running,
+                "queued": sum(len(queue) for queue in self.sessions.values()),
+                "deduplicated": self.deduplicated,
+                "queue_wait_seconds": self._summary(self.queue_waits),
+                "generation_seconds": self._summary(self.generation_times)
+            }
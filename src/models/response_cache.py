@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    A class to cache model responses of deterministic prompts.
+
+    Entries are keyed by (model, prompt hash, options) and evicted in LRU order
+    once the cache is full or when they are older than the TTL. The cache can
+    be persisted to a JSON file so repeatable workloads survive restarts.
+
+    Attributes:
+        max_entries (int): Maximum number of cached responses.
+        ttl (float): Seconds an entry stays valid.
+        path (str): JSON file used for persistence, or None to keep it in memory.
+        hits (int): Number of cache hits.
+        misses (int): Number of cache misses.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600, path: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        if self.path:
+            self.load()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return the process-wide cache configured in the [ResponseCache] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            ResponseCache: The shared cache, or None if caching is disabled.
+        """
+        if not config.getboolean("ResponseCache", "enabled", fallback=False):
+            return None
+        path = config.get("ResponseCache", "path", fallback="") or None
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(
+                    max_entries=config.getint("ResponseCache", "max_entries", fallback=256),
+                    ttl=config.getfloat("ResponseCache", "ttl_seconds", fallback=3600),
+                    path=path
+                )
+            return cls._instances[path]
+
+    @staticmethod
+    def is_deterministic(options: dict) -> bool:
+        """
+        Return whether the options make generation repeatable (temperature 0 or a fixed seed).
+        """
+        return options.get("temperature") == 0 or options.get("seed") is not None
+
+    @staticmethod
+    def make_key(model: str, prompt, options: dict) -> str:
+        """
+        Build the cache key of a request.
+
+        Args:
+            model (str): The model name.
+            prompt (str or list): The prompt sent to the model.
+            options (dict): The generation options.
+
+        Returns:
+            str: A hex digest identifying the request.
+        """
+        prompt_hash = hashlib.sha256(json.dumps(prompt, sort_keys=True).encode("utf-8")).hexdigest()
+        payload = json.dumps([model, prompt_hash, options], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Return the cached response for a key, or None if missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response, evicting the least recently used entries when full.
+        """
+        with self.lock:
+            self.entries[key] = (response, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        if self.path:
+            self.save()
+
+    def clear(self) -> None:
+        """
+        Remove every cached response.
+        """
+        with self.lock:
+            self.entries.clear()
+        if self.path:
+            self.save()
+
+    def load(self) -> None:
+        """
+        Load persisted entries, skipping the expired ones.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        with self.lock:
+            for key, response, created_at in stored:
+                if now - created_at <= self.ttl:
+                    self.entries[key] = (response, created_at)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self) -> None:
+        """
+        Persist the cache to its JSON file.
+        """
+        with self.lock:
+            stored = [[key, response, created_at] for key, (response, created_at) in self.entries.items()]
+        with self.save_lock:
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(stored, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving the response cache: {e}")
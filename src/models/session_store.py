@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import threading
+
+
+class SessionStore:
+    """
+    A class to persist chat sessions as append-only JSONL logs.
+
+    Each session is one file: a header line describing the session, followed by
+    one line per message written as the turn happens. Resuming reads the file
+    backwards from the end and stops once the memory window is filled, so it
+    costs O(window) no matter how long the session is. The latest Ollama
+    'context' array and the running memory summary are kept in small side
+    files, overwritten when they change.
+
+    Attributes:
+        directory (str): Directory holding the session files.
+    """
+    BLOCK_SIZE = 8192
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory: str = "sessions"):
+        self.directory = directory
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return the process-wide store configured in the [Sessions] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            SessionStore: The shared store, or None if persistence is disabled.
+        """
+        if not config.getboolean("Sessions", "enabled", fallback=False):
+            return None
+        directory = config.get("Sessions", "directory", fallback="sessions")
+        with cls._instances_lock:
+            if directory not in cls._instances:
+                cls._instances[directory] = cls(directory)
+            return cls._instances[directory]
+
+    def session_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def context_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.context.json")
+
+    def _append(self, session_id: str, record: dict) -> None:
+        """
+        Append one record to the session log and flush it to disk.
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            with open(self.session_path(session_id), "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+
+    def create_session(self, session_id: str, metadata: dict) -> None:
+        """
+        Write the header line of a new session.
+
+        Args:
+            session_id (str): The session id.
+            metadata (dict): Character name, user name and language of the session.
+        """
+        self._append(session_id, {"type": "session", "created_at": time.time(), **metadata})
+
+    def append_message(self, session_id: str, role: str, content: str) -> None:
+        """
+        Append a conversation message to the session log.
+        """
+        self._append(session_id, {"type": "message", "ts": time.time(), "role": role, "content": content})
+
+    def save_context(self, session_id: str, context: list, text: str = None) -> None:
+        """
+        Keep the latest Ollama context array of the session, with the prompt text it covers.
+        """
+        path = self.context_path(session_id)
+        try:
+            with open(f"{path}.tmp", "w") as f:
+                json.dump({"context": context, "text": text}, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"Error saving session context: {e}")
+
+    def load_context(self, session_id: str) -> dict:
+        """
+        Return the latest Ollama 'context' array of the session and the prompt 'text' it covers, or None.
+        """
+        try:
+            with open(self.context_path(session_id), "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Sessions saved before the text was kept cannot tell which prompt their context covers
+        return stored if isinstance(stored, dict) else {"context": stored, "text": None}
+
+    def summary_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.summary.txt")
+
+    def save_summary(self, session_id: str, summary: str) -> None:
+        """
+        Keep the running summary of the messages that left the memory window.
+        """
+        path = self.summary_path(session_id)
+        try:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(summary)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"Error saving session summary: {e}")
+
+    def load_summary(self, session_id: str) -> str:
+        """
+        Return the running summary of the session, or an empty string.
+        """
+        try:
+            with open(self.summary_path(session_id), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def read_header(self, session_id: str) -> dict:
+        """
+        Return the header of a session, reading only its first line.
+        """
+        try:
+            with open(self.session_path(session_id), "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+            return header if header.get("type") == "session" else {}
+        except (OSError, ValueError):
+            return {}
+
+    def load_tail(self, session_id: str, max_characters: int) -> list:
+        """
+        Return the most recent messages of a session, enough to fill the memory window.
+
+        The file is read backwards in blocks and reading stops once the messages
+        hold more than max_characters of content.
+
+        Args:
+            session_id (str): The session id.
+            max_characters (int): The memory window size in characters.
+
+        Returns:
+            list: The messages in chronological order, as {'role', 'content'} dicts.
+        """
+        messages = []
+        total_characters = 0
+        try:
+            with open(self.session_path(session_id), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                remainder = b""
+                while total_characters <= max_characters:
+                    if position == 0:
+                        lines = [remainder] if remainder else []
+                        remainder = b""
+                    else:
+                        size = min(self.BLOCK_SIZE, position)
+                        position -= size
+                        f.seek(position)
+                        lines = (f.read(size) + remainder).split(b"\n")
+                        remainder = lines.pop(0)
+                    if not lines:
+                        break
+
+                    for line in reversed(lines):
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        if record.get("type") != "message":
+                            continue
+                        messages.append({"role": record["role"], "content": record["content"]})
+                        total_characters += len(record["content"])
+                        if total_characters > max_characters:
+                            break
+        except (OSError, ValueError) as e:
+            print(f"Error loading session: {e}")
+
+        messages.reverse()
+        return messages
+
+    def latest_session(self, character: str) -> str:
+        """
+        Return the id of the most recently updated session with a character, or None.
+        """
+        candidates = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".jsonl"):
+                continue
+            session_id = name[:-len(".jsonl")]
+            if self.read_header(session_id).get("character") == character:
+                candidates.append((os.path.getmtime(self.session_path(session_id)), session_id))
+        return max(candidates)[1] if candidates else None
@@ -0,0 +1,136 @@
+import os
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from src.models.audio_buffer import pcm_segments
+
+# Models loaded in a worker process, kept resident for the life of the worker
+_translators = {}
+_vosk_models = {}
+
+
+def _translate(user_lang: str, bot_lang: str, phrase: str, to_bot: bool) -> str:
+    """
+    Translate a phrase in a worker process, loading the language pair on first use.
+    """
+    from src.models.translate_phrase import PhraseTranslator
+
+    translator = _translators.get((user_lang, bot_lang))
+    if translator is None:
+        translator = _translators[(user_lang, bot_lang)] = PhraseTranslator(user_lang, bot_lang)
+    if to_bot:
+        return translator.translate_user_to_en(phrase)
+    return translator.translate_en_to_user(phrase)
+
+
+def _transcribe(model_path: str, buffer_name: str, size: int, sample_rate: int) -> str:
+    """
+    Decode the PCM audio of a shared memory buffer in a worker process.
+    """
+    from vosk import Model, SetLogLevel
+    from src.models.mic_converter import recognize_pcm
+
+    model = _vosk_models.get(model_path)
+    if model is None:
+        SetLogLevel(-1)
+        model = _vosk_models[model_path] = Model(model_path)
+
+    buffer = shared_memory.SharedMemory(name=buffer_name)
+    audio = buffer.buf[:size]
+    try:
+        return recognize_pcm(model, audio, sample_rate)
+    finally:
+        audio.release()
+        buffer.close()
+
+
+class SpeechWorkerPool:
+    """
+    A class to run translation and speech recognition in worker processes.
+
+    Argos translation and Vosk decoding are CPU-bound and hold the GIL, so in the
+    UI process they compete with Tk and the controller threads. The pool runs them
+    in separate processes, which scale across cores when many sessions are active.
+    Each worker keeps the models it has loaded resident, and audio is handed over
+    in a shared memory buffer instead of being pickled.
+
+    Attributes:
+        processes (int): Number of worker processes.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, processes: int = None):
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        # spawn: forking a process that runs Tk and other threads is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return the process-wide pool configured in the [SpeechWorkers] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            SpeechWorkerPool: The shared pool, or None if the workers are disabled.
+        """
+        if not config.getboolean("SpeechWorkers", "enabled", fallback=False):
+            return None
+        processes = config.getint("SpeechWorkers", "processes", fallback=0)
+        with cls._instances_lock:
+            if processes not in cls._instances:
+                cls._instances[processes] = cls(processes)
+            return cls._instances[processes]
+
+    def translate(self, user_lang: str, bot_lang: str, phrase: str, to_bot: bool) -> str:
+        """
+        Translate a phrase in a worker process.
+
+        Args:
+            user_lang (str): The user's language code.
+            bot_lang (str): The bot's language code.
+            phrase (str): The text to translate.
+            to_bot (bool): Translate from the user's language to the bot's, or back.
+
+        Returns:
+            str: The translated text, as PhraseTranslator returns it.
+        """
+        return self.executor.submit(_translate, user_lang, bot_lang, phrase, to_bot).result()
+
+    def transcribe(self, model_path: str, pcm, sample_rate: int) -> str:
+        """
+        Decode 16-bit mono PCM audio in a worker process.
+
+        Args:
+            model_path (str): Path of the Vosk model.
+            pcm (AudioRingBuffer or bytes-like): The audio samples, copied once into shared memory.
+            sample_rate (int): The sample rate of the audio.
+
+        Returns:
+            str: The transcription.
+        """
+        segments = pcm_segments(pcm)
+        size = sum(len(segment) for segment in segments)
+        if size == 0:
+            return ""
+        buffer = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            offset = 0
+            for segment in segments:
+                buffer.buf[offset:offset + len(segment)] = segment
+                offset += len(segment)
+            return self.executor.submit(_transcribe, model_path, buffer.name, size, sample_rate).result()
+        finally:
+            buffer.close()
+            buffer.unlink()
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,216 @@
+import re
+import json
+
+
+class TextFilter:
+    """
+    Base class of the streaming text filters.
+
+    A filter receives the text in chunks (e.g. streamed tokens) through feed and
+    returns the part it can already emit, holding back at most a bounded
+    lookahead that a later chunk could still change. flush returns what is
+    held back once the text is complete.
+    """
+
+    def feed(self, chunk: str) -> str:
+        return chunk
+
+    def flush(self) -> str:
+        return ""
+
+    def apply(self, text: str) -> str:
+        """
+        Filter a complete text.
+        """
+        return self.feed(text) + self.flush()
+
+
+class FilterChain(TextFilter):
+    """
+    A class to run text through several filters in order.
+
+    Attributes:
+        filters (list): The filters, applied first to last.
+    """
+
+    def __init__(self, filters: list):
+        self.filters = filters
+
+    @property
+    def stopped(self) -> bool:
+        """
+        True once a filter dropped the rest of the text, so generation can stop.
+        """
+        return any(getattr(text_filter, "stopped", False) for text_filter in self.filters)
+
+    def feed(self, chunk: str) -> str:
+        for text_filter in self.filters:
+            chunk = text_filter.feed(chunk)
+        return chunk
+
+    def flush(self) -> str:
+        text = ""
+        for text_filter in self.filters:
+            text = text_filter.feed(text) + text_filter.flush()
+        return text
+
+
+class StopSequenceFilter(TextFilter):
+    """
+    Cut the text at the first stop sequence and drop everything after it.
+    """
+
+    def __init__(self, stops: list):
+        self.stops = [stop for stop in stops if stop]
+        self.lookahead = max((len(stop) for stop in self.stops), default=1) - 1
+        self.buffer = ""
+        self.stopped = False
+
+    def feed(self, chunk: str) -> str:
+        if self.stopped:
+            return ""
+        self.buffer += chunk
+        positions = [self.buffer.find(stop) for stop in self.stops]
+        positions = [position for position in positions if position >= 0]
+        if positions:
+            text, self.buffer = self.buffer[:min(positions)], ""
+            self.stopped = True
+            return text
+        cut = max(0, len(self.buffer) - self.lookahead)
+        text, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return text
+
+    def flush(self) -> str:
+        text, self.buffer = self.buffer, ""
+        return text
+
+
+class SpeakerTagFilter(TextFilter):
+    """
+    Remove speaker tags such as "Emilie: " the model writes into its reply.
+    """
+
+    def __init__(self, names: list):
+        self.tags = [f"{name}: " for name in names if name]
+        self.lookahead = max((len(tag) for tag in self.tags), default=1) - 1
+        self.buffer = ""
+
+    def _strip(self, text: str) -> str:
+        for tag in self.tags:
+            text = text.replace(tag, "")
+        return text
+
+    def feed(self, chunk: str) -> str:
+        self.buffer = self._strip(self.buffer + chunk)
+        cut = max(0, len(self.buffer) - self.lookahead)
+        text, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return text
+
+    def flush(self) -> str:
+        text, self.buffer = self._strip(self.buffer), ""
+        return text
+
+
+class RegexFilter(TextFilter):
+    """
+    Apply a regex substitution (e.g. a profanity rule) to streamed text.
+
+    Text is released at whitespace, never inside a match, and lookahead
+    characters are held back, so a match up to lookahead characters long is
+    always seen whole. Text without whitespace (a URL, CJK script) is released
+    up to the lookahead characters as well, so the buffer never holds much
+    more than lookahead characters.
+    """
+
+    def __init__(self, pattern, replacement: str = "", lookahead: int = 64):
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.replacement = replacement
+        self.lookahead = lookahead
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if len(self.buffer) <= self.lookahead:
+            return ""
+        limit = len(self.buffer) - self.lookahead
+        cut = max(self.buffer.rfind(" ", 0, limit), self.buffer.rfind("\n", 0, limit))
+        if cut <= 0:
+            cut = limit
+        for match in self.pattern.finditer(self.buffer):
+            if match.start() < cut < match.end():
+                # A match at the start is longer than the lookahead, release it whole
+                cut = match.start() or match.end()
+                break
+        text, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return self.pattern.sub(self.replacement, text)
+
+    def flush(self) -> str:
+        text, self.buffer = self.buffer, ""
+        return self.pattern.sub(self.replacement, text)
+
+
+class PunctuationFilter(TextFilter):
+    """
+    Trim surrounding whitespace and end the text with '.', '?' or '!'.
+
+    Leading whitespace is dropped and trailing whitespace held back, so the
+    closing period is placed right after the last word.
+    """
+    ENDINGS = ("?", "!", ".")
+
+    def __init__(self):
+        self.started = False
+        self.pending_space = ""
+        self.last_character = ""
+
+    def feed(self, chunk: str) -> str:
+        if not self.started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return ""
+            self.started = True
+        stripped = chunk.rstrip()
+        if not stripped:
+            self.pending_space += chunk
+            return ""
+        text = self.pending_space + stripped
+        self.pending_space = chunk[len(stripped):]
+        self.last_character = stripped[-1]
+        return text
+
+    def flush(self) -> str:
+        self.pending_space = ""
+        if self.started and self.last_character not in self.ENDINGS:
+            self.last_character = "."
+            return "."
+        return ""
+
+
+def punctuate(text: str) -> str:
+    """
+    Trim a message and end it with punctuation, as the replies are.
+    """
+    if not text:
+        return text
+    return PunctuationFilter().apply(text)
+
+
+def load_regex_rules(path: str) -> list:
+    """
+    Load the regex rules of a JSON file: [{"pattern": ..., "replacement": ..., "ignore_case": true}].
+
+    Returns:
+        list: (compiled pattern, replacement) pairs, empty if the file cannot be read.
+    """
+    if not path:
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        return [
+            (re.compile(rule["pattern"], re.IGNORECASE if rule.get("ignore_case") else 0), rule.get("replacement", ""))
+            for rule in rules
+        ]
+    except (OSError, ValueError, KeyError, re.error) as e:
+        print(f"Error loading output filter rules: {e}")
+        return []
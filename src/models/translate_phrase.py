@@ -1,5 +1,4 @@
-import argostranslate.translate as at_translate
-import argostranslate.package
+import threading
 
 
 class PhraseTranslator:
@@ -8,7 +7,10 @@ class PhraseTranslator:
     Argos Translate offline translation models.
 
     The class checks for the existence of a downloaded translation model and loads it.
-    Once the model is loaded, it can perform translation on a given phrase.
+    Once the model is loaded, it can perform translation on a given phrase. Argos
+    Translate is imported and the models loaded on the first translation, so an
+    English-only session never pays for them. The loaded translators are shared
+    by every PhraseTranslator of the same language pair in the process.
 
     Attributes:
         user_lang (str): The user's language code (e.g., "pt" for Brazilian Portuguese).
@@ -16,24 +18,53 @@ class PhraseTranslator:
         translator_to_en (argostranslate.translate.Translation): The loaded translator instance for user to English.
         translator_from_en (argostranslate.translate.Translation): The loaded translator instance for English to user.
     """
+    __slots__ = ("user_lang", "bot_lang", "pool", "translator_to_en", "translator_from_en", "models_loaded")
+    _translators = {}
+    _translators_lock = threading.Lock()
 
-    def __init__(self, user_lang: str = "pt", bot_lang: str = "en"):
+    def __init__(self, user_lang: str = "pt", bot_lang: str = "en", pool=None):
         """
         Initialize the PhraseTranslator with language codes.
 
         Args:
             user_lang (str, optional): The user's language code. Defaults to "pt".
             bot_lang (str, optional): The bot's language code. Defaults to "en".
+            pool (SpeechWorkerPool, optional): Worker processes to translate in. Defaults to translating in this process.
         """
         self.user_lang = user_lang
         self.bot_lang = bot_lang
+        self.pool = pool
 
-        self.load_models()
+        self.translator_to_en = None
+        self.translator_from_en = None
+        self.models_loaded = False
+
+    def ensure_models(self) -> None:
+        """
+        Load the translation models on first use, or reuse the pair already loaded in this process.
+        """
+        if self.models_loaded:
+            return
+        key = (self.user_lang, self.bot_lang)
+        with self._translators_lock:
+            if self.models_loaded:
+                return
+            if key in self._translators:
+                self.translator_to_en, self.translator_from_en = self._translators[key]
+            else:
+                self.load_models()
+                # A failed load is retried by the next session instead of being shared
+                if self.translator_to_en and self.translator_from_en:
+                    self._translators[key] = (self.translator_to_en, self.translator_from_en)
+            self.models_loaded = True
 
     def load_models(self) -> None:
         """
         Loads the translation models for user to English and English to user.
         """
+        import argostranslate.translate as at_translate
+        import argostranslate.package
+
         # Update package index and install the translation package if not available
         argostranslate.package.update_package_index()
         available_packages = argostranslate.package.get_available_packages()
@@ -83,6 +114,9 @@ class PhraseTranslator:
         Returns:
             str: The translated text in English if successful; otherwise, the original phrase.
         """
+        if self.pool:
+            return self.pool.translate(self.user_lang, self.bot_lang, phrase, to_bot=True)
+        self.ensure_models()
         if not self.translator_to_en:
             return None
 
@@ -102,6 +136,9 @@ class PhraseTranslator:
         Returns:
             str: The translated text in the user's language if successful; otherwise, the original phrase.
         """
+        if self.pool:
+            return self.pool.translate(self.user_lang, self.bot_lang, phrase, to_bot=False)
+        self.ensure_models()
         if not self.translator_from_en:
             return None
 
@@ -1,15 +1,17 @@
-import edge_tts
 import asyncio
 import os
 import time
-from playsound import playsound
+import uuid
 import threading
 
 
 class TextToSpeechConverter:
     """
     A class to convert text to speech and play the audio.
+
+    edge_tts and playsound are imported on the first synthesis and playback.
     """
+    __slots__ = ("output_path", "voice")
     
     def __init__(self, input_language: str = "en"):
         """
@@ -58,24 +60,40 @@ class TextToSpeechConverter:
         Args:
             file_path (str): The path to the audio file to be played.
         """
+        from playsound import playsound
         playsound(file_path)
 
-    def text_to_speech(self, text: str) -> None:
+    def text_to_speech(self, text: str, on_synthesized=None) -> None:
         """
         Converts text to speech asynchronously
+
+        Args:
+            text (str): The text to speak.
+            on_synthesized (callable, optional): Called with the synthesis time in seconds
+                once the audio is ready (or synthesis failed), before playback.
         """
+        # Each reply gets its own file, so a reply synthesized while the previous one plays does not replace it
+        root, extension = os.path.splitext(self.output_path)
+        audio_path = f"{root}_{uuid.uuid4().hex[:8]}{extension}"
+
         def convert_and_play():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            tts = edge_tts.Communicate(text, self.voice)
-            loop.run_until_complete(tts.save(self.output_path))
+            start_time = time.perf_counter()
+            try:
+                import edge_tts
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                tts = edge_tts.Communicate(text, self.voice)
+                loop.run_until_complete(tts.save(audio_path))
+            finally:
+                if on_synthesized:
+                    on_synthesized(time.perf_counter() - start_time)
 
             # Play the audio file using playsound
-            self.play_audio(self.output_path)
+            self.play_audio(audio_path)
 
             # Wait briefly and remove the file after playback
             time.sleep(1)
-            os.remove(self.output_path)
+            os.remove(audio_path)
 
         # Run conversion and playback in a separate thread
         threading.Thread(target=convert_and_play, daemon=True).start()
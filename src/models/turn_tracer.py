@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+
+class TurnTrace:
+    """
+    The timings of a single conversation turn.
+
+    Attributes:
+        turn_id (str): Unique id of the turn.
+        session_id (str): The session the turn belongs to.
+        character (str): The character answering the turn.
+        started_at (float): Wall-clock time the turn started.
+        spans (dict): Seconds spent in each stage, in the order they ran.
+        model_stats (dict): Counters and durations reported by Ollama.
+    """
+    __slots__ = ("turn_id", "session_id", "character", "started_at", "spans", "model_stats")
+
+    def __init__(self, session_id: str, character: str):
+        self.turn_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.character = character
+        self.started_at = time.time()
+        self.spans = {}
+        self.model_stats = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Time the enclosed block as the stage with the given name.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start_time)
+
+    def add_span(self, name: str, seconds: float) -> None:
+        """
+        Record a stage timed elsewhere, adding to it if the stage ran more than once.
+        """
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def record_model_stats(self, stats: dict) -> None:
+        """
+        Record the eval counters and durations from Ollama's response JSON.
+
+        Durations arrive in nanoseconds and are stored in seconds.
+        """
+        for key, value in (stats or {}).items():
+            if value is None:
+                continue
+            self.model_stats[key] = value / 1e9 if key.endswith("_duration") else value
+
+    def to_dict(self) -> dict:
+        """
+        Return the trace as a JSON-serializable dictionary.
+        """
+        return {
+            "turn_id": self.turn_id,
+            "session_id": self.session_id,
+            "character": self.character,
+            "started_at": self.started_at,
+            "total_seconds": sum(self.spans.values()),
+            "spans": self.spans,
+            "model": self.model_stats
+        }
+
+
+class TurnTracer:
+    """
+    A class to collect per-turn stage timings and export them.
+
+    Finished turns are appended to a JSONL log and aggregated into
+    Prometheus-style metrics written to a text file (the format read by the
+    node_exporter textfile collector). Without paths, the aggregates are only
+    kept in memory and available through render_prometheus.
+
+    Attributes:
+        jsonl_path (str): JSONL file receiving one line per turn, or None.
+        metrics_path (str): Text file receiving the metrics, or None.
+    """
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    MODEL_COUNTERS = ("prompt_eval_count", "eval_count")
+    MODEL_DURATIONS = ("load_duration", "prompt_eval_duration", "eval_duration", "total_duration")
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, jsonl_path: str = None, metrics_path: str = None):
+        self.jsonl_path = jsonl_path
+        self.metrics_path = metrics_path
+
+        self.turns = 0
+        self.stage_sums = {}
+        self.stage_counts = {}
+        self.stage_buckets = {}
+        self.model_totals = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> "TurnTracer":
+        """
+        Return the process-wide tracer configured in the [Tracing] section.
+
+        Args:
+            config (configparser.ConfigParser): The parsed config.ini.
+
+        Returns:
+            TurnTracer: The shared tracer; it only exports to files when enabled.
+        """
+        if config.getboolean("Tracing", "enabled", fallback=False):
+            jsonl_path = config.get("Tracing", "jsonl_path", fallback="turn_traces.jsonl") or None
+            metrics_path = config.get("Tracing", "metrics_path", fallback="turn_metrics.prom") or None
+        else:
+            jsonl_path = metrics_path = None
+        with cls._instances_lock:
+            key = (jsonl_path, metrics_path)
+            if key not in cls._instances:
+                cls._instances[key] = cls(jsonl_path, metrics_path)
+            return cls._instances[key]
+
+    def start_turn(self, session_id: str, character: str) -> TurnTrace:
+        """
+        Begin tracing a turn.
+        """
+        return TurnTrace(session_id, character)
+
+    def finish_turn(self, trace: TurnTrace) -> None:
+        """
+        Aggregate a finished turn and export it.
+        """
+        with self.lock:
+            self.turns += 1
+            for name, seconds in trace.spans.items():
+                self.stage_sums[name] = self.stage_sums.get(name, 0.0) + seconds
+                self.stage_counts[name] = self.stage_counts.get(name, 0) + 1
+                buckets = self.stage_buckets.setdefault(name, [0] * len(self.BUCKETS))
+                for i, bound in enumerate(self.BUCKETS):
+                    if seconds <= bound:
+                        buckets[i] += 1
+            for key, value in trace.model_stats.items():
+                self.model_totals[key] = self.model_totals.get(key, 0) + value
+
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(trace.to_dict()) + "\n")
+                except OSError as e:
+                    print(f"Error writing turn trace: {e}")
+
+        if self.metrics_path:
+            self.write_metrics()
+
+    def render_prometheus(self) -> str:
+        """
+        Render the aggregated metrics in the Prometheus text exposition format.
+        """
+        with self.lock:
+            lines = [
+                "# HELP virtualchat_turns_total Conversation turns traced.",
+                "# TYPE virtualchat_turns_total counter",
+                f"virtualchat_turns_total {self.turns}",
+                "# HELP virtualchat_stage_seconds Time spent in each turn stage.",
+                "# TYPE virtualchat_stage_seconds histogram"
+            ]
+            for name in self.stage_sums:
+                for bound, count in zip(self.BUCKETS, self.stage_buckets[name]):
+                    lines.append(f'virtualchat_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+                lines.append(f'virtualchat_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {self.stage_counts[name]}')
+                lines.append(f'virtualchat_stage_seconds_sum{{stage="{name}"}} {self.stage_sums[name]:.6f}')
+                lines.append(f'virtualchat_stage_seconds_count{{stage="{name}"}} {self.stage_counts[name]}')
+
+            for key in self.MODEL_COUNTERS:
+                lines.append(f"# TYPE virtualchat_model_{key}_total counter")
+                lines.append(f"virtualchat_model_{key}_total {self.model_totals.get(key, 0)}")
+            for key in self.MODEL_DURATIONS:
+                name = key.replace("_duration", "_seconds")
+                lines.append(f"# TYPE virtualchat_model_{name}_total counter")
+                lines.append(f"virtualchat_model_{name}_total {self.model_totals.get(key, 0.0):.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self) -> None:
+        """
+        Write the metrics file atomically.
+        """
+        text = self.render_prometheus()
+        try:
+            tmp_path = f"{self.metrics_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.metrics_path)
+        except OSError as e:
+            print(f"Error writing turn metrics: {e}")
@@ -0,0 +1,159 @@
+import os
+import json
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+class VectorMemory:
+    """
+    A class to index past messages by embedding and recall the relevant ones.
+
+    Vectors are L2-normalized and stored row by row in a NumPy array, so a
+    cosine top-k search is a single matrix-vector product. When a path prefix
+    is given, the array lives in a memory-mapped .npy file (grown by doubling)
+    and the message texts in a JSONL file next to it; the text file decides how
+    many rows are valid, so a crash between the two writes loses at most one entry.
+
+    Attributes:
+        embed (callable): Called as embed(text) -> list of floats.
+        path_prefix (str): Prefix of the .npy and .jsonl files, or None to stay in memory.
+        entries (list): The indexed messages, as {'role', 'content'} dicts.
+    """
+    INITIAL_CAPACITY = 256
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, embed, path_prefix: str = None):
+        self.embed = embed
+        self.path_prefix = path_prefix
+        self.entries = []
+        self.vectors = None
+        self.lock = threading.Lock()
+        if self.path_prefix:
+            self.load()
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        """
+        Return the single indexing worker shared by every conversation, which keeps
+        each index in insertion order.
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-index")
+            return cls._executor
+
+    @property
+    def vectors_path(self) -> str:
+        return f"{self.path_prefix}.npy"
+
+    @property
+    def entries_path(self) -> str:
+        return f"{self.path_prefix}.jsonl"
+
+    def load(self) -> None:
+        """
+        Open a persisted index, memory-mapping its vectors.
+        """
+        if not os.path.exists(self.vectors_path) or not os.path.exists(self.entries_path):
+            return
+        try:
+            with open(self.entries_path, "r", encoding="utf-8") as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+            self.vectors = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+            self.entries = self.entries[:self.vectors.shape[0]]
+        except (OSError, ValueError) as e:
+            print(f"Error loading memory index: {e}")
+            self.entries = []
+            self.vectors = None
+
+    def _allocate(self, capacity: int, dimension: int):
+        """
+        Create the vector array, memory-mapped when the index is persisted.
+        """
+        if not self.path_prefix:
+            return np.zeros((capacity, dimension), dtype=np.float32)
+        os.makedirs(os.path.dirname(self.path_prefix) or ".", exist_ok=True)
+        tmp_path = f"{self.path_prefix}.tmp.npy"
+        vectors = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dimension))
+        if self.vectors is not None:
+            vectors[:len(self.entries)] = self.vectors[:len(self.entries)]
+            vectors.flush()
+        os.replace(tmp_path, self.vectors_path)
+        return vectors
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, role: str, content: str) -> None:
+        """
+        Embed a message and add it to the index.
+        """
+        vector = self._normalize(self.embed(content))
+        with self.lock:
+            count = len(self.entries)
+            if self.vectors is None:
+                self.vectors = self._allocate(self.INITIAL_CAPACITY, vector.shape[0])
+            elif count == self.vectors.shape[0]:
+                if self.path_prefix:
+                    self.vectors.flush()
+                self.vectors = self._allocate(count * 2, vector.shape[0])
+            elif vector.shape[0] != self.vectors.shape[1]:
+                print("Error: embedding dimension changed, message not indexed.")
+                return
+
+            self.vectors[count] = vector
+            if self.path_prefix:
+                self.vectors.flush()
+                with open(self.entries_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"role": role, "content": content}, ensure_ascii=False) + "\n")
+            self.entries.append({"role": role, "content": content})
+
+    def submit(self, messages: list) -> None:
+        """
+        Index messages in the background, off the turn's hot path.
+
+        Args:
+            messages (list): The {'role', 'content'} messages to index, oldest first.
+        """
+        if messages:
+            self.executor().submit(self._index, list(messages))
+
+    def _index(self, messages: list) -> None:
+        for message in messages:
+            try:
+                self.add(message['role'], message['content'])
+            except Exception as e:
+                print(f"Error indexing memory: {e}")
+                return
+
+    def search(self, query: str, top_k: int = 3, min_score: float = 0.0) -> list:
+        """
+        Return the indexed messages most similar to the query.
+
+        Args:
+            query (str): The text to match, usually the latest user message.
+            top_k (int, optional): Maximum number of messages. Defaults to 3.
+            min_score (float, optional): Minimum cosine similarity. Defaults to 0.0.
+
+        Returns:
+            list: The matching messages in chronological order.
+        """
+        with self.lock:
+            count = len(self.entries)
+        if count == 0 or top_k <= 0:
+            return []
+
+        query_vector = self._normalize(self.embed(query))
+        with self.lock:
+            if query_vector.shape[0] != self.vectors.shape[1]:
+                return []
+            scores = self.vectors[:count] @ query_vector
+            k = min(top_k, count)
+            best = np.argpartition(-scores, k - 1)[:k]
+            return [self.entries[i] for i in sorted(best) if scores[i] >= min_score]
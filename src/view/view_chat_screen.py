@@ -2,10 +2,20 @@ import tkinter as tk
 from tkinter import scrolledtext, Entry, Button, PhotoImage, filedialog, messagebox, font
 import threading
 import os
+import time
 import datetime
+from collections import deque
 
 
 class ChatView:
+    # Updates are coalesced and rendered at most once per frame (milliseconds)
+    FRAME_MS = 16
+    # Lines kept in the history widget; older entries are paged back in on demand
+    MAX_LINES = 500
+    PAGE_ENTRIES = 100
+    # Entries kept in memory for paging and saving; older ones are dropped once off screen
+    MAX_ENTRIES = 5000
+
     def __init__(self, selected_character, user_name):
         """
         Initialize the chat view for a specific character.
@@ -27,6 +37,20 @@ class ChatView:
         # Add a flag to track processing state
         self.is_processing = False
 
+        # Render pipeline: updates from any thread are queued and flushed once per frame
+        self.render_lock = threading.Lock()
+        self.pending_history = []
+        self.pending_ai_message = None
+        self.render_scheduled = False
+        # The latest history entries, and the index of the first one shown in the widget
+        self.history_entries = []
+        self.first_shown = 0
+        self.shown_lines = 0
+        # Input latency (Enter to rendered) and render time, with the history size
+        self.input_started = None
+        self.input_latencies = deque(maxlen=200)
+        self.render_times = deque(maxlen=200)
+
         # GUI Setup
         self.window = tk.Tk()
         self.window.title(f"Chat with {self.selected_character}")
@@ -52,6 +76,15 @@ class ChatView:
         self.history_label = tk.Label(self.history_frame, text="Chat History")
         self.history_label.pack(side=tk.LEFT)
 
+        # Older History Button, pages trimmed messages back into view
+        self.older_history_button = Button(
+            self.history_frame,
+            text="⬆ Older",
+            command=self.show_older_history,
+            state='disabled'
+        )
+        self.older_history_button.pack(side=tk.LEFT, padx=(10, 0))
+
         # Save History Button
         self.save_history_button = Button(
             self.history_frame, 
@@ -117,6 +150,15 @@ class ChatView:
         """
         self.message_callback = callback
     
+    def ask_resume(self):
+        """
+        Ask whether to resume the previous conversation with the character.
+
+        Returns:
+            bool: True if the user chose to resume it.
+        """
+        return messagebox.askyesno("Resume Chat", f"Resume the previous conversation with {self.selected_character}?")
+
     def toggle_mic_input(self):
         """
         Toggle microphone input mode
@@ -137,8 +179,9 @@ class ChatView:
         Save the chat history to a text file.
         Allows user to choose save location and filename.
         """
-        # Get current chat history content
-        chat_content = self.chat_history.get(1.0, tk.END).strip()
+        # Get the kept chat history, including the entries trimmed from the widget
+        with self.render_lock:
+            chat_content = "\n".join(self.history_entries + self.pending_history).strip()
         
         if not chat_content:
             tk.messagebox.showinfo("Save History", "No chat history to save.")
@@ -176,6 +219,7 @@ class ChatView:
         if user_message and self.message_callback:
             if not self.is_processing:
                 self.is_processing = True
+                self.input_started = time.perf_counter()
                 self.user_input.config(state='disabled')
                 self.send_button.config(state='disabled')
                 
@@ -208,30 +252,133 @@ class ChatView:
 
     def display_ai_message(self, ai_message):
         """
-        Display AI message in the top section
+        Display AI message in the top section. Safe to call from any thread.
         
         Args:
             ai_message (list): Message from the AI
         """
-        self.ai_message_display.config(state='normal')
-        self.ai_message_display.delete(1.0, tk.END)
-        self.ai_message_display.insert(tk.END, ai_message)
-        self.ai_message_display.config(state='disabled')
+        with self.render_lock:
+            self.pending_ai_message = ai_message
         
         # Also add to chat history
         self.update_chat_history(f"{self.selected_character}: {ai_message}")
     
     def update_chat_history(self, message):
         """
-        Update the chat history with a new message
+        Queue a new message for the chat history. Safe to call from any thread;
+        the message is rendered with the next frame.
         
         Args:
             message (str): Message to add to chat history
         """
+        with self.render_lock:
+            self.pending_history.append(message)
+        self.schedule_render()
+
+    def schedule_render(self):
+        """
+        Schedule one render for the next frame, unless one is already scheduled.
+        """
+        with self.render_lock:
+            if self.render_scheduled:
+                return
+            self.render_scheduled = True
+        self.window.after(self.FRAME_MS, self.render)
+
+    def render(self):
+        """
+        Apply every queued update in one pass on the Tk main thread.
+
+        The history is trimmed to MAX_LINES only while it follows the newest
+        message, so paging back with "Older" is not undone under the reader.
+        At most MAX_ENTRIES entries are kept in memory.
+        """
+        start_time = time.perf_counter()
+        with self.render_lock:
+            self.render_scheduled = False
+            messages, self.pending_history = self.pending_history, []
+            ai_message, self.pending_ai_message = self.pending_ai_message, None
+
+        if ai_message is not None:
+            self.ai_message_display.config(state='normal')
+            self.ai_message_display.delete(1.0, tk.END)
+            self.ai_message_display.insert(tk.END, ai_message)
+            self.ai_message_display.config(state='disabled')
+
+        if messages:
+            following = self.chat_history.yview()[1] >= 1.0
+            with self.render_lock:
+                self.history_entries.extend(messages)
+            self.chat_history.config(state='normal')
+            self.chat_history.insert(tk.END, "".join(message + "\n" for message in messages))
+            self.shown_lines += sum(message.count("\n") + 1 for message in messages)
+            if following:
+                self.trim_history()
+                self.chat_history.see(tk.END)
+            self.chat_history.config(state='disabled')
+            self.forget_history()
+
+        if self.input_started is not None and messages:
+            self.input_latencies.append((len(self.history_entries), time.perf_counter() - self.input_started))
+            self.input_started = None
+        self.render_times.append((len(self.history_entries), time.perf_counter() - start_time))
+
+    def trim_history(self):
+        """
+        Drop the oldest entries from the history widget until it holds at most MAX_LINES lines.
+        """
+        removed_lines = 0
+        while self.shown_lines - removed_lines > self.MAX_LINES and self.first_shown < len(self.history_entries) - 1:
+            removed_lines += self.history_entries[self.first_shown].count("\n") + 1
+            self.first_shown += 1
+        if removed_lines:
+            self.chat_history.delete(1.0, f"{removed_lines + 1}.0")
+            self.shown_lines -= removed_lines
+        self.older_history_button.config(state='normal' if self.first_shown else 'disabled')
+
+    def forget_history(self):
+        """
+        Drop the oldest entries no longer shown in the widget while more than MAX_ENTRIES are kept.
+        """
+        excess = min(len(self.history_entries) - self.MAX_ENTRIES, self.first_shown)
+        if excess <= 0:
+            return
+        with self.render_lock:
+            del self.history_entries[:excess]
+        self.first_shown -= excess
+        self.older_history_button.config(state='normal' if self.first_shown else 'disabled')
+
+    def show_older_history(self):
+        """
+        Page the previous PAGE_ENTRIES trimmed entries back into the history widget.
+        """
+        start = max(0, self.first_shown - self.PAGE_ENTRIES)
+        entries = self.history_entries[start:self.first_shown]
+        if not entries:
+            return
         self.chat_history.config(state='normal')
-        self.chat_history.insert(tk.END, message + "\n")
+        self.chat_history.insert(1.0, "".join(entry + "\n" for entry in entries))
         self.chat_history.config(state='disabled')
-        self.chat_history.see(tk.END)
+        self.chat_history.see(1.0)
+        self.shown_lines += sum(entry.count("\n") + 1 for entry in entries)
+        self.first_shown = start
+        self.older_history_button.config(state='normal' if self.first_shown else 'disabled')
+
+    def render_report(self) -> dict:
+        """
+        Return the input latency and render time statistics, with the history size they were measured at.
+        """
+        def summary(samples):
+            durations = sorted(seconds for _, seconds in samples)
+            if not durations:
+                return {"count": 0}
+            return {
+                "count": len(durations),
+                "p50_ms": durations[len(durations) // 2] * 1000,
+                "max_ms": durations[-1] * 1000,
+                "history_entries": samples[-1][0]
+            }
+        return {"input_latency": summary(list(self.input_latencies)), "render": summary(list(self.render_times))}
     
     def show(self):
         """
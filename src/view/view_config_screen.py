@@ -5,7 +5,7 @@ class ViewScreen:
 
         self.root = tk.Tk()
         self.root.title("VirtualChatAI")
-        self.root.geometry("500x450")
+        self.root.geometry("500x520")
         
         self.selected_character = None
 
@@ -29,24 +29,64 @@ class ViewScreen:
         self.character_frame.pack(pady=10)
 
         tk.Label(self.character_frame, text="Selecione o Personagem:").pack()
+
+        # Typing a name filters the list; the arrows page through the full list
+        self.character_page = 0
+        self.search_var = tk.StringVar(value="")
+        self.search_var.trace_add("write", lambda *args: self.request_character_page(0))
+        tk.Entry(self.character_frame, textvariable=self.search_var).pack()
+
         self.character_var = tk.StringVar(value="")  # Inicia vazio
         self.character_dropdown = tk.OptionMenu(self.character_frame, self.character_var, "")
         self.character_dropdown.pack()
 
+        self.page_frame = tk.Frame(self.character_frame)
+        self.page_frame.pack()
+        tk.Button(self.page_frame, text="◀", command=lambda: self.request_character_page(self.character_page - 1)).pack(side=tk.LEFT)
+        self.page_label = tk.Label(self.page_frame, text="")
+        self.page_label.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.page_frame, text="▶", command=lambda: self.request_character_page(self.character_page + 1)).pack(side=tk.LEFT)
+
         # Add a button to show character details
         tk.Button(self.root, text="Show Character Details", command=self.request_character_details).pack(pady=10)
 
         # OK button
         tk.Button(self.root, text="OK", command=self.on_ok).pack(pady=20)
 
-    def update_character_options(self, characters):
-        """Update the dropdown menu with available characters."""
-        self.character_var.set("")  # Set default value to empty
+    def update_character_options(self, characters, page: int = 0, pages: int = 1):
+        """
+        Update the dropdown menu with a page of characters or the search results.
+
+        Args:
+            characters (list): The character names to offer.
+            page (int, optional): The page shown, starting at 0. Defaults to 0.
+            pages (int, optional): The number of pages. Defaults to 1.
+        """
+        # Preselect the only match of a search, otherwise start empty
+        self.character_var.set(characters[0] if len(characters) == 1 else "")
+        self.character_page = page
+        self.page_label.config(text=f"{page + 1}/{pages}")
         menu = self.character_dropdown["menu"]
         menu.delete(0, "end")
         for character in characters:
             menu.add_command(label=character, command=lambda value=character: self.character_var.set(value))
 
+    def request_character_page(self, page: int):
+        """
+        Request a page of characters, filtered by the search text, through the controller callback.
+        """
+        if hasattr(self, 'character_search_callback'):
+            self.character_search_callback(self.search_var.get(), page)
+
+    def set_character_search_callback(self, callback):
+        """
+        Set the callback method for listing and searching characters.
+
+        Args:
+            callback (callable): A method to be called with the search text and the page.
+        """
+        self.character_search_callback = callback
+
     def request_character_details(self):
         """
         Request character details through the controller callback.
@@ -0,0 +1,122 @@
+"""
+Routing, session affinity and failover of BackendRouter against local stub Ollama servers.
+
+Run from the project root:
+    python -m pytest tests
+"""
+import pytest
+import requests
+from benchmarks.stub_ollama import StubOllamaServer
+from src.models.backend_router import BackendRouter
+
+
+@pytest.fixture
+def servers():
+    started = [StubOllamaServer(latency=0.0).start() for _ in range(3)]
+    yield started
+    for server in started:
+        try:
+            server.stop()
+        except OSError:
+            pass
+
+
+def generate(router, session_id):
+    response = router.post(
+        "/api/generate", {"model": "stub-model", "prompt": "Hi", "stream": False},
+        session_id=session_id, timeout=5
+    )
+    assert response.status_code == 200
+    return response
+
+
+def served(servers):
+    return [server.requests_served for server in servers]
+
+
+def test_requests_go_to_the_least_loaded_backend(servers):
+    router = BackendRouter([server.base_url for server in servers])
+
+    held = [router.acquire(f"session-{i}") for i in range(3)]
+
+    assert {backend.base_url for backend in held} == {server.base_url for server in servers}
+    assert [status["outstanding"] for status in router.status()] == [1, 1, 1]
+    for backend in held:
+        router.release(backend)
+    assert [status["outstanding"] for status in router.status()] == [0, 0, 0]
+
+
+def test_session_sticks_to_its_backend(servers):
+    router = BackendRouter([server.base_url for server in servers])
+
+    for _ in range(5):
+        generate(router, "session-a")
+
+    assert sorted(served(servers)) == [0, 0, 5]
+
+
+def test_forgotten_session_is_routed_again(servers):
+    router = BackendRouter([server.base_url for server in servers])
+    generate(router, "session-a")
+    first = router.affinity["session-a"]
+
+    # Keep a request in flight on the backend of session-a, so a new pick avoids it
+    first.outstanding += 1
+    router.forget_session("session-a")
+    generate(router, "session-a")
+
+    assert router.affinity["session-a"] is not first
+    router.release(first)
+
+
+def test_failover_moves_the_session_to_a_healthy_backend(servers):
+    router = BackendRouter([server.base_url for server in servers], retry_interval=60)
+    generate(router, "session-a")
+    failed = router.affinity["session-a"]
+    failed_server = next(server for server in servers if server.base_url == failed.base_url)
+    failed_server.stop()
+
+    generate(router, "session-a")
+
+    assert router.affinity["session-a"] is not failed
+    assert not failed.healthy
+    assert sum(served(servers)) == 2
+    # The failed backend stays out of rotation until its retry interval passes
+    for i in range(4):
+        generate(router, f"session-{i}")
+    assert failed_server.requests_served == 1
+
+
+def test_failed_backend_is_probed_again_after_the_retry_interval(servers):
+    router = BackendRouter([server.base_url for server in servers], retry_interval=0)
+    backend = router.acquire("session-a")
+    router.release(backend, failed=True)
+    assert not backend.healthy
+
+    # The server still answers, so the next request finds it healthy again
+    generate(router, "session-b")
+
+    assert backend.healthy
+
+
+def test_every_backend_down_raises_connection_error(servers):
+    router = BackendRouter([server.base_url for server in servers], retry_interval=60)
+    for server in servers:
+        server.stop()
+
+    with pytest.raises(requests.ConnectionError):
+        generate(router, "session-a")
+    assert not any(status["healthy"] for status in router.status())
+
+
+def test_streamed_request_holds_the_backend_until_closed(servers):
+    router = BackendRouter([server.base_url for server in servers])
+    payload = {"model": "stub-model", "prompt": "Hi", "stream": True}
+
+    with router.stream("/api/generate", payload, session_id="session-a", timeout=5) as response:
+        assert response.status_code == 200
+        assert sum(status["outstanding"] for status in router.status()) == 1
+        lines = [line for line in response.iter_lines() if line]
+
+    assert lines
+    assert sum(status["outstanding"] for status in router.status()) == 0
@@ -0,0 +1,109 @@
+"""
+Resuming a stored session against a local stub Ollama server, without evaluating the conversation again.
+
+Run from the project root:
+    python -m pytest tests
+"""
+import time
+import pytest
+from benchmarks.stubs import make_stub_environment
+from src.models.chat_base import ChatBase
+
+
+def start_session(template, directory):
+    server, config_path, config_directory = make_stub_environment(
+        0.0,
+        f"\n[Sessions]\nenabled = true\ndirectory = {directory}\n"
+        f"\n[Chat]\ntemplate = {template}\n"
+        "\n[Generation]\nstream = false\nnum_predict = 200\n"
+    )
+    sent = []
+    generate = server.generate
+
+    def record(body):
+        sent.append(body)
+        return generate(body)
+
+    server.generate = record
+    return server, config_path, config_directory, sent
+
+
+def talk(chat, user_message):
+    chat.add_message(chat.user, user_message)
+    response = chat.get_response(chat.update_memory())
+    chat.add_message(chat.char_name, response)
+
+
+@pytest.fixture
+def plain_session(tmp_path):
+    server, config_path, config_directory, sent = start_session("plain", tmp_path)
+    yield config_path, sent
+    server.stop()
+    config_directory.cleanup()
+
+
+@pytest.fixture
+def chat_session(tmp_path):
+    server, config_path, config_directory, sent = start_session("chat", tmp_path)
+    yield config_path, sent
+    server.stop()
+    config_directory.cleanup()
+
+
+def wait_for(sent, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while len(sent) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_generate_sends_the_context_with_only_the_new_text(plain_session):
+    config_path, sent = plain_session
+    chat = ChatBase(config_path)
+    chat.load_chat_config(chat.get_character_names()[0], "en")
+    chat.setup_conversation()
+
+    talk(chat, "Hi there")
+    talk(chat, "How are you")
+
+    assert "context" not in sent[0]
+    assert sent[1]["context"]
+    assert sent[1]["prompt"] == f"\n{chat.user}: How are you\n{chat.char_name}: "
+    chat.close()
+
+
+def test_resumed_generate_session_reuses_the_stored_context(plain_session):
+    config_path, sent = plain_session
+    chat = ChatBase(config_path)
+    chat.load_chat_config(chat.get_character_names()[0], "en")
+    chat.setup_conversation()
+    talk(chat, "Hi there")
+    chat.close()
+
+    resumed = ChatBase(config_path)
+    assert resumed.resume_session(chat.session_id)
+    wait_for(sent, 2)
+    talk(resumed, "Tell me more")
+
+    assert sent[-1]["context"] == chat.context_tokens
+    assert sent[-1]["prompt"] == f"\n{chat.user}: Tell me more\n{chat.char_name}: "
+    resumed.close()
+
+
+def test_resumed_chat_session_is_prefilled(chat_session):
+    config_path, sent = chat_session
+    chat = ChatBase(config_path)
+    chat.load_chat_config(chat.get_character_names()[0], "en")
+    chat.setup_conversation()
+    talk(chat, "Hi there")
+    chat.close()
+
+    resumed = ChatBase(config_path)
+    assert resumed.resume_session(chat.session_id)
+    wait_for(sent, 2)
+
+    assert len(sent) == 2
+    assert sent[1]["options"]["num_predict"] == 1
+    assert [message["content"] for message in sent[1]["messages"][1:]] == [
+        message["content"] for message in resumed.conversation
+    ]
+    resumed.close()